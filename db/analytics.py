@@ -0,0 +1,161 @@
+from typing import Optional
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from db.models import Competition, Competitor, Drive, Event, Play
+
+try:
+    import pandas as pd
+except ImportError:  # Only needed for the DataFrame API.
+    pd = None
+
+HomeCompetitor = aliased(Competitor)
+AwayCompetitor = aliased(Competitor)
+
+# pandas dtype of each play-by-play column; nullable dtypes, since ESPN leaves many fields empty.
+PLAY_BY_PLAY_DTYPES = {
+    "event_id": "int64",
+    "season": "Int64",
+    "season_type": "Int64",
+    "week": "Int64",
+    "home_team_id": "Int64",
+    "away_team_id": "Int64",
+    "drive_id": "Int64",
+    "drive_start_quarter": "Int64",
+    "drive_start_yardline": "Int64",
+    "drive_yards": "Int64",
+    "drive_is_score": "boolean",
+    "play_id": "int64",
+    "sequence_number": "Int64",
+    "quarter": "Int64",
+    "play_type": "category",
+    "description": "string",
+    "start_down": "Int64",
+    "start_distance": "Int64",
+    "start_yardline": "Int64",
+    "start_yards_to_endzone": "Int64",
+    "end_down": "Int64",
+    "end_distance": "Int64",
+    "end_yardline": "Int64",
+    "end_yards_to_endzone": "Int64",
+    "home_score": "Int64",
+    "away_score": "Int64",
+    "is_scoring_play": "boolean",
+    "score_value": "Int64",
+}
+
+
+def play_by_play_query(
+    team_id: Optional[int] = None,
+    season: Optional[int] = None,
+    season_type: Optional[int] = None,
+    week: Optional[int] = None,
+    event_id: Optional[int] = None,
+) -> Select:
+    """
+    Build the single set-based query behind ``load_play_by_play``: every play joined with its
+    drive, event and both competitors, ordered by game and sequence number.
+
+    Args:
+        team_id (Optional[int]): Only games this team played in.
+        season (Optional[int]): Only games of this season.
+        season_type (Optional[int]): Only games of this season type.
+        week (Optional[int]): Only games of this week.
+        event_id (Optional[int]): Only this game.
+
+    Returns:
+        Select: The play-by-play query, with one column per key of ``PLAY_BY_PLAY_DTYPES``.
+    """
+    query = (
+        select(
+            Event.id.label("event_id"),
+            Event.season,
+            Event.season_type,
+            Event.week,
+            HomeCompetitor.team_id.label("home_team_id"),
+            AwayCompetitor.team_id.label("away_team_id"),
+            Drive.id.label("drive_id"),
+            Drive.start_quarter.label("drive_start_quarter"),
+            Drive.start_yardline.label("drive_start_yardline"),
+            Drive.yards.label("drive_yards"),
+            Drive.is_score.label("drive_is_score"),
+            Play.id.label("play_id"),
+            Play.sequence_number,
+            Play.quarter,
+            Play.play_type,
+            Play.description,
+            Play.start_down,
+            Play.start_distance,
+            Play.start_yardline,
+            Play.start_yards_to_endzone,
+            Play.end_down,
+            Play.end_distance,
+            Play.end_yardline,
+            Play.end_yards_to_endzone,
+            Play.home_score,
+            Play.away_score,
+            Play.is_scoring_play,
+            Play.score_value,
+        )
+        .join(Drive, Play.drive_id == Drive.id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id)
+        .outerjoin(HomeCompetitor, and_(HomeCompetitor.competition_id == Competition.id, HomeCompetitor.is_home.is_(True)))
+        .outerjoin(AwayCompetitor, and_(AwayCompetitor.competition_id == Competition.id, AwayCompetitor.is_home.is_(False)))
+        .order_by(Event.id, Play.sequence_number)
+    )
+
+    if team_id is not None:
+        query = query.where(or_(HomeCompetitor.team_id == team_id, AwayCompetitor.team_id == team_id))
+    if season is not None:
+        query = query.where(Event.season == season)
+    if season_type is not None:
+        query = query.where(Event.season_type == season_type)
+    if week is not None:
+        query = query.where(Event.week == week)
+    if event_id is not None:
+        query = query.where(Event.id == event_id)
+    return query
+
+
+def load_play_by_play(
+    session: Session,
+    team_id: Optional[int] = None,
+    season: Optional[int] = None,
+    season_type: Optional[int] = None,
+    week: Optional[int] = None,
+    event_id: Optional[int] = None,
+) -> "pd.DataFrame":
+    """
+    Load play-by-play as a typed DataFrame, one row per play, for a team, a season, a game
+    or any combination of them. The rows come from a single query and are never
+    materialized as ORM objects, so a full season loads in a fraction of a second.
+
+    Besides the play's down, distance, yardline, score and type, each row carries its
+    drive's context, its game's season, week and home and away teams, and
+    ``yards_gained``, the change in yards to the end zone over the play.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        team_id (Optional[int]): Only games this team played in.
+        season (Optional[int]): Only games of this season.
+        season_type (Optional[int]): Only games of this season type.
+        week (Optional[int]): Only games of this week.
+        event_id (Optional[int]): Only this game.
+
+    Returns:
+        pd.DataFrame: The plays, ordered by game and sequence number.
+    """
+    if pd is None:
+        raise ImportError("The play-by-play DataFrame API requires pandas, install it with `pip install pandas`.")
+
+    result = session.execute(play_by_play_query(team_id, season, season_type, week, event_id))
+    keys = list(result.keys())
+    rows = result.all()
+    # Building each column straight into its dtype is several times faster than going through records.
+    columns = zip(*rows) if rows else ([] for _ in keys)
+    frame = pd.DataFrame({
+        key: pd.array(list(values), dtype=PLAY_BY_PLAY_DTYPES[key]) for key, values in zip(keys, columns)
+    })
+    frame["yards_gained"] = frame["start_yards_to_endzone"] - frame["end_yards_to_endzone"]
+    return frame
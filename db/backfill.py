@@ -0,0 +1,222 @@
+import asyncio
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from sqlalchemy.orm import sessionmaker
+from tqdm import tqdm
+
+from db.engine import create_engine
+from db.util import configure_http_client, close_http_client
+from db.scheduler import configure_scheduler, DEFAULT_HOST_RATES, DEFAULT_RATE
+from db.retry import DEAD_LETTERS
+from db.http_cache import configure_response_cache, close_response_cache
+from db.load.event import create_event
+from db.load.ingest import AsyncEventIngestor
+
+MANIFEST_FILE = "manifest.json"
+
+
+class Shard:
+    """One (year, season type, week) unit of a sharded backfill and the files it is staged in."""
+
+    def __init__(self, year: int, season_type: int, week: int, events_url: str, staging_dir: str):
+        self.year = year
+        self.season_type = season_type
+        self.week = week
+        self.events_url = events_url
+        self.name = f"{year}-{season_type}-{week:02d}"
+        self.path = os.path.join(staging_dir, f"{self.name}.jsonl.gz")
+        self.dead_letter_path = os.path.join(staging_dir, f"{self.name}.dead.jsonl")
+
+
+def scaled_host_rates(workers: int) -> Tuple[Dict[str, Tuple[float, int]], Tuple[float, int]]:
+    """Split the per-host rate limits between worker processes so together they stay within them."""
+    def scale(rate: Tuple[float, int]) -> Tuple[float, int]:
+        return rate[0] / workers, max(1, rate[1] // workers)
+
+    return {host: scale(rate) for host, rate in DEFAULT_HOST_RATES.items()}, scale(DEFAULT_RATE)
+
+
+def stage_shard(
+    shard: Shard,
+    database_url: str,
+    workers: int,
+    proxies: List[str],
+    cache_path: Optional[str],
+) -> Dict[str, int]:
+    """
+    Worker process entry point: fetch the expanded reference graph of every event of a shard
+    that is not in the main database yet and stage it, one JSON event per line, in the
+    shard's file. The file only appears once the shard is complete.
+
+    Args:
+        shard (Shard): The shard to stage.
+        database_url (str): URL of the main database, read to skip stored events and athletes.
+        workers (int): Number of worker processes sharing the rate limits.
+        proxies (List[str]): Proxy URLs to rotate through.
+        cache_path (Optional[str]): Path of the shared HTTP response cache, or None to disable it.
+
+    Returns:
+        Dict[str, int]: Number of staged events and of dead-lettered requests.
+    """
+    host_rates, default_rate = scaled_host_rates(workers)
+    configure_http_client()
+    configure_scheduler(proxies=proxies, host_rates=host_rates, default_rate=default_rate)
+    if cache_path:
+        configure_response_cache(cache_path)
+
+    # Pool processes are reused across shards; each shard reports only its own failures.
+    DEAD_LETTERS.clear()
+    engine = create_engine(database_url, profile="analytics")
+    SessionLocal = sessionmaker(bind=engine)
+    staging_path = f"{shard.path}.tmp"
+    staged = 0
+
+    try:
+        with gzip.open(staging_path, "wt") as file:
+            def stage_event(event_data: Dict[str, Any]) -> None:
+                nonlocal staged
+                file.write(json.dumps(event_data) + "\n")
+                staged += 1
+
+            async def fetch_shard() -> None:
+                async with AsyncEventIngestor(SessionLocal, write_event=stage_event) as ingestor:
+                    await ingestor.ingest_week(shard.events_url)
+
+            asyncio.run(fetch_shard())
+
+        os.replace(staging_path, shard.path)
+        DEAD_LETTERS.save(shard.dead_letter_path)
+        return {"events": staged, "dead_letters": len(DEAD_LETTERS)}
+    finally:
+        close_http_client()
+        close_response_cache()
+        engine.dispose()
+
+
+class ShardedBackfill:
+    """
+    Backfill events with a process pool. The (year, season type, week) space is split into
+    shards; each worker process fetches one shard at a time and stages it in a file, and
+    this process, the only writer, merges staged shards into the main database as they
+    complete. Progress is kept per shard in a manifest, so an interrupted backfill resumes
+    where it stopped: merged shards are skipped and staged ones are merged without fetching.
+    """
+
+    def __init__(
+        self,
+        SessionLocal: sessionmaker,
+        database_url: str,
+        staging_dir: str,
+        workers: Optional[int] = None,
+        proxies: Optional[List[str]] = None,
+        cache_path: Optional[str] = None,
+        on_merged: Optional[Callable[[Shard], None]] = None,
+    ):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for sessions on the main database, used to merge.
+            database_url (str): URL of the main database, passed to the workers.
+            staging_dir (str): Directory holding the staged shards and the manifest.
+            workers (Optional[int]): Number of worker processes, one per core by default.
+            proxies (Optional[List[str]]): Proxy URLs the workers rotate through.
+            cache_path (Optional[str]): Path of the HTTP response cache shared by the workers.
+            on_merged (Optional[Callable[[Shard], None]]): Called with each shard once it is merged.
+        """
+        self.SessionLocal = SessionLocal
+        self.database_url = database_url
+        self.staging_dir = staging_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.proxies = proxies or []
+        self.cache_path = cache_path
+        self.on_merged = on_merged
+        self.manifest_path = os.path.join(staging_dir, MANIFEST_FILE)
+        os.makedirs(staging_dir, exist_ok=True)
+        self.manifest: Dict[str, Dict[str, Any]] = self.load_manifest()
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def save_manifest(self) -> None:
+        staging_path = f"{self.manifest_path}.tmp"
+        with open(staging_path, "w") as file:
+            json.dump(self.manifest, file, indent=2, sort_keys=True)
+        os.replace(staging_path, self.manifest_path)
+
+    def mark(self, shard: Shard, state: str, **details) -> None:
+        self.manifest[shard.name] = {**self.manifest.get(shard.name, {}), "state": state, **details}
+        self.save_manifest()
+
+    def merge_shard(self, shard: Shard) -> int:
+        """
+        Write a staged shard's events into the main database and drop its files.
+
+        Returns:
+            int: Number of events merged.
+        """
+        merged = 0
+        with self.SessionLocal() as session, gzip.open(shard.path, "rt") as file:
+            for line in file:
+                event_data = json.loads(line)
+                try:
+                    create_event(session, event_data)
+                    merged += 1
+                except Exception as e:
+                    session.rollback()
+                    logging.error(f"Failed to merge event {event_data.get('id')} of shard {shard.name}. Details: {e}")
+
+        DEAD_LETTERS.load(shard.dead_letter_path)
+        for path in (shard.path, shard.dead_letter_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.mark(shard, "merged", merged=merged)
+        if self.on_merged:
+            self.on_merged(shard)
+        return merged
+
+    def run(self, shards: List[Shard]) -> None:
+        """Stage and merge every shard that is not merged yet."""
+        pending = [shard for shard in shards if self.manifest.get(shard.name, {}).get("state") != "merged"]
+        staged = [shard for shard in pending if os.path.exists(shard.path)]
+        to_fetch = [shard for shard in pending if shard not in staged]
+        logging.info(
+            f"Sharded backfill: {len(shards) - len(pending)} shards merged, {len(staged)} staged, "
+            f"{len(to_fetch)} to fetch with {self.workers} workers."
+        )
+
+        with tqdm(total=len(pending), desc="Backfilling NFL Events") as pbar:
+            for shard in staged:
+                self.merge_shard(shard)
+                pbar.update(1)
+
+            # Workers are spawned rather than forked, so they never inherit this process's open
+            # SQLite connections (the response cache and the engine's pool).
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {
+                    pool.submit(
+                        stage_shard, shard, self.database_url, self.workers, self.proxies, self.cache_path
+                    ): shard
+                    for shard in to_fetch
+                }
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error(f"Shard {shard.name} failed, it will be fetched again on the next run. Details: {e}")
+                        self.mark(shard, "failed", error=str(e))
+                        pbar.update(1)
+                        continue
+
+                    self.mark(shard, "staged", **result)
+                    self.merge_shard(shard)
+                    pbar.update(1)
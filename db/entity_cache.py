@@ -0,0 +1,159 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.models import (
+    Athlete, CompetitionStatus, CompetitionStatusType, OfficialPosition, Position, StatType, Team, Venue,
+)
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Tables whose bulk-written rows are remembered by primary key, and the cache kind they go under.
+TABLE_KINDS = {
+    "athletes": "athlete",
+    "teams": "team",
+    "venues": "venue",
+    "officialpositions": "official_position",
+    "competition_status_types": "status_type",
+}
+
+
+def status_key(clock: Any, display_clock: Any, period: Any, competition_status_type_id: int) -> Tuple:
+    """Cache key of a competition status, the columns it is looked up by."""
+    return (clock, display_clock, period, competition_status_type_id)
+
+
+class EntityCache:
+    """
+    Bounded, thread-safe cache of entities known to be stored, shared by every loader.
+    Values are IDs, never ORM objects, so they stay valid across sessions and threads.
+    Entries are grouped by kind ("athlete", "team", "venue", "position",
+    "official_position", "status_type", "status", "stat_type") and evicted least recently used first
+    once the cache holds ``max_entries``.
+
+    Only entities that are committed are cached, since stored rows are never deleted
+    while loading; a miss simply falls back to the database.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept, across all kinds.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Any]" = OrderedDict()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, kind: str, key: Hashable) -> Optional[Any]:
+        """Return the cached value of an entity, or None on a miss."""
+        with self._lock:
+            value = self._entries.get((kind, key))
+            if value is None:
+                self._misses[kind] = self._misses.get(kind, 0) + 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self._hits[kind] = self._hits.get(kind, 0) + 1
+            return value
+
+    def put(self, kind: str, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[(kind, key)] = value
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_rows(self, rows: Dict) -> None:
+        """Cache the IDs of committed bulk-written rows of the tables in ``TABLE_KINDS``."""
+        for (table, _), keyed_rows in rows.items():
+            kind = TABLE_KINDS.get(table.name)
+            if kind:
+                for key in keyed_rows:
+                    self.put(kind, key[0], key[0])
+
+    def warm(self, session: Session) -> int:
+        """
+        Load the IDs of stored entities, the small lookup tables first, so per-row lookups
+        hit memory from the start. Stops once the cache is full.
+
+        Returns:
+            int: Number of entries loaded.
+        """
+        queries = [
+            ("status_type", select(CompetitionStatusType.id, CompetitionStatusType.id)),
+            ("position", select(Position.position_name, Position.id)),
+            ("stat_type", select(StatType.name, StatType.id)),
+            ("official_position", select(OfficialPosition.id, OfficialPosition.id)),
+            ("team", select(Team.id, Team.id)),
+            ("venue", select(Venue.id, Venue.id)),
+            (
+                "status",
+                select(
+                    CompetitionStatus.clock,
+                    CompetitionStatus.display_clock,
+                    CompetitionStatus.period,
+                    CompetitionStatus.competition_status_type_id,
+                    CompetitionStatus.id,
+                ),
+            ),
+            ("athlete", select(Athlete.id, Athlete.id)),
+        ]
+
+        loaded = 0
+        for kind, query in queries:
+            for row in session.execute(query.limit(self.max_entries - loaded)):
+                key = status_key(*row[:4]) if kind == "status" else row[0]
+                self.put(kind, key, row[-1])
+                loaded += 1
+            if loaded >= self.max_entries:
+                break
+
+        logging.info(f"Warmed the entity cache with {loaded} entries.")
+        return loaded
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return the hits, misses and hit rate of each kind."""
+        with self._lock:
+            kinds = sorted(set(self._hits) | set(self._misses))
+            return {
+                kind: {
+                    "hits": self._hits.get(kind, 0),
+                    "misses": self._misses.get(kind, 0),
+                    "hit_rate": self._hits.get(kind, 0) / ((self._hits.get(kind, 0) + self._misses.get(kind, 0)) or 1),
+                }
+                for kind in kinds
+            }
+
+    def log_stats(self) -> None:
+        for kind, kind_stats in self.stats().items():
+            logging.info(
+                f"Entity cache {kind}: {kind_stats['hits']} hits, {kind_stats['misses']} misses "
+                f"({kind_stats['hit_rate']:.1%})."
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits.clear()
+            self._misses.clear()
+
+
+_ENTITY_CACHE = EntityCache()
+
+
+def configure_entity_cache(**kwargs) -> EntityCache:
+    """Replace the shared entity cache with one built from the given ``EntityCache`` options."""
+    global _ENTITY_CACHE
+    _ENTITY_CACHE = EntityCache(**kwargs)
+    return _ENTITY_CACHE
+
+
+def get_entity_cache() -> EntityCache:
+    return _ENTITY_CACHE
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.models import Competition, Competitor, Drive, Event, Play, PlayParticipant, Stat, StatType
+from db.journal import week_key
+from db.extract.export import Partition, extract_partition_signatures
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed to export.
+    pa = pq = None
+
+MANIFEST_FILE = "_manifest.json"
+PART_FILE = "part-0.parquet"
+
+
+def _columns(model) -> List:
+    """Columns of a model's table other than its ID."""
+    return [column for column in model.__table__.c if column.name != "id"]
+
+
+def _export_queries() -> Dict[str, Select]:
+    """
+    Columns exported for each table. Drives, plays, participants and stats carry the ID of
+    their event, so they can be joined without walking the whole hierarchy, and stats carry
+    the name of their type.
+    """
+    return {
+        "events": select(
+            Event.id, Event.name, Event.weather_id,
+            Competition.id.label("competition_id"), Competition.date, Competition.venue_id,
+            Competition.competition_status_id,
+        ).outerjoin(Competition, Competition.event_id == Event.id),
+        "competitors": select(
+            Competitor.id, Competitor.event_id, Competitor.competition_id, Competitor.team_id,
+            Competitor.is_home, Competitor.is_winner, Competitor.score,
+        ).join(Event, Competitor.event_id == Event.id),
+        "drives": select(
+            Drive.id, Competition.event_id, *_columns(Drive),
+        ).join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id),
+        "plays": select(
+            Play.id, Competition.event_id, *_columns(Play),
+        ).join(Drive, Play.drive_id == Drive.id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id),
+        "playparticipants": select(
+            PlayParticipant.id, Competition.event_id, *_columns(PlayParticipant),
+        ).join(Play, PlayParticipant.play_id == Play.id)
+        .join(Drive, Play.drive_id == Drive.id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id),
+        "stats": select(
+            Competition.event_id, *_columns(Stat), StatType.name.label("stat_name"),
+        ).join(StatType, Stat.stat_type_id == StatType.id)
+        .join(PlayParticipant, Stat.playparticipant_id == PlayParticipant.id)
+        .join(Play, PlayParticipant.play_id == Play.id)
+        .join(Drive, Play.drive_id == Drive.id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id),
+    }
+
+
+def arrow_schema(query: Select) -> "pa.Schema":
+    """Build the Arrow schema of a query's columns from their SQL types, so empty or all-null columns keep their type."""
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+    }
+    return pa.schema([
+        pa.field(column.name, arrow_types.get(column.type.python_type, pa.string()))
+        for column in query.selected_columns
+    ])
+
+
+def partition_path(table_name: str, partition: Partition) -> str:
+    """Hive-style directory of a table's partition, e.g. ``plays/season=2023/season_type=2/week=1``."""
+    season, season_type, week = partition
+    return os.path.join(table_name, f"season={season}", f"season_type={season_type}", f"week={week}")
+
+
+class ParquetExporter:
+    """
+    Export plays, drives, participants, stats, competitors and events to Parquet files
+    partitioned by season, season type and week, for analyses that read columnar data
+    without going through the ORM. A manifest keeps a signature of every exported
+    partition (row counts, highest IDs, score and status totals), so only partitions whose
+    rows changed since the last export are written again.
+
+    The export directory reads as a Hive-partitioned dataset, e.g.
+    ``pyarrow.dataset.dataset("export/plays", partitioning="hive")``.
+    """
+
+    def __init__(self, SessionLocal: sessionmaker, export_dir: str):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for database sessions.
+            export_dir (str): Directory the tables are exported to.
+        """
+        if pa is None:
+            raise ImportError("Exporting to Parquet requires pyarrow, install it with `pip install pyarrow`.")
+
+        self.SessionLocal = SessionLocal
+        self.export_dir = export_dir
+        self.manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+        self.queries = _export_queries()
+        self.schemas = {table_name: arrow_schema(query) for table_name, query in self.queries.items()}
+        os.makedirs(export_dir, exist_ok=True)
+        self.manifest: Dict[str, Dict[str, Any]] = self.load_manifest()
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def save_manifest(self) -> None:
+        staging_path = f"{self.manifest_path}.tmp"
+        with open(staging_path, "w") as file:
+            json.dump(self.manifest, file, indent=2, sort_keys=True)
+        os.replace(staging_path, self.manifest_path)
+
+    def export_partition(self, session: Session, partition: Partition) -> int:
+        """
+        Write every table's rows of a partition, each to a single Parquet file.
+
+        Returns:
+            int: Number of rows written.
+        """
+        season, season_type, week = partition
+        written = 0
+        for table_name, query in self.queries.items():
+            rows = session.execute(
+                query.where(Event.season == season, Event.season_type == season_type, Event.week == week)
+            ).all()
+            schema = self.schemas[table_name]
+            table = pa.Table.from_pydict(
+                {field.name: [row[position] for row in rows] for position, field in enumerate(schema)},
+                schema=schema,
+            )
+
+            directory = os.path.join(self.export_dir, partition_path(table_name, partition))
+            os.makedirs(directory, exist_ok=True)
+            staging_path = os.path.join(directory, f"{PART_FILE}.tmp")
+            pq.write_table(table, staging_path)
+            os.replace(staging_path, os.path.join(directory, PART_FILE))
+            written += len(rows)
+        return written
+
+    def remove_partition(self, partition: Partition) -> None:
+        for table_name in self.queries:
+            shutil.rmtree(os.path.join(self.export_dir, partition_path(table_name, partition)), ignore_errors=True)
+
+    def run(self, full: bool = False) -> List[Partition]:
+        """
+        Export the partitions that changed since the last export, and drop the ones whose
+        events are gone.
+
+        Args:
+            full (bool): Export every partition, whether it changed or not.
+
+        Returns:
+            List[Partition]: The (season, season type, week) partitions written.
+        """
+        exported: List[Partition] = []
+        with self.SessionLocal() as session:
+            signatures = extract_partition_signatures(session)
+            current_keys = {week_key(*partition) for partition in signatures}
+
+            for key in sorted(set(self.manifest) - current_keys):
+                self.remove_partition(tuple(self.manifest[key]["partition"]))
+                del self.manifest[key]
+
+            for partition, signature in sorted(signatures.items()):
+                key = week_key(*partition)
+                # Round trip through JSON so the signature compares equal to the stored one.
+                signature = json.loads(json.dumps(signature))
+                if not full and self.manifest.get(key, {}).get("signature") == signature:
+                    continue
+
+                rows = self.export_partition(session, partition)
+                self.manifest[key] = {
+                    "partition": list(partition),
+                    "signature": signature,
+                    "rows": rows,
+                    "exported_at": datetime.now(timezone.utc).isoformat(),
+                }
+                self.save_manifest()
+                exported.append(partition)
+
+        self.save_manifest()
+        logging.info(f"Exported {len(exported)} of {len(signatures)} partitions to {self.export_dir}.")
+        return exported
@@ -1,7 +1,8 @@
-from sqlalchemy import select
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
-from db.models import Athlete, Position, TeamHistory
+from db.models import Athlete, AthleteEnrichment, Position, TeamHistory
 
 def extract_team_history(session: Session, athlete_id: int, team_id: int, season: int) -> TeamHistory:
     return session.execute(
@@ -18,4 +19,28 @@ def extract_athlete_position(session: Session, position_name: str) -> Position:
 def extract_athlete(session: Session, athlete_id: int) -> Athlete:
     return session.execute(
         select(Athlete).filter_by(id=athlete_id)
-    ).scalars().first()
\ No newline at end of file
+    ).scalars().first()
+
+
+def extract_existing_athlete_ids(session: Session, athlete_ids: Iterable[int]) -> Set[int]:
+    return set(session.execute(select(Athlete.id).where(Athlete.id.in_(set(athlete_ids)))).scalars())
+
+
+def extract_team_history_keys(session: Session, athlete_id: int) -> Set[Tuple[int, int]]:
+    return set(session.execute(
+        select(TeamHistory.team_id, TeamHistory.season).filter_by(athlete_id=athlete_id)
+    ).tuples())
+
+
+def extract_pending_enrichments(session: Session, after_athlete_id: int, limit: int) -> List[Athlete]:
+    return session.execute(
+        select(Athlete)
+        .join(AthleteEnrichment, AthleteEnrichment.athlete_id == Athlete.id)
+        .where(Athlete.id > after_athlete_id)
+        .order_by(Athlete.id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def extract_pending_enrichment_count(session: Session) -> int:
+    return session.execute(select(func.count()).select_from(AthleteEnrichment)).scalar()
@@ -0,0 +1,29 @@
+from typing import Any, Dict, List
+from sqlalchemy import Row, exists, select
+from sqlalchemy.orm import Session
+
+from db.models import Athlete, MaddenPlayer, Position, Rating
+
+
+def extract_madden_release_exists(session: Session, release: str) -> bool:
+    return session.execute(select(exists().where(MaddenPlayer.release == release))).scalar()
+
+
+def extract_madden_players(session: Session, release: str) -> List[Dict[str, Any]]:
+    return [
+        dict(player) for player in session.execute(
+            select(MaddenPlayer.madden_id, MaddenPlayer.full_name, MaddenPlayer.team, MaddenPlayer.position, MaddenPlayer.stats)
+            .where(MaddenPlayer.release == release)
+        ).mappings()
+    ]
+
+
+def extract_rating_candidates(session: Session, release: str, only_missing: bool) -> List[Row]:
+    query = (
+        select(Athlete.id, Athlete.first_name, Athlete.last_name, Athlete.team_id, Position.position_name)
+        .outerjoin(Position, Athlete.position_id == Position.id)
+        .order_by(Athlete.id)
+    )
+    if only_missing:
+        query = query.where(~exists().where(Rating.athlete_id == Athlete.id, Rating.release == release))
+    return session.execute(query).all()
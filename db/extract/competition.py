@@ -1,4 +1,6 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Dict, Iterable, List
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import Session
 
 from db.models import Competition, CompetitionStatus, CompetitionStatusType
@@ -30,4 +32,33 @@ def extract_competition(session: Session, competition_id: int) -> Competition:
     return session.execute(
         select(Competition).filter_by(id=competition_id)
     ).scalars().first()
-    
\ No newline at end of file
+    
+
+
+def extract_finished_competitions(session: Session, event_ids: Iterable[int]) -> Dict[int, int]:
+    rows = session.execute(
+        select(Competition.event_id, Competition.id)
+        .join(CompetitionStatus, Competition.competition_status_id == CompetitionStatus.id)
+        .join(CompetitionStatusType, CompetitionStatus.competition_status_type_id == CompetitionStatusType.id)
+        .filter(
+            Competition.event_id.in_(set(event_ids)),
+            or_(CompetitionStatusType.completed.is_(True), CompetitionStatusType.state == "post"),
+        )
+    ).all()
+    return {event_id: competition_id for event_id, competition_id in rows}
+
+
+def extract_live_competitions(session: Session, kickoff_from: datetime, kickoff_to: datetime) -> List[Competition]:
+    return session.execute(
+        select(Competition)
+        .join(CompetitionStatus, Competition.competition_status_id == CompetitionStatus.id)
+        .join(CompetitionStatusType, CompetitionStatus.competition_status_type_id == CompetitionStatusType.id)
+        .filter(or_(
+            CompetitionStatusType.state == "in",
+            and_(
+                CompetitionStatusType.state == "pre",
+                Competition.date >= kickoff_from,
+                Competition.date <= kickoff_to,
+            ),
+        ))
+    ).scalars().all()
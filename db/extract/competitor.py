@@ -1,3 +1,4 @@
+from typing import Dict
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -10,4 +11,11 @@ def extract_competitor(
     return session.execute(select(Competitor).filter_by(
         is_home=is_home, is_winner=is_winner, score=score, 
         team_id=team_id, event_id=event_id, competition_id=competition_id
-    )).scalars().first()
\ No newline at end of file
+    )).scalars().first()
+
+
+def extract_competition_competitors(session: Session, competition_id: int) -> Dict[int, Competitor]:
+    return {
+        competitor.team_id: competitor
+        for competitor in session.execute(select(Competitor).filter_by(competition_id=competition_id)).scalars()
+    }
\ No newline at end of file
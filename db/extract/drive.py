@@ -1,9 +1,18 @@
+from typing import List, Tuple
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from db.models import Drive
+from db.models import Competition, Drive
 
 def extract_drive(session: Session, drive_id: int) -> Drive:
     return session.execute(
         select(Drive).filter_by(id=drive_id)
-    ).scalars().first()
\ No newline at end of file
+    ).scalars().first()
+
+
+def extract_drives_without_team(session: Session) -> List[Tuple[int, int, int]]:
+    return session.execute(
+        select(Drive.id, Drive.competition_id, Competition.event_id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .where(Drive.team_id.is_(None))
+    ).tuples().all()
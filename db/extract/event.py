@@ -1,9 +1,27 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from db.models import Event
+from db.models import Event, Competition, CompetitionStatus, CompetitionStatusType
 
 def extract_event(session: Session, event_id: int) -> Event:
     return session.execute(
         select(Event).filter_by(id=event_id)
-    ).scalars().first()
\ No newline at end of file
+    ).scalars().first()
+
+
+def extract_week_event_completion(
+    session: Session, season: int, season_type: int, week: int
+) -> Dict[int, Tuple[bool, Optional[str]]]:
+    rows = session.execute(
+        select(Event.id, CompetitionStatusType.completed, CompetitionStatusType.state)
+        .outerjoin(Competition, Competition.event_id == Event.id)
+        .outerjoin(CompetitionStatus, Competition.competition_status_id == CompetitionStatus.id)
+        .outerjoin(CompetitionStatusType, CompetitionStatus.competition_status_type_id == CompetitionStatusType.id)
+        .filter(Event.season == season, Event.season_type == season_type, Event.week == week)
+    ).all()
+    return {event_id: (bool(completed), state) for event_id, completed, state in rows}
+
+
+def extract_existing_event_ids(session: Session, event_ids: Iterable[int]) -> Set[int]:
+    return set(session.execute(select(Event.id).where(Event.id.in_(set(event_ids)))).scalars())
\ No newline at end of file
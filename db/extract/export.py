@@ -0,0 +1,42 @@
+from typing import Dict, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db.models import Competition, Competitor, Drive, Event, Play, PlayParticipant, Stat
+
+Partition = Tuple[int, int, int]
+
+
+def extract_partition_signatures(session: Session) -> Dict[Partition, Tuple]:
+    partition = (Event.season, Event.season_type, Event.week)
+    queries = [
+        select(*partition, func.count(Event.id), func.coalesce(func.sum(Competition.competition_status_id), 0))
+        .outerjoin(Competition, Competition.event_id == Event.id),
+        select(*partition, func.count(Competitor.id), func.coalesce(func.sum(Competitor.score), 0))
+        .join(Competitor, Competitor.event_id == Event.id),
+        select(*partition, func.count(Drive.id), func.max(Drive.id))
+        .join(Competition, Competition.event_id == Event.id)
+        .join(Drive, Drive.competition_id == Competition.id),
+        select(*partition, func.count(Play.id), func.max(Play.id))
+        .join(Competition, Competition.event_id == Event.id)
+        .join(Drive, Drive.competition_id == Competition.id)
+        .join(Play, Play.drive_id == Drive.id),
+        select(*partition, func.count(PlayParticipant.id), func.max(PlayParticipant.id))
+        .join(Competition, Competition.event_id == Event.id)
+        .join(Drive, Drive.competition_id == Competition.id)
+        .join(Play, Play.drive_id == Drive.id)
+        .join(PlayParticipant, PlayParticipant.play_id == Play.id),
+        select(*partition, func.count(), func.max(Stat.playparticipant_id))
+        .join(Competition, Competition.event_id == Event.id)
+        .join(Drive, Drive.competition_id == Competition.id)
+        .join(Play, Play.drive_id == Drive.id)
+        .join(PlayParticipant, PlayParticipant.play_id == Play.id)
+        .join(Stat, Stat.playparticipant_id == PlayParticipant.id),
+    ]
+
+    signatures: Dict[Partition, list] = {}
+    for position, query in enumerate(queries):
+        for season, season_type, week, *aggregates in session.execute(query.group_by(*partition)):
+            signature = signatures.setdefault((season, season_type, week), [None] * len(queries))
+            signature[position] = tuple(aggregates)
+    return {key: tuple(signature) for key, signature in signatures.items()}
@@ -0,0 +1,8 @@
+from typing import Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.models import RunJournalEntry
+
+def extract_journal_entries(session: Session) -> Set[Tuple[str, str]]:
+    return set(session.execute(select(RunJournalEntry.kind, RunJournalEntry.key)).tuples())
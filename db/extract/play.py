@@ -1,9 +1,31 @@
-from sqlalchemy import select
+from typing import Optional, Tuple, Set
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
-from db.models import Play
+from db.models import Play, Drive
 
 def extract_play(session: Session, play_id: int) -> Play:
     return session.execute(
         select(Play).filter_by(id=play_id)
-    ).scalars().first()
\ No newline at end of file
+    ).scalars().first()
+
+def extract_competition_play_progress(session: Session, competition_id: int) -> Tuple[int, int, Optional[int]]:
+    play_count, last_sequence = session.execute(
+        select(func.count(Play.id), func.coalesce(func.max(Play.sequence_number), 0))
+        .join(Drive, Play.drive_id == Drive.id)
+        .filter(Drive.competition_id == competition_id)
+    ).one()
+    last_drive_id = session.execute(
+        select(Play.drive_id)
+        .join(Drive, Play.drive_id == Drive.id)
+        .filter(Drive.competition_id == competition_id)
+        .order_by(Play.sequence_number.desc())
+        .limit(1)
+    ).scalar()
+    return play_count, last_sequence, last_drive_id
+
+
+def extract_competition_play_ids(session: Session, competition_id: int) -> Set[int]:
+    return set(session.execute(
+        select(Play.id).join(Drive, Play.drive_id == Drive.id).filter(Drive.competition_id == competition_id)
+    ).scalars())
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from db.models import PlayParticipant
 
-def extract_play_participant(session: Session, athlete_id: int, order: int) -> PlayParticipant:
+def extract_play_participant(session: Session, play_id: int, athlete_id: int, order: int) -> PlayParticipant:
     return session.execute(
-        select(PlayParticipant).filter_by(athlete_id=athlete_id, order=order)
-    ).scalars().first()
\ No newline at end of file
+        select(PlayParticipant).filter_by(play_id=play_id, athlete_id=athlete_id, order=order)
+    ).scalars().first()
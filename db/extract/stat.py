@@ -1,18 +1,15 @@
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from db.models import Stat
+from db.models import Stat, StatType
 
-def extract_stat(
-    session: Session, stat_name: str, description: str, 
-    abbreviation: str, stat_value: float, playparticipant_id: int
-) -> Stat:
+def extract_stat(session: Session, stat_type_id: int, playparticipant_id: int) -> Stat:
     return session.execute(
-        select(Stat).filter_by(
-            name=stat_name,
-            description = description,
-            abbreviation = abbreviation,
-            value=stat_value, 
-            playparticipant_id=playparticipant_id
-        )
-    ).scalars().first()
\ No newline at end of file
+        select(Stat).filter_by(stat_type_id=stat_type_id, playparticipant_id=playparticipant_id)
+    ).scalars().first()
+
+
+def extract_stat_type(session: Session, stat_name: str) -> StatType:
+    return session.execute(
+        select(StatType).filter_by(name=stat_name)
+    ).scalars().first()
@@ -0,0 +1,271 @@
+import contextvars
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Optional, Iterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from util import current_season
+
+ESPN_HOST = "sports.core.api.espn.com"
+# Seconds a cached response is served without asking the server again. Payloads of final
+# ESPN games never change, Spotrac pages change during the season and the Madden catalog per release.
+DEFAULT_HOST_TTLS: Dict[str, float] = {
+    ESPN_HOST: 7 * 24 * 3600,
+    "www.spotrac.com": 24 * 3600,
+    "drop-api.ea.com": 7 * 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+# Lifetime of the ESPN payloads that still change: current-season listings and games not final.
+SHORT_TTL = 10 * 60
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Query parameters that do not change the payload and would only split the cache.
+IGNORED_QUERY_PARAMS = {"lang", "region"}
+SEASON_PATH = re.compile(r"/seasons/(\d{4})(?:/|$)")
+EVENT_PATH = re.compile(r"/events/(\d+)(?:/|$)")
+STATUS_PATH = re.compile(r"/events/(\d+)/competitions/\d+/status$")
+
+_MAX_AGE_OVERRIDE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("max_age_override", default=None)
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL into a cache key: lowercase scheme and host, sorted query, default parameters dropped."""
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in IGNORED_QUERY_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+@contextmanager
+def max_cache_age(seconds: float) -> Iterator[None]:
+    """
+    Serve cached responses inside the block only if they are younger than ``seconds``;
+    older ones are revalidated. Use 0 to always revalidate, e.g. for games in progress.
+    """
+    token = _MAX_AGE_OVERRIDE.set(seconds)
+    try:
+        yield
+    finally:
+        _MAX_AGE_OVERRIDE.reset(token)
+
+
+class CachedResponse:
+    """A cached response body with the validators needed to revalidate it."""
+
+    def __init__(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str], fetched_at: float):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP response bodies keyed by normalized URL. Bodies are stored
+    zlib-compressed in a SQLite file, served without a request while younger than
+    their host's TTL, revalidated with ETag/Last-Modified once stale, and evicted
+    least-recently-used first once the cache grows past ``max_bytes``.
+
+    ESPN payloads only get their host's TTL once they cannot change: an event's payloads
+    once a stored status of it is final, other URLs unless they belong to the current
+    season. Until then they get ``short_ttl``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        host_ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        short_ttl: float = SHORT_TTL,
+    ):
+        """
+        Args:
+            path (str): Path of the SQLite cache file.
+            max_bytes (int): Maximum total size of the compressed bodies.
+            host_ttls (Optional[Dict[str, float]]): Freshness lifetime in seconds per host.
+            default_ttl (float): Freshness lifetime for hosts not listed in ``host_ttls``.
+            short_ttl (float): Freshness lifetime of ESPN payloads that may still change.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.host_ttls = {**DEFAULT_HOST_TTLS, **(host_ttls or {})}
+        self.default_ttl = default_ttl
+        self.short_ttl = short_ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # Worker processes of a sharded backfill share the file, so wait out each other's writes.
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS final_events (event_id INTEGER PRIMARY KEY)")
+        self.final_events = {row[0] for row in self.connection.execute("SELECT event_id FROM final_events")}
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def ttl(self, url: str) -> float:
+        override = _MAX_AGE_OVERRIDE.get()
+        if override is not None:
+            return override
+
+        parts = urlsplit(url)
+        ttl = self.host_ttls.get(parts.netloc, self.default_ttl)
+        if parts.netloc == ESPN_HOST:
+            event = EVENT_PATH.search(parts.path)
+            season = SEASON_PATH.search(parts.path)
+            if event:
+                if int(event.group(1)) not in self.final_events:
+                    return min(ttl, self.short_ttl)
+            elif season and int(season.group(1)) >= current_season():
+                return min(ttl, self.short_ttl)
+        return ttl
+
+    def record_status(self, url: str, body: bytes) -> None:
+        """Remember the event of a competition status payload as final once its game is over."""
+        status = STATUS_PATH.search(urlsplit(url).path)
+        if not status:
+            return
+        try:
+            status_type = json.loads(body).get("type", {})
+        except (ValueError, AttributeError):
+            return
+        # Canceled and postponed games are over ("post") without ever being completed.
+        if status_type.get("completed") or status_type.get("state") == "post":
+            event_id = int(status.group(1))
+            with self._lock:
+                self.connection.execute("INSERT OR IGNORE INTO final_events VALUES (?)", (event_id,))
+                self.final_events.add(event_id)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached response for a URL, fresh or stale, or None if it is not cached."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT url, body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        cached_url, body, etag, last_modified, fetched_at = row
+        return CachedResponse(cached_url, zlib.decompress(body), etag, last_modified, fetched_at)
+
+    def is_fresh(self, url: str, response: CachedResponse) -> bool:
+        return time.time() - response.fetched_at < self.ttl(url)
+
+    def record_hit(self, revalidated: bool = False) -> None:
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.hits += 1
+
+    def refresh(self, url: str) -> None:
+        """Mark a cached response as fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, normalize_url(url))
+            )
+
+    def store(self, url: str, final_url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a response body and its validators, evicting least recently used entries if needed."""
+        self.record_status(url, body)
+        key = normalize_url(url)
+        compressed = zlib.compress(body)
+        now = time.time()
+
+        with self._lock:
+            previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, final_url, compressed, len(compressed), etag, last_modified, now, now),
+            )
+            self.total_bytes += len(compressed) - (previous[0] if previous else 0)
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if self.total_bytes <= target:
+                break
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.total_bytes -= size
+            evicted += 1
+        logging.info(f"Evicted {evicted} responses from the HTTP cache ({self.total_bytes} bytes kept).")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "bytes": self.total_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+
+_RESPONSE_CACHE: Optional[ResponseCache] = None
+
+
+def configure_response_cache(path: str, **kwargs) -> ResponseCache:
+    """Enable the on-disk response cache used by the fetchers, replacing any previous one."""
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE:
+        _RESPONSE_CACHE.close()
+    _RESPONSE_CACHE = ResponseCache(path, **kwargs)
+    return _RESPONSE_CACHE
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the response cache, or None when caching is disabled."""
+    return _RESPONSE_CACHE
+
+
+def close_response_cache() -> None:
+    global _RESPONSE_CACHE
+
+    if _RESPONSE_CACHE:
+        logging.info(f"HTTP cache stats: {_RESPONSE_CACHE.stats()}")
+        _RESPONSE_CACHE.close()
+        _RESPONSE_CACHE = None
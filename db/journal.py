@@ -0,0 +1,115 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.models import RunJournalEntry
+from db.load.event import IGNORE_EVENTS
+from db.extract.event import extract_week_event_completion
+from db.extract.competition import extract_finished_competitions
+from db.extract.journal import extract_journal_entries
+
+PHASE = "phase"
+WEEK = "week"
+
+
+def week_key(year: int, season_type: int, week: int) -> str:
+    return f"{year}-{season_type}-{week:02d}"
+
+
+class RunJournal:
+    """
+    Record the units of initialization work that completed, in the database they were
+    written to, so a restarted run skips them without a single request. Units are whole
+    phases and (year, season type, week) event units. A week is only complete once every
+    one of its events is stored with a finished competition, so weeks with games still to
+    be played are fetched again on the next run. Within a week being fetched again, events
+    already stored are skipped by ``create_events`` itself.
+    """
+
+    def __init__(self, SessionLocal: sessionmaker):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for sessions on the database being initialized.
+        """
+        self.SessionLocal = SessionLocal
+        self._lock = threading.Lock()
+        with SessionLocal() as session:
+            self.entries = extract_journal_entries(session)
+
+    def is_done(self, kind: str, key: str) -> bool:
+        with self._lock:
+            return (kind, key) in self.entries
+
+    def record(self, kind: str, keys: Iterable[str], session: Optional[Session] = None) -> None:
+        """Record units as completed and commit, through the given session or a new one."""
+        with self._lock:
+            new_keys = sorted({key for key in keys if (kind, key) not in self.entries})
+        if not new_keys:
+            return
+
+        completed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = [{"kind": kind, "key": key, "completed_at": completed_at} for key in new_keys]
+        if session is None:
+            with self.SessionLocal() as session:
+                session.execute(insert(RunJournalEntry).on_conflict_do_nothing(), rows)
+                session.commit()
+        else:
+            session.execute(insert(RunJournalEntry).on_conflict_do_nothing(), rows)
+            session.commit()
+
+        with self._lock:
+            self.entries.update((kind, key) for key in new_keys)
+
+    def phase_done(self, phase: str) -> bool:
+        return self.is_done(PHASE, phase)
+
+    def finish_phase(self, phase: str) -> None:
+        self.record(PHASE, [phase])
+        logging.info(f"Run journal: phase {phase} completed.")
+
+    def week_done(self, year: int, season_type: int, week: int) -> bool:
+        return self.is_done(WEEK, week_key(year, season_type, week))
+
+    def finish_week(
+        self,
+        session: Session,
+        year: int,
+        season_type: int,
+        week: int,
+        event_ids: Optional[Iterable[int]] = None,
+    ) -> bool:
+        """
+        Journal a week if all its events are stored and finished.
+
+        Args:
+            session (Session): SQLAlchemy session object.
+            year (int): The season.
+            season_type (int): The season type.
+            week (int): The week.
+            event_ids (Optional[Iterable[int]]): IDs of every event of the week, as listed by ESPN.
+                Defaults to the week's stored events.
+
+        Returns:
+            bool: True if the week is complete.
+        """
+        if event_ids is None:
+            event_ids = extract_week_event_completion(session, year, season_type, week)
+        event_ids = set(event_ids) - IGNORE_EVENTS
+
+        finished = extract_finished_competitions(session, event_ids)
+        complete = event_ids <= set(finished)
+        if complete:
+            self.record(WEEK, [week_key(year, season_type, week)], session)
+        return complete
+
+    def clear(self) -> None:
+        """Forget every completed unit, so the next run starts from the beginning."""
+        with self.SessionLocal() as session:
+            session.execute(delete(RunJournalEntry))
+            session.commit()
+        with self._lock:
+            self.entries.clear()
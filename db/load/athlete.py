@@ -1,37 +1,39 @@
-import random
-from typing import Dict, Any, List
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 
-from db.util import fetch_page
-from db.models import Athlete, Position, TeamHistory
+from db.util import resolve_ref
+from db.models import Athlete, AthleteEnrichment, Position, TeamHistory
+from db.entity_cache import get_entity_cache
 from db.load.contract import get_athlete_contracts, TEAMS_LOOKUP
-from db.load.athlete_rating import create_player_ratings
 from util import get_id_from_url
-from db.extract.athlete import extract_athlete, extract_athlete_position, extract_team_history
+from db.extract.athlete import extract_athlete_position, extract_team_history_keys
 
-ATHLETE_CACHE = {}
 
-def fetch_team_history(session: Session, athlete_id: int, proxies: List[str]) -> List[TeamHistory]:
+def fetch_team_history(
+    session: Session, athlete_id: int, statistics_log_ref: Optional[Dict[str, Any]] = None
+) -> List[TeamHistory]:
     """
-    Fetch and process an athlete's team history from the API using proxies.
+    Fetch and process an athlete's team history from the API.
 
     Args:
         session (Session): SQLAlchemy session object.
         athlete_id (int): ID of the athlete.
-        proxies (List[str]): List of proxies to use for the requests.
+        statistics_log_ref (Optional[Dict[str, Any]]): The athlete's ``statisticslog`` reference,
+            possibly already expanded. Built from the athlete ID when not given.
 
     Returns:
         List[TeamHistory]: List of TeamHistory objects to persist in the database.
     """
     statistics_log_url = f"https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/athletes/{athlete_id}/statisticslog"
-    proxy = {"http": random.choice(proxies)} if proxies else None
-
-    statistics_log = fetch_page(statistics_log_url, proxy=proxy)
+    statistics_log = resolve_ref(statistics_log_ref or {"$ref": statistics_log_url})
     history_entries = []
 
     if not statistics_log:
         return history_entries
 
+    stored_history = extract_team_history_keys(session, athlete_id)
+
     for entry in statistics_log.get("entries", []):
         season_url = entry["season"]["$ref"]
         season_year = int(get_id_from_url(season_url))
@@ -41,11 +43,8 @@ def fetch_team_history(session: Session, athlete_id: int, proxies: List[str]) ->
                 team_url = stat["team"]["$ref"]
                 team_id = int(get_id_from_url(team_url))
 
-                existing_history = extract_team_history(
-                    session, athlete_id=athlete_id, team_id=team_id, season=season_year
-                )
-
-                if not existing_history:
+                if (team_id, season_year) not in stored_history:
+                    stored_history.add((team_id, season_year))
                     history_entries.append(
                         TeamHistory(athlete_id=athlete_id, team_id=team_id, season=season_year)
                     )
@@ -64,7 +63,7 @@ def fetch_or_create_position(session: Session, position_name: str) -> Position:
     Returns:
         Position: The fetched or newly created Position object.
     """
-    position = extract_athlete_position(position_name)
+    position = extract_athlete_position(session, position_name)
     
     if not position:
         position = Position(position_name=position_name)
@@ -74,86 +73,113 @@ def fetch_or_create_position(session: Session, position_name: str) -> Position:
     return position
 
 
-def create_athlete(session: Session, athlete_data: Dict[str, Any], proxies: List[str]) -> Athlete:
+def get_position_id(session: Session, position_name: str) -> int:
+    """Return the ID of a position, from the entity cache when possible, creating the position if needed."""
+    cache = get_entity_cache()
+    position_id = cache.get("position", position_name)
+    if position_id is None:
+        position_id = fetch_or_create_position(session, position_name).id
+        cache.put("position", position_name, position_id)
+    return position_id
+
+
+def create_athlete_object(session: Session, athlete_data: Dict[str, Any]) -> Athlete:
     """
-    Create and persist an Athlete object in the database with proxy support.
+    Build an Athlete object from its ESPN payload alone, without ratings, team history or contracts.
 
     Args:
-        session (Session): SQLAlchemy session object.
+        session (Session): SQLAlchemy session object, used to get or create the position.
         athlete_data (Dict[str, Any]): Raw data about the athlete from the API.
-        proxies (List[str]): List of proxies to use for the requests.
 
     Returns:
-        Athlete: The created Athlete object.
+        Athlete: The new, transient Athlete object.
     """
-    athlete_id = int(athlete_data.get("id", None))
-    
-    if athlete_id in ATHLETE_CACHE:
-        return ATHLETE_CACHE[athlete_id]
-
     athlete_name = athlete_data["fullName"]
     first_name, *last_name = athlete_name.split(" ")
     last_name = " ".join(last_name)
     position_name = athlete_data.get("position", {}).get("abbreviation", "")
     team_id = get_id_from_url(athlete_data.get("team", {}).get("$ref", ""))
     team_id = int(team_id) if team_id else None
-    position = fetch_or_create_position(session, position_name)
-
-    athlete = Athlete(
+    return Athlete(
         first_name=first_name,
         last_name=last_name,
-        id=athlete_id,
+        id=int(athlete_data["id"]),
         age=int(athlete_data.get("age", 0)),
         height=int(athlete_data.get("height", 0)),
         weight=int(athlete_data.get("weight", 0)),
-        position_id=position.id,
+        position_id=get_position_id(session, position_name),
         salary=float(athlete_data.get("salary", 0) or 0),
         is_practice_squad=athlete_data.get("status", {}).get("name", "") == "Practice Squad",
         team_id=team_id,
     )
 
-    ratings = create_player_ratings(athlete_name)
-    athlete.ratings.extend(ratings)
 
-    history_entries = fetch_team_history(session, athlete_id, proxies)
+def attach_athlete_details(session: Session, athlete: Athlete, athlete_data: Dict[str, Any]) -> None:
+    """
+    Add an athlete's team history and contracts. The statistics log is fetched unless the
+    payload already carries it. Madden ratings are matched for all athletes at once from
+    the ratings catalog (see ``db.load.athlete_rating.refresh_ratings``).
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        athlete (Athlete): The athlete to complete.
+        athlete_data (Dict[str, Any]): The athlete's payload, with at least ``fullName``.
+    """
+    athlete_name = athlete_data["fullName"]
+
+    history_entries = fetch_team_history(session, athlete.id, athlete_data.get("statisticslog"))
     athlete.teamhistory.extend(history_entries)
 
     for team_history in history_entries:
         team_name = TEAMS_LOOKUP.get(str(team_history.team_id), "")
-        contracts = get_athlete_contracts(athlete_name, team_name, team_history.season)
+        contracts = get_athlete_contracts(team_name, team_history.season, athlete_name)
         athlete.contracts.extend(contracts)
 
+
+def create_athlete(session: Session, athlete_data: Dict[str, Any]) -> Athlete:
+    """
+    Create and persist an Athlete object in the database.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        athlete_data (Dict[str, Any]): Raw data about the athlete from the API.
+
+    Returns:
+        Athlete: The created Athlete object.
+    """
+    athlete_id = int(athlete_data.get("id", None))
+    cache = get_entity_cache()
+
+    if cache.get("athlete", athlete_id) is not None:
+        return session.get(Athlete, athlete_id)
+
+    athlete = create_athlete_object(session, athlete_data)
+    attach_athlete_details(session, athlete, athlete_data)
+
     session.add(athlete)
     session.commit()
 
-    ATHLETE_CACHE[athlete_id] = athlete
+    cache.put("athlete", athlete_id, athlete_id)
     return athlete
 
 
-def create_athletes(session: Session, athlete_urls: List[str], proxies: List[str]) -> List[Athlete]:
+def create_core_athlete(session: Session, athlete_data: Dict[str, Any]) -> Athlete:
     """
-    Create multiple athletes and associate them with their teams, using proxy support.
+    Create and persist an Athlete object from its ESPN payload alone and queue its team
+    history and contracts for enrichment (see ``db.load.athlete_enrichment``), so the
+    play being ingested does not wait on those requests.
 
     Args:
         session (Session): SQLAlchemy session object.
-        athlete_urls (List[str]): List of URLs containing athlete data.
-        proxies (List[str]): List of proxies to use for the requests.
+        athlete_data (Dict[str, Any]): Raw data about the athlete from the API.
 
     Returns:
-        List[Athlete]: List of created Athlete objects.
+        Athlete: The created Athlete object.
     """
-    athletes = []
-
-    for athlete_url in athlete_urls:
-        athlete_id = int(get_id_from_url(athlete_url))
-        athlete = extract_athlete(id=athlete_id)
-
-        if not athlete:
-            proxy = {"http": random.choice(proxies)} if proxies else None
-            athlete_data = fetch_page(athlete_url, proxy=proxy)
-            if athlete_data:
-                athlete = create_athlete(session, athlete_data, proxies)
-
-        athletes.append(athlete)
+    athlete = create_athlete_object(session, athlete_data)
+    session.add(athlete)
+    session.add(AthleteEnrichment(athlete_id=athlete.id, queued_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+    session.commit()
 
-    return athletes
+    get_entity_cache().put("athlete", athlete.id, athlete.id)
+    return athlete
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Set
+from sqlalchemy.orm import sessionmaker
+
+from db.retry import DEAD_LETTERS
+from db.scheduler import get_scheduler
+from db.util import fetch_page_async, iter_ref_pages_async
+from db.load.athlete import create_athlete
+from db.load.athlete_enrichment import STATISTICS_LOG_URL
+from db.extract.athlete import extract_existing_athlete_ids
+from util import get_id_from_url
+
+ATHLETE_PAGE_SIZE = 500
+# Athletes hydrated at once; the request scheduler still bounds the requests in flight.
+ATHLETE_BACKFILL_WORKERS = 32
+
+
+class AthleteBackfill:
+    """
+    Create every athlete of a paginated ESPN collection that is not stored yet. Reference
+    pages are streamed one at a time: the athletes of a page already stored are skipped
+    with a single query, and the others are hydrated, payload then statistics log, by a
+    bounded pool of workers and stored on a single writer thread.
+
+    Athletes whose requests fail are not stored; play ingest creates them when they appear.
+    """
+
+    def __init__(
+        self, SessionLocal: sessionmaker, workers: int = ATHLETE_BACKFILL_WORKERS, page_size: int = ATHLETE_PAGE_SIZE
+    ):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for database sessions.
+            workers (int): Number of athletes hydrated concurrently.
+            page_size (int): Number of references per collection page.
+        """
+        self.SessionLocal = SessionLocal
+        self.workers = workers
+        self.page_size = page_size
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def _existing_ids(self, athlete_ids: List[int]) -> Set[int]:
+        with self.SessionLocal() as session:
+            return extract_existing_athlete_ids(session, athlete_ids)
+
+    def store_athlete(self, athlete_data: Dict[str, Any]) -> None:
+        with self.SessionLocal() as session:
+            create_athlete(session, athlete_data)
+
+    async def hydrate(self, http: aiohttp.ClientSession, athlete_url: str) -> Dict[str, Any]:
+        """
+        Fetch an athlete's payload with its statistics log expanded, so storing it makes no request.
+
+        Returns:
+            Dict[str, Any]: The athlete payload, or an empty dictionary if a request failed.
+        """
+        athlete_data = await fetch_page_async(http, athlete_url)
+        if not athlete_data or DEAD_LETTERS.failed_for(athlete_url):
+            return {}
+
+        statistics_log_url = (
+            (athlete_data.get("statisticslog") or {}).get("$ref")
+            or STATISTICS_LOG_URL.format(athlete_id=athlete_data["id"])
+        )
+        statistics_log = await fetch_page_async(http, statistics_log_url)
+        if DEAD_LETTERS.failed_for(statistics_log_url):
+            return {}
+
+        return {**athlete_data, "statisticslog": {"$ref": statistics_log_url, **statistics_log}}
+
+    async def run(self, collection_url: str) -> int:
+        """
+        Create the athletes of the collection that are not stored yet.
+
+        Args:
+            collection_url (str): URL of the paginated athletes collection.
+
+        Returns:
+            int: Number of athletes created.
+        """
+        loop = asyncio.get_running_loop()
+        connector = aiohttp.TCPConnector(limit=get_scheduler().max_in_flight)
+        workers = asyncio.Semaphore(self.workers)
+        seen_ids: Set[int] = set()
+
+        async def hydrate(athlete_url: str) -> Dict[str, Any]:
+            async with workers:
+                return await self.hydrate(http, athlete_url)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-athletes") as executor:
+            async with aiohttp.ClientSession(connector=connector) as http:
+                async for athlete_urls in iter_ref_pages_async(http, collection_url, limit=self.page_size):
+                    page_urls = {int(get_id_from_url(url)): url for url in athlete_urls}
+                    page_urls = {athlete_id: url for athlete_id, url in page_urls.items() if athlete_id not in seen_ids}
+                    seen_ids.update(page_urls)
+                    if not page_urls:
+                        continue
+
+                    existing_ids = await loop.run_in_executor(executor, self._existing_ids, list(page_urls))
+                    self.skipped += len(existing_ids)
+                    new_urls = [url for athlete_id, url in page_urls.items() if athlete_id not in existing_ids]
+
+                    for hydrated in asyncio.as_completed([hydrate(url) for url in new_urls]):
+                        athlete_data = await hydrated
+                        if not athlete_data:
+                            self.failed += 1
+                            continue
+                        try:
+                            await loop.run_in_executor(executor, self.store_athlete, athlete_data)
+                            self.created += 1
+                        except Exception as e:
+                            self.failed += 1
+                            logging.error(f"Failed to store athlete {athlete_data.get('id')}. Details: {e}")
+
+        logging.info(f"Created {self.created} athletes, {self.skipped} already stored, {self.failed} failed.")
+        return self.created
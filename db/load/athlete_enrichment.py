@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Athlete, AthleteEnrichment
+from db.retry import DEAD_LETTERS
+from db.scheduler import get_scheduler
+from db.util import fetch_page_async
+from db.load.athlete import attach_athlete_details
+from db.extract.athlete import extract_athlete, extract_pending_enrichments
+
+STATISTICS_LOG_URL = "https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/athletes/{athlete_id}/statisticslog"
+ENRICHMENT_BATCH_SIZE = 100
+
+
+class AthleteEnricher:
+    """
+    Work through the athletes queued for enrichment by play ingest: fetch the athletes'
+    statistics logs concurrently, then store each one's team history and contracts on a
+    single writer thread and take the athlete off the queue. Athletes whose requests fail
+    stay queued for the next run. Ratings are matched afterwards for all athletes at once
+    (see ``db.load.athlete_rating.refresh_ratings``).
+    """
+
+    def __init__(self, SessionLocal: sessionmaker, batch_size: int = ENRICHMENT_BATCH_SIZE):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for database sessions.
+            batch_size (int): Number of athletes fetched concurrently.
+        """
+        self.SessionLocal = SessionLocal
+        self.batch_size = batch_size
+        self.enriched = 0
+
+    async def fetch_details(self, http: aiohttp.ClientSession, athlete: Athlete) -> Dict[str, Any]:
+        """
+        Fetch what ``attach_athlete_details`` needs for an athlete, so storing it makes no request.
+
+        Returns:
+            Dict[str, Any]: A partial athlete payload, or an empty dictionary if a request failed.
+        """
+        athlete_name = " ".join(name for name in (athlete.first_name, athlete.last_name) if name)
+        statistics_log_url = STATISTICS_LOG_URL.format(athlete_id=athlete.id)
+
+        statistics_log = await fetch_page_async(http, statistics_log_url)
+        if DEAD_LETTERS.failed_for(statistics_log_url):
+            return {}
+
+        return {
+            "fullName": athlete_name,
+            "statisticslog": {"$ref": statistics_log_url, **statistics_log},
+        }
+
+    def store_details(self, athlete_id: int, athlete_data: Dict[str, Any]) -> None:
+        with self.SessionLocal() as session:
+            athlete = extract_athlete(session, athlete_id)
+            attach_athlete_details(session, athlete, athlete_data)
+            session.execute(delete(AthleteEnrichment).where(AthleteEnrichment.athlete_id == athlete_id))
+            session.commit()
+
+    def _pending(self, after_athlete_id: int) -> List[Athlete]:
+        with self.SessionLocal() as session:
+            athletes = extract_pending_enrichments(session, after_athlete_id, self.batch_size)
+            session.expunge_all()
+            return athletes
+
+    async def run(self) -> int:
+        """
+        Enrich every queued athlete.
+
+        Returns:
+            int: Number of athletes enriched.
+        """
+        loop = asyncio.get_running_loop()
+        connector = aiohttp.TCPConnector(limit=get_scheduler().max_in_flight)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-enricher") as executor:
+            async with aiohttp.ClientSession(connector=connector) as http:
+                last_athlete_id = 0
+                while True:
+                    athletes = await loop.run_in_executor(executor, self._pending, last_athlete_id)
+                    if not athletes:
+                        break
+                    last_athlete_id = athletes[-1].id
+
+                    details = await asyncio.gather(*(self.fetch_details(http, athlete) for athlete in athletes))
+                    for athlete, athlete_data in zip(athletes, details):
+                        if not athlete_data:
+                            logging.warning(f"Could not fetch the details of athlete {athlete.id}, it stays queued.")
+                            continue
+                        try:
+                            await loop.run_in_executor(executor, self.store_details, athlete.id, athlete_data)
+                            self.enriched += 1
+                        except Exception as e:
+                            logging.error(f"Failed to enrich athlete {athlete.id}. Details: {e}")
+
+        if self.enriched:
+            logging.info(f"Enriched {self.enriched} athletes.")
+        return self.enriched
@@ -1,69 +1,198 @@
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import logging
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.orm import Session
 
-from db.models import Rating
+from db.models import MaddenPlayer, Rating
 from db.util import fetch_page
+from db.load.contract import TEAMS_LOOKUP
+from db.extract.athlete_rating import extract_madden_players, extract_madden_release_exists, extract_rating_candidates
+from util import PlayerIndex
 
-BASE_PLAYER_SEARCH_URL = 'https://drop-api.ea.com/rating/madden-nfl?locale=en&limit=100&search={player_name}'
+BASE_CATALOG_URL = 'https://drop-api.ea.com/rating/madden-nfl?locale=en&limit={limit}&offset={offset}'
+CATALOG_PAGE_SIZE = 100
 
-def fetch_player_data(player_name: str) -> Optional[Dict]:
+# The Madden release whose ratings are stored. The catalog endpoint serves the current
+# release, so this is changed when EA ships a new one, and ratings are then refreshed.
+MADDEN_RELEASE = "madden-nfl-25"
+# Athletes whose ratings are replaced per statement.
+RATING_CHUNK_SIZE = 500
+
+# Madden positions by the ESPN position group they belong to, to tell apart players sharing a name.
+POSITION_GROUPS = {
+    "HB": "RB", "LE": "DE", "RE": "DE", "LEDG": "DE", "REDG": "DE", "LOLB": "LB", "ROLB": "LB",
+    "MLB": "LB", "ILB": "LB", "OLB": "LB", "MIKE": "LB", "WILL": "LB", "SAM": "LB", "FS": "S",
+    "SS": "S", "LT": "OT", "RT": "OT", "T": "OT", "LG": "G", "RG": "G", "OG": "G", "NT": "DT", "PK": "K",
+}
+
+
+def position_group(position: Optional[str]) -> str:
+    """Return the position group of an ESPN or Madden position abbreviation, e.g. "LB" for "ROLB"."""
+    position = (position or "").upper()
+    return POSITION_GROUPS.get(position, position)
+
+
+def _label(value: Any) -> str:
+    return (value.get("label") or value.get("shortLabel") or "") if isinstance(value, dict) else str(value or "")
+
+
+def parse_catalog_player(item: Dict[str, Any], release: str) -> Dict[str, Any]:
     """
-    Fetch player data from the Madden API based on the given player name.
+    Parse a player of the Madden ratings catalog into a ``MaddenPlayer`` row.
 
     Args:
-        player_name (str): The name of the player to search for.
+        item (Dict[str, Any]): A player of a catalog page.
+        release (str): The Madden release the catalog belongs to.
 
     Returns:
-        Optional[Dict]: The JSON response containing player data, or None if no data is found.
+        Dict[str, Any]: The row, with the player's ratings as a name to value mapping.
     """
-    first_name = ''
-    if '.' in player_name:
-        parts = player_name.split(' ')
-        if len(parts) > 1:
-            first_name, last_name = parts[0], parts[1]
-            player_name = last_name
-
-    url = BASE_PLAYER_SEARCH_URL.format(player_name=player_name)
-    json_response = fetch_page(url)
-
-    if not json_response.get("items"):
-        logging.warning(f'No Madden data/ratings found for "{player_name}" at: {url}')
-        return None
-
-    items = json_response["items"]
-    if len(items) > 1:
-        if first_name:
-            for player in items:
-                if player.get('firstName') == first_name:
-                    return {'items': [player]}
-        logging.warning(f'Multiple players found for "{player_name}" at {url}')
-        return None
+    position = item.get("position")
+    return {
+        "release": release,
+        "madden_id": str(item["id"]),
+        "full_name": " ".join(name for name in (item.get("firstName"), item.get("lastName")) if name),
+        "team": _label(item.get("team")),
+        "position": position.get("shortLabel", "") if isinstance(position, dict) else str(position or ""),
+        "stats": {
+            stat_name: stat_data["value"]
+            for stat_name, stat_data in (item.get("stats") or {}).items()
+            if isinstance(stat_data, dict) and stat_data.get("value") is not None
+        },
+    }
+
+
+def fetch_madden_catalog() -> List[Dict[str, Any]]:
+    """
+    Fetch every player of the Madden ratings catalog, page by page.
 
-    return json_response
+    Returns:
+        List[Dict[str, Any]]: The players, or an empty list if a page could not be fetched,
+        since a partial catalog would leave athletes unrated.
+    """
+    players = []
+    offset = 0
+    while True:
+        url = BASE_CATALOG_URL.format(limit=CATALOG_PAGE_SIZE, offset=offset)
+        page = fetch_page(url)
+        if "items" not in page:
+            logging.error(f"Could not fetch the Madden catalog page at {url}.")
+            return []
+
+        players.extend(page["items"])
+        offset += CATALOG_PAGE_SIZE
+        if len(page["items"]) < CATALOG_PAGE_SIZE or offset >= page.get("totalItems", float("inf")):
+            return players
+
+
+def load_madden_catalog(session: Session, release: str = MADDEN_RELEASE, refresh: bool = False) -> int:
+    """
+    Fetch the Madden ratings catalog and store it under a release, unless the release is
+    already stored. The catalog is replaced as a whole, so a stored release is complete.
 
+    Args:
+        session (Session): SQLAlchemy session object.
+        release (str): The Madden release of the catalog.
+        refresh (bool): Whether to fetch the catalog again even if the release is stored.
 
-def create_player_ratings(player_name: str) -> List[Rating]:
+    Returns:
+        int: Number of players stored, 0 if the catalog was not fetched.
     """
-    Create a list of Rating objects for the specified player.
+    if not refresh and extract_madden_release_exists(session, release):
+        return 0
+
+    players = {}
+    for item in fetch_madden_catalog():
+        if item.get("id") is not None:
+            player = parse_catalog_player(item, release)
+            players[player["madden_id"]] = player
+    if not players:
+        return 0
+
+    session.execute(delete(MaddenPlayer).where(MaddenPlayer.release == release))
+    session.execute(insert(MaddenPlayer), list(players.values()))
+    session.commit()
+    logging.info(f"Stored {len(players)} players of the {release} Madden catalog.")
+    return len(players)
+
+
+def match_madden_player(
+    index: PlayerIndex, player_name: str, team_name: Optional[str], position: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Find an athlete in a Madden catalog indexed by name (see ``PlayerIndex.find``). Players
+    sharing the athlete's name are told apart by team, then by position group. The catalog
+    only holds rostered players, so names are only matched fuzzily for athletes with a team;
+    that keeps a pass over every retired athlete fast. A fuzzy match must also be on the
+    athlete's team, and in its position group when known, since a retired athlete keeps
+    their last team and would otherwise take a similarly named player's ratings.
 
     Args:
-        player_name (str): The name of the player.
+        index (PlayerIndex): The catalog players, indexed on ``full_name``.
+        player_name (str): The athlete's name.
+        team_name (Optional[str]): The athlete's team, if known.
+        position (Optional[str]): The athlete's position abbreviation, if known.
 
     Returns:
-        List[Rating]: A list of Rating objects containing the player's stats and ratings.
+        Optional[Dict[str, Any]]: The catalog player, or None if no single player matches.
     """
-    player_data = fetch_player_data(player_name)
-    if not player_data:
-        return []
+    same_team = lambda player: team_name and player["team"] == team_name
+    same_position = lambda player: position and position_group(player["position"]) == position_group(position)
+
+    candidates = index.find(player_name, fuzzy=False)
+    if not candidates and team_name:
+        candidates = [
+            player for player in index.find(player_name)
+            if same_team(player) and (not position or same_position(player))
+        ]
+
+    for narrowing in (same_team, same_position):
+        if len(candidates) > 1:
+            candidates = [player for player in candidates if narrowing(player)] or candidates
 
-    player_stats = player_data["items"][0].get("stats", {})
-    ratings = []
+    return candidates[0] if len(candidates) == 1 else None
 
-    for stat_name, stat_data in player_stats.items():
-        rating_value = stat_data.get("value")
-        if rating_value is not None:
-            ratings.append(Rating(rating_type=stat_name, rating=rating_value))
-        else:
-            logging.warning(f'Invalid rating value for stat "{stat_name}".')
 
-    return ratings
+def refresh_ratings(session: Session, release: str = MADDEN_RELEASE, only_missing: bool = True) -> int:
+    """
+    Match athletes against a stored Madden catalog in one pass and replace their ratings
+    with the release's, in bulk and without any request. Athletes that match no single
+    catalog player keep the ratings they have.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        release (str): The Madden release whose catalog is used.
+        only_missing (bool): Whether to only rate the athletes without ratings of the release.
+
+    Returns:
+        int: Number of athletes rated.
+    """
+    players = extract_madden_players(session, release)
+    if not players:
+        return 0
+    index = PlayerIndex(players, name_key="full_name")
+
+    ratings: Dict[int, List[Dict[str, Any]]] = {}
+    for athlete_id, first_name, last_name, team_id, position in extract_rating_candidates(session, release, only_missing):
+        player_name = " ".join(name for name in (first_name, last_name) if name)
+        player = match_madden_player(index, player_name, TEAMS_LOOKUP.get(str(team_id)), position)
+        if player:
+            ratings[athlete_id] = [
+                {"athlete_id": athlete_id, "rating_type": stat_name, "rating": value, "release": release}
+                for stat_name, value in player["stats"].items()
+            ]
+
+    athlete_ids = sorted(ratings)
+    for start in range(0, len(athlete_ids), RATING_CHUNK_SIZE):
+        chunk = athlete_ids[start:start + RATING_CHUNK_SIZE]
+        # Ratings of the release and those found by searching for the athlete are replaced.
+        session.execute(delete(Rating).where(
+            Rating.athlete_id.in_(chunk), or_(Rating.release == release, Rating.release.is_(None))
+        ))
+        rows = [rating for athlete_id in chunk for rating in ratings[athlete_id]]
+        if rows:
+            session.execute(insert(Rating), rows)
+    session.commit()
+
+    logging.info(f"Rated {len(ratings)} athletes from the {release} Madden catalog.")
+    return len(ratings)
@@ -0,0 +1,149 @@
+import logging
+from typing import Dict, Any, Optional, Tuple, Union
+from sqlalchemy import Table, select, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from db.models import Base
+from db.entity_cache import get_entity_cache
+from db.summary import refresh_written_summaries
+
+# Queued rows by (table, overwrite on conflict), each keyed by primary key.
+Rows = Dict[Tuple[Table, bool], Dict[Any, Dict[str, Any]]]
+
+
+def merge_rows(rows: Rows, more_rows: Rows) -> Rows:
+    """Add the rows of ``more_rows`` to ``rows``; a key present in both keeps the later row."""
+    for table_update, keyed_rows in more_rows.items():
+        rows.setdefault(table_update, {}).update(keyed_rows)
+    return rows
+
+
+def _write(session: Session, table: Table, rows: list, update: bool) -> None:
+    statement = insert(table)
+    primary_key = [column.name for column in table.primary_key]
+    if update:
+        # Only primary key conflicts are overwritten; a natural-key conflict still fails loudly.
+        statement = statement.on_conflict_do_update(
+            index_elements=primary_key,
+            set_={column.name: statement.excluded[column.name] for column in table.columns if not column.primary_key},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing()
+    session.execute(statement, rows)
+
+
+def write_rows(session: Session, rows: Rows) -> int:
+    """
+    Write queued rows in foreign-key order and commit, all in one transaction. Nothing is
+    written if any statement fails. The summaries of the competitions written are then
+    refreshed (see ``db.summary``).
+
+    Args:
+        session (Session): SQLAlchemy session the rows are written and committed through.
+        rows (Rows): The rows, as collected by a ``BulkWriter``.
+
+    Returns:
+        int: Number of rows written, skipped conflicts included.
+    """
+    try:
+        for table in Base.metadata.sorted_tables:
+            for update in (False, True):
+                table_rows = rows.get((table, update))
+                if table_rows:
+                    _write(session, table, list(table_rows.values()), update)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    get_entity_cache().record_rows(rows)
+    refresh_written_summaries(session, rows)
+    return sum(len(table_rows) for table_rows in rows.values())
+
+
+class BulkWriter:
+    """
+    Collect the rows of one unit of work, usually an event, and write them in a single
+    transaction with multi-row ``INSERT ... ON CONFLICT`` statements instead of one
+    commit per row. Rows are ORM objects or plain dictionaries. Tables are written in
+    foreign-key order, so rows can be added in any order.
+
+    Rows without a primary key get one allocated from the table's current maximum when
+    they are added, so children can reference them before anything is written. This
+    relies on the database having a single writer, which the ingest paths guarantee.
+    """
+
+    def __init__(self, session: Session):
+        """
+        Args:
+            session (Session): SQLAlchemy session the rows are written and committed through.
+        """
+        self.session = session
+        self.rows: Rows = {}
+        self.next_ids: Dict[Table, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.rows.values())
+
+    def next_id(self, table: Table) -> int:
+        """Allocate a primary key for a new row of a table with an integer ``id`` column."""
+        if table not in self.next_ids:
+            self.next_ids[table] = (self.session.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+        allocated = self.next_ids[table]
+        self.next_ids[table] += 1
+        return allocated
+
+    def add(self, row: Union[Base, Dict[str, Any]], table: Optional[Table] = None, update: bool = False) -> Any:
+        """
+        Queue a row for writing. A row whose primary key or natural key is already stored is
+        skipped, or overwrites the stored one on a primary key conflict if ``update`` is set.
+        Adding the same key twice keeps the last row.
+
+        Args:
+            row (Union[Base, Dict[str, Any]]): A transient ORM object or a dictionary of column values.
+            table (Optional[Table]): The row's table, required for dictionaries.
+            update (bool): Overwrite the stored row on a primary key conflict.
+
+        Returns:
+            Any: The row's primary key, a tuple for composite keys.
+        """
+        if isinstance(row, Base):
+            table = row.__table__
+            row = {column.name: getattr(row, column.key) for column in row.__mapper__.columns}
+        else:
+            row = {column.name: row.get(column.name) for column in table.columns}
+
+        primary_key = [column.name for column in table.primary_key]
+        if primary_key == ["id"] and row["id"] is None:
+            row["id"] = self.next_id(table)
+
+        key = tuple(row[name] for name in primary_key)
+        self.rows.setdefault((table, update), {})[key] = row
+        return key[0] if len(key) == 1 else key
+
+    def take(self) -> Rows:
+        """
+        Hand the queued rows over to be written elsewhere, e.g. by a pipeline's writer stage.
+        The allocated primary keys stay reserved, so rows added afterwards never reuse them
+        even before the handed-over rows are written.
+        """
+        rows, self.rows = self.rows, {}
+        return rows
+
+    def flush(self) -> int:
+        """
+        Write every queued row and commit, all in one transaction. Nothing is written if
+        any statement fails.
+
+        Returns:
+            int: Number of rows written, skipped conflicts included.
+        """
+        try:
+            written = write_rows(self.session, self.rows)
+        finally:
+            self.rows.clear()
+            self.next_ids.clear()
+
+        logging.debug(f"Bulk wrote {written} rows.")
+        return written
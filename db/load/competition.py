@@ -3,11 +3,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from db.models import Competition, CompetitionStatus, CompetitionStatusType
-from db.util import fetch_all_items, fetch_page
-from db.load.venue import create_venue
-from db.load.competitor import create_competitors
-from db.load.drive import create_drives
-from db.load.official import create_officials
+from db.util import resolve_items, resolve_ref
+from db.load.bulk import BulkWriter
+from db.entity_cache import get_entity_cache, status_key
+from db.load.venue import create_venue_object
+from db.load.competitor import collect_competitors, update_competitors
+from db.load.drive import collect_drives
+from db.load.official import collect_officials
+from db.extract.play import extract_competition_play_ids
 from util import convert_to_datetime
 from db.extract.competition import (
     extract_competition, 
@@ -42,34 +45,42 @@ def create_competition_status(
     detail = status_type_data.get("detail", "")
 
     existing_competition_status = extract_competition_status(
+        session,
         clock=clock,
         display_clock=display_clock,
         period=period,
         competition_status_type_id=competition_status_type_id
     )
 
+    cache = get_entity_cache()
     if existing_competition_status:
+        # Statuses created below are cached on their next lookup, once their transaction is committed.
+        cache.put(
+            "status",
+            status_key(clock, display_clock, period, competition_status_type_id),
+            existing_competition_status.id,
+        )
         return existing_competition_status
 
-    competition_status_type = extract_competition_status_type(id=competition_status_type_id)
-
-    if not competition_status_type:
-        competition_status_type = CompetitionStatusType(
-            id=competition_status_type_id,
-            name=name,
-            state=state,
-            completed=completed,
-            description=description,
-            detail=detail
-        )
-        session.add(competition_status_type)
-        session.flush()
+    if cache.get("status_type", competition_status_type_id) is None:
+        if not extract_competition_status_type(session, competition_status_type_id):
+            session.add(CompetitionStatusType(
+                id=competition_status_type_id,
+                name=name,
+                state=state,
+                completed=completed,
+                description=description,
+                detail=detail
+            ))
+            session.flush()
+        else:
+            cache.put("status_type", competition_status_type_id, competition_status_type_id)
 
     competition_status = CompetitionStatus(
         clock=clock,
         display_clock=display_clock,
         period=period,
-        competition_status_type_id=competition_status_type.id
+        competition_status_type_id=competition_status_type_id
     )
     session.add(competition_status)
     session.flush()
@@ -77,9 +88,34 @@ def create_competition_status(
     return competition_status
 
 
+def get_competition_status_id(session: Session, competition_status_data: Dict[str, Any]) -> int:
+    """
+    Return the ID of a competition status, from the entity cache when it is known,
+    creating the status otherwise.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        competition_status_data (Dict[str, Any]): Dictionary containing competition status data.
+
+    Returns:
+        int: The competition status ID.
+    """
+    key = status_key(
+        competition_status_data.get("clock"),
+        competition_status_data.get("displayClock"),
+        competition_status_data.get("period"),
+        int(competition_status_data.get("type", {}).get("id", 0)),
+    )
+    competition_status_id = get_entity_cache().get("status", key)
+    if competition_status_id is None:
+        competition_status_id = create_competition_status(session, competition_status_data).id
+    return competition_status_id
+
+
 def fetch_related_data(competition_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Fetch related data such as drives and officials synchronously.
+    References that were already expanded in place (see ``db.load.ingest``) are used as is.
 
     Args:
         competition_data (Dict[str, Any]): The raw competition data.
@@ -87,24 +123,74 @@ def fetch_related_data(competition_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: A dictionary containing fetched related data.
     """
-    drive_url = competition_data.get("drives", {}).get("$ref")
-    officials_url = competition_data.get("officials", {}).get("$ref")
-    status_url = competition_data.get("status",{}).get("$ref")
+    drives_ref = competition_data.get("drives", {})
+    officials_ref = competition_data.get("officials", {})
+    status_ref = competition_data.get("status", {})
 
     return {
-        "drives_data": fetch_all_items(drive_url) if drive_url else None,
-        "officials_data": fetch_all_items(officials_url) if officials_url else None,
+        "drives_data": resolve_items(drives_ref) if drives_ref else None,
+        "officials_data": resolve_items(officials_ref) if officials_ref else None,
         "venue_data": competition_data.get("venue"),
         "competitors_data": competition_data.get("competitors", []),
-        "status_data": fetch_page(status_url) if status_url else None
+        "status_data": resolve_ref(status_ref) if status_ref else None
     }
 
 
+def collect_competition(
+    session: Session, writer: BulkWriter, competition_data: Dict[str, Any], event_id: int
+) -> int:
+    """
+    Queue a new competition with its venue, competitors, officials, drives, plays,
+    participants and stats for a bulk write. The status is resolved through the session.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
+        competition_data (Dict[str, Any]): Raw data about the competition.
+        event_id (int): The associated event ID.
+
+    Returns:
+        int: The competition ID.
+    """
+    competition_id = int(competition_data["id"])
+    if event_id != competition_id:
+        raise ValueError(f"event_id ({event_id}) and competition_id ({competition_id}) do not match.")
+
+    related_data = fetch_related_data(competition_data)
+
+    venue_id = None
+    if related_data["venue_data"]:
+        venue_id = int(related_data["venue_data"]["id"])
+        if get_entity_cache().get("venue", venue_id) is None:
+            writer.add(create_venue_object(related_data["venue_data"]))
+
+    competition_status_id = (
+        get_competition_status_id(session, related_data['status_data'])
+        if related_data['status_data']
+        else None
+    )
+
+    writer.add(Competition(
+        id=competition_id,
+        date=convert_to_datetime(competition_data["date"]),
+        venue_id=venue_id,
+        event_id=event_id,
+        competition_status_id=competition_status_id
+    ))
+
+    collect_competitors(session, writer, related_data["competitors_data"], event_id, competition_id)
+    collect_officials(writer, related_data["officials_data"] or [], competition_id)
+    collect_drives(session, writer, related_data["drives_data"] or [], competition_id)
+
+    return competition_id
+
+
 def create_competition(
     session: Session, competition_data: Dict[str, Any], event_id: int
 ) -> Competition:
     """
-    Creates and persists a Competition object in the database synchronously.
+    Creates and persists a Competition object and everything it contains in the database,
+    in a single bulk write.
 
     Args:
         session (Session): SQLAlchemy session object.
@@ -121,46 +207,45 @@ def create_competition(
     if existing_competition:
         return existing_competition
 
+    writer = BulkWriter(session)
+    collect_competition(session, writer, competition_data, event_id)
+    writer.flush()
+
+    return extract_competition(session, competition_id)
+
+
+def refresh_competition(
+    session: Session, competition: Competition, competition_data: Dict[str, Any]
+) -> Competition:
+    """
+    Bring a stored, unfinished competition up to date: its status, the competitors'
+    scores, and any drives and plays added since it was last loaded, in a single bulk write.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        competition (Competition): The stored competition.
+        competition_data (Dict[str, Any]): Latest raw data about the competition.
+
+    Returns:
+        Competition: The updated Competition object.
+    """
     related_data = fetch_related_data(competition_data)
+    writer = BulkWriter(session)
 
-    venue = (
-        create_venue(session, related_data["venue_data"])
-        if related_data["venue_data"]
-        else None
-    )
-    competitors = create_competitors(
-        session, related_data["competitors_data"], event_id, competition_id
-    )
-    drives = (
-        create_drives(session, related_data["drives_data"], competition_id)
-        if related_data["drives_data"]
-        else []
-    )
-    referees = list(
-        create_officials(session, related_data["officials_data"])
-        if related_data["officials_data"]
-        else []
-    )
-    competition_status = (
-        create_competition_status(session, related_data['status_data'])
-        if related_data['status_data']
-        else None
-    )
-    
-    unique_referees = list({ref.id: ref for ref in referees}.values())
+    if related_data["status_data"]:
+        competition.competition_status_id = get_competition_status_id(session, related_data["status_data"])
 
-    competition = Competition(
-        id=competition_id,
-        date=convert_to_datetime(competition_data["date"]),
-        venue_id=venue.id if venue else None,
-        competitors=competitors,
-        drives=drives,
-        event_id=event_id,
-        referees=unique_referees,
-        competition_status_id = competition_status.id if competition_status else None
-    )
+    update_competitors(session, writer, related_data["competitors_data"], competition.event_id, competition.id)
 
-    session.add(competition)
-    session.commit()
+    if related_data["drives_data"]:
+        collect_drives(
+            session,
+            writer,
+            related_data["drives_data"],
+            competition.id,
+            known_play_ids=extract_competition_play_ids(session, competition.id),
+            update=True,
+        )
 
+    writer.flush()
     return competition
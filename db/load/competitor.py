@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from db.models import Competitor
-from db.util import fetch_page
-from db.extract.competitor import extract_competitor
+from db.util import resolve_ref
+from db.load.bulk import BulkWriter
+from db.extract.competitor import extract_competition_competitors
 
 
 def fetch_score(session: Session, competitor_data: Dict[str, Any]) -> int:
@@ -17,77 +18,63 @@ def fetch_score(session: Session, competitor_data: Dict[str, Any]) -> int:
     Returns:
         int: The score value, or 0 if not available.
     """
-    score_url = competitor_data.get("score", {}).get("$ref")
-    if score_url:
-        score_data = fetch_page(score_url)
+    score_ref = competitor_data.get("score", {})
+    if score_ref:
+        score_data = resolve_ref(score_ref)
         return int(score_data["value"]) if score_data else 0
     return 0
 
 
-def create_or_get_competitor(
-    session: Session, competitor_data: Dict[str, Any], event_id: int, competition_id: int
-) -> Competitor:
+def collect_competitors(
+    session: Session, writer: BulkWriter, competitors_data: List[Dict[str, Any]], event_id: int, competition_id: int
+) -> None:
     """
-    Fetch an existing Competitor or create a new one synchronously.
+    Queue the competitors of a new competition for a bulk write.
 
     Args:
         session (Session): SQLAlchemy session object.
-        competitor_data (Dict[str, Any]): Data for the competitor.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
+        competitors_data (List[Dict[str, Any]]): List of dictionaries containing competitor data.
         event_id (int): The associated event ID.
         competition_id (int): The associated competition ID.
-
-    Returns:
-        Competitor: The created or existing Competitor object.
     """
-    is_home=competitor_data.get("homeAway", "").lower() == "home"
-    is_winner=bool(competitor_data.get("winner", ""))
-    score=score = fetch_score(session, competitor_data)
-    team_id = int(competitor_data["id"])
-    event_id=event_id
-    competition_id=competition_id
-    
-    existing_competitor = extract_competitor(
-        session, is_home, is_winner, score, team_id, event_id, competition_id
-    )
-    
-    if existing_competitor:
-        return existing_competitor
-
-    competitor = Competitor(
-        is_home=is_home,
-        is_winner=is_winner,
-        score=score,
-        team_id=team_id,
-        event_id=event_id,
-        competition_id=competition_id
-    )
-    
-    session.add(competitor)
-    session.commit()
+    for competitor_data in competitors_data:
+        if not competitor_data:
+            continue
 
-    return competitor
+        writer.add(Competitor(
+            is_home=competitor_data.get("homeAway", "").lower() == "home",
+            is_winner=bool(competitor_data.get("winner", "")),
+            score=fetch_score(session, competitor_data),
+            team_id=int(competitor_data["id"]),
+            event_id=event_id,
+            competition_id=competition_id,
+        ))
 
 
-def create_competitors(
-    session: Session, competitors_data: List[Dict[str, Any]], event_id: int, competition_id: int
-) -> List[Competitor]:
+def update_competitors(
+    session: Session, writer: BulkWriter, competitors_data: List[Dict[str, Any]], event_id: int, competition_id: int
+) -> None:
     """
-    Fetch or create multiple Competitor objects synchronously.
+    Update the score and result of a competition's stored competitors and queue any that
+    are missing for a bulk write. The changes are committed with the writer's unit of work.
 
     Args:
         session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         competitors_data (List[Dict[str, Any]]): List of dictionaries containing competitor data.
         event_id (int): The associated event ID.
         competition_id (int): The associated competition ID.
-
-    Returns:
-        List[Competitor]: A list of Competitor objects.
     """
-    competitors = []
+    stored_competitors = extract_competition_competitors(session, competition_id)
+
     for competitor_data in competitors_data:
-        if competitor_data:
-            if event_id != competition_id:
-                raise ValueError(f"event_id ({event_id}) and competition_id ({competition_id}) do not match.")
-            competitor = create_or_get_competitor(session, competitor_data, event_id, competition_id)
-            competitors.append(competitor)
-    return competitors
+        if not competitor_data:
+            continue
+
+        competitor = stored_competitors.get(int(competitor_data["id"]))
+        if not competitor:
+            collect_competitors(session, writer, [competitor_data], event_id, competition_id)
+        else:
+            competitor.score = fetch_score(session, competitor_data)
+            competitor.is_winner = bool(competitor_data.get("winner", ""))
@@ -1,13 +1,30 @@
-import random
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from collections import defaultdict
 
 from db.util import fetch_page
 from db.models import Contract
+from db.load.spotrac import parse_table_rows, run_concurrently
+from db.snapshots import get_snapshot_store
+from util import PlayerIndex, parse_money
 
 BASE_CONTRACT_URL = "https://www.spotrac.com/nfl/{team}/cap/{year}"
-TEAM_YEAR_CONTRACT_CACHE = defaultdict(dict)
+# Contract tables by team slug and year, indexed by player name as they are loaded.
+# Only the tables used by this process are held, the others stay in the snapshot store.
+TEAM_YEAR_CONTRACT_CACHE: Dict[str, Dict[int, PlayerIndex]] = defaultdict(dict)
+
+# Money columns of a Spotrac team cap table, by cell index; the first cell is the player's name.
+CONTRACT_MONEY_COLUMNS = {
+    4: "apy_hit_pct",
+    5: "dead_cap",
+    6: "base_salary",
+    7: "signing_bonus",
+    8: "per_game_bonus",
+    9: "roster_bonus",
+    10: "option_bonus",
+    11: "workout_bonus",
+    12: "restructure_bonus",
+    13: "incentives",
+}
 
 TEAMS_LOOKUP = {
     '1': 'Atlanta Falcons', '2': 'Buffalo Bills', '3': 'Chicago Bears',
@@ -23,51 +40,114 @@ TEAMS_LOOKUP = {
     '33': 'Baltimore Ravens', '34': 'Houston Texans'
 }
 
-def fetch_team_year_contracts(team_name: str, year: int, proxies: List[str] = []) -> List[Dict[str, Any]]:
+def parse_contract_rows(page_content: str) -> List[Dict[str, Any]]:
+    """
+    Parse a Spotrac team cap page into typed contract rows: the player's name and the money
+    columns as numbers. Rows too short to hold every column, such as section headers, are skipped.
+
+    Args:
+        page_content (str): The HTML of the page.
+
+    Returns:
+        List[Dict[str, Any]]: The contract rows.
+    """
+    return [
+        {"player_name": row[0], **{name: parse_money(row[index]) for index, name in CONTRACT_MONEY_COLUMNS.items()}}
+        for row in parse_table_rows(page_content)
+        if len(row) > max(CONTRACT_MONEY_COLUMNS)
+    ]
+
+
+def contract_snapshot_key(team_name: str, year: int) -> str:
+    return f"{'-'.join(team_name.split())}/{year}"
+
+
+def load_team_year_contracts(team_name: str, year: int) -> Optional[PlayerIndex]:
+    """
+    Return the contract table of a team-year from memory, or load it from its snapshot
+    when the snapshot store holds a usable one. Nothing is fetched.
+
+    Args:
+        team_name (str): The name of the team.
+        year (int): The year of the contracts.
+
+    Returns:
+        Optional[PlayerIndex]: The indexed contract rows, or None if they are not loaded.
+    """
+    team_name_normalized = "-".join(team_name.split())
+    contract_index = TEAM_YEAR_CONTRACT_CACHE[team_name_normalized].get(year)
+    if contract_index is not None:
+        return contract_index
+
+    store = get_snapshot_store()
+    contract_data = store.load("contracts", contract_snapshot_key(team_name, year)) if store else None
+    if contract_data is None:
+        return None
+
+    contract_index = TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year] = PlayerIndex(contract_data)
+    return contract_index
+
+
+def fetch_team_year_contracts(team_name: str, year: int) -> List[Dict[str, Any]]:
     """
-    Fetch contract data synchronously for an entire team for a specific year using a list of proxies.
+    Fetch contract data synchronously for an entire team for a specific year, unless it is
+    already loaded or snapshotted (see ``load_team_year_contracts``). Fetched tables are
+    snapshotted.
 
     Args:
         team_name (str): The name of the team.
         year (int): The year to fetch the contracts for.
-        proxies (List[str]): List of proxies to use for the requests.
 
     Returns:
-        List[Dict[str, Any]]: The contract data.
+        List[Dict[str, Any]]: The typed contract rows (see ``parse_contract_rows``).
     """
+    contract_index = load_team_year_contracts(team_name, year)
+    if contract_index is not None:
+        return contract_index.rows
+
     team_name_normalized = "-".join(team_name.split())
-    
-    if year in TEAM_YEAR_CONTRACT_CACHE[team_name_normalized]:
-        return TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year]
-    
     url = BASE_CONTRACT_URL.format(team=team_name_normalized, year=year)
 
-    proxy = random.choice(proxies) if proxies else None
-    page_content = fetch_page(url, text=True, proxy=proxy)
-    
-    soup = BeautifulSoup(page_content, 'html.parser')
-    tbody = soup.find("tbody")
-    
-    if not tbody:
-        TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year] = []
-        return []
-    
-    rows = tbody.find_all("tr")
-    contract_data = [
-        [cell.get_text(strip=True) for cell in row.find_all("td")]
-        for row in rows
-    ]
+    page_content = fetch_page(url, text=True)
+    contract_data = parse_contract_rows(page_content)
 
-    TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year] = contract_data
+    # An empty table is most likely a failed request: it is not snapshotted, and a stale
+    # snapshot of the table is used instead if there is one.
+    store = get_snapshot_store()
+    if store and contract_data:
+        store.save("contracts", contract_snapshot_key(team_name, year), year, contract_data)
+    elif store:
+        contract_data = store.load("contracts", contract_snapshot_key(team_name, year), allow_stale=True) or []
+
+    TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year] = PlayerIndex(contract_data)
     return contract_data
 
 
-def parse_contract_row(row: List[str], team_name: str, year: int, player_name: str) -> Contract:
+def fetch_team_contracts(team_years: Iterable[Tuple[str, int]]) -> int:
+    """
+    Fetch the contract tables of many team-years concurrently, like ``fetch_team_year_contracts``.
+    Team-years with a usable snapshot are skipped and left to be loaded when needed.
+
+    Args:
+        team_years (Iterable[Tuple[str, int]]): The (team name, year) pairs to fetch.
+
+    Returns:
+        int: Number of contract rows fetched.
+    """
+    store = get_snapshot_store()
+    stale_team_years = [
+        (team_name, year) for team_name, year in team_years
+        if not store or not store.is_fresh("contracts", contract_snapshot_key(team_name, year))
+    ]
+    return sum(len(rows) for rows in run_concurrently(fetch_team_year_contracts, stale_team_years))
+
+
+def parse_contract_row(row: Dict[str, Any], team_name: str, year: int, player_name: str) -> Contract:
     """
     Parse a single contract row into a Contract object.
 
     Args:
-        row (List[str]): The row data from the contract table.
+        row (Dict[str, Any]): A typed contract row.
         team_name (str): The team name.
         year (int): The year of the contract.
         player_name (str): The name of the player.
@@ -78,22 +158,16 @@ def parse_contract_row(row: List[str], team_name: str, year: int, player_name: s
     return Contract(
         team_name=team_name,
         year=year,
-        apy_hit_pct=row[4],
-        dead_cap=row[5],
-        base_salary=row[6],
-        signing_bonus=row[7],
-        per_game_bonus=row[8],
-        roster_bonus=row[9],
-        option_bonus=row[10],
-        workout_bonus=row[11],
-        restructure_bonus=row[12],
-        incentives=row[13],
+        **{name: row[name] for name in CONTRACT_MONEY_COLUMNS.values()},
     )
 
 
 def get_athlete_contracts(team_name: str, year: int, player_name: str) -> List[Contract]:
     """
-    Retrieve contract data for an athlete from the pre-fetched contract cache.
+    Retrieve contract data for an athlete from the pre-fetched contract cache or its
+    snapshot (see ``load_team_year_contracts``). The player is
+    looked up by normalized name in the team-year's index, with a fuzzy fallback (see
+    ``PlayerIndex.find``), so a name never matches another player it merely contains.
 
     Args:
         team_name (str): The name of the team.
@@ -103,16 +177,13 @@ def get_athlete_contracts(team_name: str, year: int, player_name: str) -> List[C
     Returns:
         List[Contract]: List of Contract objects for the specified player.
     """
-    team_name_normalized = "-".join(team_name.split())
-    
-    if year not in TEAM_YEAR_CONTRACT_CACHE[team_name_normalized]:
+    contract_index = load_team_year_contracts(team_name, year)
+    if contract_index is None:
         return []
 
-    contract_data = TEAM_YEAR_CONTRACT_CACHE[team_name_normalized][year]
     contracts = [
         parse_contract_row(row, team_name, year, player_name)
-        for row in contract_data
-        if player_name.lower() in row[0].lower()
+        for row in contract_index.find(player_name)
     ]
 
     return contracts
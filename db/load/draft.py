@@ -1,13 +1,17 @@
-import random
-from bs4 import BeautifulSoup
-from typing import List
+import re
+from typing import Any, Dict, Iterable, List, Optional
 from collections import defaultdict
 
 from db.models import DraftPick
 from db.util import fetch_page
+from db.load.contract import TEAMS_LOOKUP
+from db.load.spotrac import parse_table_rows, run_concurrently
+from db.snapshots import get_snapshot_store
 
 DRAFT_URL = 'https://www.spotrac.com/nfl/draft/_/year/{year}'
-DRAFT_PICKS_CACHE = defaultdict(list)
+DRAFT_PICKS_CACHE: Dict[int, List[Dict[str, Any]]] = {}
+# Draft rows by year and team abbreviation, indexed as the boards are loaded.
+DRAFT_PICKS_BY_TEAM: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
 
 TEAMS_ABV_LOOKUP = {
     '1': 'ATL', '2': 'BUF', '3': 'CHI',
@@ -23,47 +27,146 @@ TEAMS_ABV_LOOKUP = {
     '33': 'BAL', '34': 'HOU'
 }
 
-def fetch_draft_picks(year: int, proxies: List[str]) -> List[List[str]]:
+# Older or alternative abbreviations of the teams above.
+TEAM_ABV_ALIASES = {
+    'WSH': 'WAS', 'JAC': 'JAX', 'LA': 'LAR', 'STL': 'LAR',
+    'OAK': 'LV', 'SD': 'LAC', 'GNB': 'GB', 'KAN': 'KC',
+    'NWE': 'NE', 'NOR': 'NO', 'SFO': 'SF', 'TAM': 'TB',
+}
+
+_TEAM_ABBREVIATIONS = {abbreviation: abbreviation for abbreviation in TEAMS_ABV_LOOKUP.values()}
+_TEAM_ABBREVIATIONS.update(TEAM_ABV_ALIASES)
+# Full names and nicknames, e.g. "los angeles chargers" and "chargers".
+_TEAM_NAMES = {}
+for _team_id, _team_name in TEAMS_LOOKUP.items():
+    _TEAM_NAMES[_team_name.lower()] = TEAMS_ABV_LOOKUP[_team_id]
+    _TEAM_NAMES[_team_name.split()[-1].lower()] = TEAMS_ABV_LOOKUP[_team_id]
+_TEAM_TOKENS = re.compile(r"[A-Za-z0-9]+")
+
+
+def team_abbreviation(team_text: str) -> Optional[str]:
     """
-    Fetch draft picks for a specific year using a list of proxies.
+    Resolve the team cell of a draft board to the team's abbreviation, from an abbreviation
+    (current or historical) standing on its own, or failing that a team or nickname.
 
     Args:
-        year (int): The year of the draft to fetch.
-        proxies (List[str]): List of proxies to use for the requests.
+        team_text (str): The text of the team cell.
+
+    Returns:
+        Optional[str]: The abbreviation, as in ``TEAMS_ABV_LOOKUP``, or None if unknown.
+    """
+    for token in reversed(_TEAM_TOKENS.findall(team_text.upper())):
+        if token in _TEAM_ABBREVIATIONS:
+            return _TEAM_ABBREVIATIONS[token]
+
+    lowered = team_text.lower()
+    for name in sorted(_TEAM_NAMES, key=len, reverse=True):
+        if name in lowered:
+            return _TEAM_NAMES[name]
+    return None
+
+def parse_draft_rows(page_content: str) -> List[Dict[str, Any]]:
+    """
+    Parse a Spotrac draft board into typed rows: round, pick number, team and the team's
+    abbreviation (see ``team_abbreviation``). Rows whose round or pick is not a number,
+    such as section headers, are skipped.
+
+    Args:
+        page_content (str): The HTML of the page.
+
+    Returns:
+        List[Dict[str, Any]]: The draft rows.
+    """
+    return [
+        {"round": int(row[0]), "pick_number": int(row[1]), "team": row[2], "team_abbreviation": team_abbreviation(row[2])}
+        for row in parse_table_rows(page_content)
+        if len(row) > 2 and row[0].isdigit() and row[1].isdigit()
+    ]
+
+
+def cache_draft_picks(year: int, draft_data: List[Dict[str, Any]]) -> None:
+    """Keep a year's draft rows in memory, indexed by team abbreviation."""
+    picks_by_team = defaultdict(list)
+    for row in draft_data:
+        if row["team_abbreviation"]:
+            picks_by_team[row["team_abbreviation"]].append(row)
+
+    DRAFT_PICKS_CACHE[year] = draft_data
+    DRAFT_PICKS_BY_TEAM[year] = dict(picks_by_team)
+
+
+def load_draft_picks(year: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return a year's draft rows from memory, or load them from their snapshot when the
+    snapshot store holds a usable one. Nothing is fetched.
+
+    Args:
+        year (int): The year of the draft.
 
     Returns:
-        List[List[str]]: Draft pick data where each row is a list of strings.
+        Optional[List[Dict[str, Any]]]: The typed draft rows, or None if they are not loaded.
     """
     if year in DRAFT_PICKS_CACHE:
         return DRAFT_PICKS_CACHE[year]
-    
-    url = DRAFT_URL.format(year=year)
 
-    proxy = random.choice(proxies) if proxies else None
+    store = get_snapshot_store()
+    draft_data = store.load("draft_picks", str(year)) if store else None
+    if draft_data is not None:
+        cache_draft_picks(year, draft_data)
+    return draft_data
 
-    page_content = fetch_page(url, text=True, proxy=proxy)
-    soup = BeautifulSoup(page_content, 'html.parser')
 
-    tbody = soup.find("tbody")
-    if not tbody:
-        DRAFT_PICKS_CACHE[year] = []
-        return []
+def fetch_draft_picks(year: int) -> List[Dict[str, Any]]:
+    """
+    Fetch draft picks for a specific year, unless they are already loaded or snapshotted
+    (see ``load_draft_picks``). Fetched boards are snapshotted.
+
+    Args:
+        year (int): The year of the draft to fetch.
+
+    Returns:
+        List[Dict[str, Any]]: The typed draft rows (see ``parse_draft_rows``).
+    """
+    draft_data = load_draft_picks(year)
+    if draft_data is not None:
+        return draft_data
     
-    draft_data = [
-        [cell.get_text(strip=True) for cell in row.find_all("td")]
-        for row in tbody.find_all("tr")
-    ]
+    url = DRAFT_URL.format(year=year)
 
-    DRAFT_PICKS_CACHE[year] = draft_data
+    page_content = fetch_page(url, text=True)
+    draft_data = parse_draft_rows(page_content)
+
+    # An empty board is most likely a failed request: it is not snapshotted, and a stale
+    # snapshot of the board is used instead if there is one.
+    store = get_snapshot_store()
+    if store and draft_data:
+        store.save("draft_picks", str(year), year, draft_data)
+    elif store:
+        draft_data = store.load("draft_picks", str(year), allow_stale=True) or []
+
+    cache_draft_picks(year, draft_data)
     return draft_data
 
 
-def parse_draft_pick(row: List[str], year: int, team_id: int) -> DraftPick:
+def fetch_draft_boards(years: Iterable[int]) -> int:
+    """
+    Fetch the draft boards of many years concurrently, like ``fetch_draft_picks``. Years
+    with a usable snapshot are skipped and left to be loaded when needed.
+
+    Returns:
+        int: Number of draft rows fetched.
+    """
+    store = get_snapshot_store()
+    stale_years = [(year,) for year in years if not store or not store.is_fresh("draft_picks", str(year))]
+    return sum(len(rows) for rows in run_concurrently(fetch_draft_picks, stale_years))
+
+
+def parse_draft_pick(row: Dict[str, Any], year: int, team_id: int) -> DraftPick:
     """
     Parse a single row of draft data into a DraftPick object.
 
     Args:
-        row (List[str]): A row of draft data.
+        row (Dict[str, Any]): A typed draft row.
         year (int): The year of the draft.
         team_id (int): The team ID.
 
@@ -72,15 +175,16 @@ def parse_draft_pick(row: List[str], year: int, team_id: int) -> DraftPick:
     """
     return DraftPick(
         year=year,
-        round=int(row[0]),
-        pick_number=int(row[1]),
+        round=row["round"],
+        pick_number=row["pick_number"],
         team_id=team_id
     )
 
 
 def get_team_draft_picks(year: int, team_id: int) -> List[DraftPick]:
     """
-    Retrieve draft pick data for a team from the pre-fetched draft pick cache.
+    Retrieve draft pick data for a team from the pre-fetched draft pick cache or its
+    snapshot (see ``load_draft_picks``).
 
     Args:
         year (int): The year of the draft.
@@ -89,15 +193,14 @@ def get_team_draft_picks(year: int, team_id: int) -> List[DraftPick]:
     Returns:
         List[DraftPick]: A list of draft pick objects for the specified team.
     """
-    team_abbreviation = TEAMS_ABV_LOOKUP.get(str(team_id), "").lower()
-    if not team_abbreviation:
+    abbreviation = TEAMS_ABV_LOOKUP.get(str(team_id))
+    if not abbreviation:
         return []
 
-    draft_data = DRAFT_PICKS_CACHE.get(year, [])
-    draft_picks = [
-        parse_draft_pick(row, year, team_id)
-        for row in draft_data
-        if team_abbreviation in row[2].lower()
-    ]
+    if load_draft_picks(year) is None:
+        return []
+
+    draft_data = DRAFT_PICKS_BY_TEAM[year].get(abbreviation, [])
+    draft_picks = [parse_draft_pick(row, year, team_id) for row in draft_data]
     
     return draft_picks
@@ -1,76 +1,119 @@
-from typing import List, Dict, Any, Optional
+import logging
+from typing import List, Dict, Any, Optional, AbstractSet
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from db.models import Drive
-from db.load.play import create_plays
-from db.extract.drive import extract_drive
+from db.load.play import collect_plays
+from db.load.play_participant import get_or_create_athletes, participant_athlete_refs
+from db.load.bulk import BulkWriter
+from db.extract.drive import extract_drives_without_team
+from db.summary import refresh_summaries
+from db.util import resolve_refs
+from util import get_id_from_url
 
+DRIVE_URL = (
+    "https://sports.core.api.espn.com/v2/sports/football/leagues/nfl"
+    "/events/{event_id}/competitions/{competition_id}/drives/{drive_id}"
+)
 
-def create_drive(
-    session: Session, drive_data: Dict[str, Any], competition_id: int
-) -> Drive:
+
+def parse_drive_fields(drive_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Create and persist a Drive object in the database synchronously.
+    Extract the Drive column values from ESPN drive data.
 
     Args:
-        session (Session): SQLAlchemy session object.
         drive_data (Dict[str, Any]): Dictionary data representing the drive.
-        competition_id (int): ID of the competition associated with the drive.
 
     Returns:
-        Drive: The persisted Drive object.
+        Dict[str, Any]: Drive column values, without the ID and competition.
     """
-    drive_id = int(drive_data["id"])
-
-    existing_drive = extract_drive(session, drive_id)
-    if existing_drive:
-        return existing_drive
-
-    plays = create_plays(session, drive_data.get("plays", []), drive_id)
-
     start_data = drive_data.get("start", {})
     end_data = drive_data.get("end", {})
+    team_id = get_id_from_url(drive_data.get("team", {}).get("$ref", ""))
 
-    drive = Drive(
-        id=drive_id,
-        description=drive_data.get("description", ""),
-        yards=int(drive_data.get("yards", 0)),
-        is_score=bool(drive_data.get("isScore", False)),
-        num_offensive_plays=int(drive_data.get("offensivePlays", 0)),
-        start_quarter=int(start_data.get("period", {}).get("number", 0)),
-        start_time=int(start_data.get("clock", {}).get("value", 0)),
-        start_yardline=int(start_data.get("yardLine", 0)),
-        end_quarter=int(end_data.get("period", {}).get("number", 0)),
-        end_time=int(end_data.get("clock", {}).get("value", 0)),
-        end_yardline=int(end_data.get("yardLine", 0)),
-        plays=plays,
-        competition_id=competition_id,
-    )
-
-    session.add(drive)
-    session.commit()
-    
-    return drive
-
-
-def create_drives(
-    session: Session, drives_data: List[Dict[str, Any]], competition_id: int
-) -> List[Drive]:
+    return {
+        "description": drive_data.get("description", ""),
+        "yards": int(drive_data.get("yards", 0)),
+        "is_score": bool(drive_data.get("isScore", False)),
+        "num_offensive_plays": int(drive_data.get("offensivePlays", 0)),
+        "start_quarter": int(start_data.get("period", {}).get("number", 0)),
+        "start_time": int(start_data.get("clock", {}).get("value", 0)),
+        "start_yardline": int(start_data.get("yardLine", 0)),
+        "end_quarter": int(end_data.get("period", {}).get("number", 0)),
+        "end_time": int(end_data.get("clock", {}).get("value", 0)),
+        "end_yardline": int(end_data.get("yardLine", 0)),
+        "team_id": int(team_id) if team_id else None,
+    }
+
+
+def collect_drives(
+    session: Session,
+    writer: BulkWriter,
+    drives_data: List[Dict[str, Any]],
+    competition_id: int,
+    known_play_ids: AbstractSet[int] = frozenset(),
+    update: bool = False,
+) -> None:
     """
-    Create and persist a list of Drive objects in the database synchronously.
+    Queue drives with their plays, participants and stats for a bulk write.
 
     Args:
         session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         drives_data (List[Dict[str, Any]]): List of dictionaries representing drives.
         competition_id (int): ID of the competition associated with the drives.
+        known_play_ids (AbstractSet[int]): IDs of plays already stored, which are skipped.
+        update (bool): Overwrite the totals of drives that are already stored.
+    """
+    drives_data = [drive_data for drive_data in drives_data if drive_data]
+    new_plays_data = [
+        play_data
+        for drive_data in drives_data
+        for play_data in (drive_data.get("plays") or {}).get("items", [])
+        if int(play_data["id"]) not in known_play_ids
+    ]
+    athlete_ids = get_or_create_athletes(session, participant_athlete_refs(new_plays_data))
+
+    for drive_data in drives_data:
+        drive_id = int(drive_data["id"])
+        writer.add(Drive(id=drive_id, competition_id=competition_id, **parse_drive_fields(drive_data)), update=update)
+        collect_plays(session, writer, drive_data.get("plays") or {}, drive_id, known_play_ids, athlete_ids)
+
+
+def backfill_drive_teams(session: Session) -> int:
+    """
+    Fill in the team of drives stored before drives had one, from their ESPN payloads
+    (usually served from the response cache), then refresh the summaries of their games.
+    Drives whose payload cannot be fetched keep no team and are tried again next time.
+
+    Args:
+        session (Session): SQLAlchemy session object.
 
     Returns:
-        List[Drive]: List of persisted Drive objects.
+        int: Number of drives given a team.
     """
-    drives = []
-    for drive_data in drives_data:
-        if drive_data:
-            drive = create_drive(session, drive_data, competition_id)
-            drives.append(drive)
-    return drives
+    drives = extract_drives_without_team(session)
+    if not drives:
+        return 0
+
+    logging.info(f"Fetching the teams of {len(drives)} drives stored without one.")
+    refs = [
+        {"$ref": DRIVE_URL.format(event_id=event_id, competition_id=competition_id, drive_id=drive_id)}
+        for drive_id, competition_id, event_id in drives
+    ]
+    team_ids = {}
+    competition_ids = set()
+    for (drive_id, competition_id, _), drive_data in zip(drives, resolve_refs(refs)):
+        team_id = get_id_from_url((drive_data or {}).get("team", {}).get("$ref", ""))
+        if team_id:
+            team_ids[drive_id] = int(team_id)
+            competition_ids.add(competition_id)
+
+    if team_ids:
+        session.execute(update(Drive), [{"id": drive_id, "team_id": team_id} for drive_id, team_id in team_ids.items()])
+        session.commit()
+
+    refresh_summaries(session, competition_ids)
+    logging.info(f"Gave {len(team_ids)} drives their team.")
+    return len(team_ids)
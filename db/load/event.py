@@ -1,15 +1,17 @@
-import random
+import logging
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from db.util import fetch_page
+from db.retry import DEAD_LETTERS, dead_letter_context
 from db.models import Event
-from db.load.competition import create_competition
+from db.load.bulk import BulkWriter
+from db.load.competition import create_competition, refresh_competition, collect_competition
 from util import get_id_from_url
-from db.extract.event import extract_event
+from db.extract.event import extract_event, extract_existing_event_ids
+from db.extract.competition import extract_competition
 
-ATHLETE_CACHE = {}
 IGNORE_EVENTS = {401220373}
 
 def parse_season_data(event_data: Dict[str, Any]) -> Dict[str, int]:
@@ -32,18 +34,17 @@ def parse_season_data(event_data: Dict[str, Any]) -> Dict[str, int]:
     }
 
 
-def create_event(session: Session, event_data: Dict[str, Any], proxies: List[str]) -> Optional[Event]:
+def collect_event(session: Session, writer: BulkWriter, event_data: Dict[str, Any]) -> Optional[int]:
     """
-    Create and persist an Event object in the database.
-    If the weather data cannot be fetched, it proceeds without weather data.
+    Queue an event and its whole competition for a bulk write.
 
     Args:
-        session (Session): SQLAlchemy session.
+        session (Session): SQLAlchemy session used for lookups.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         event_data (Dict[str, Any]): The event data dictionary.
-        proxies (List[str]): List of proxies to rotate for requests.
 
     Returns:
-        Optional[Event]: The persisted Event object, or None if the event is ignored.
+        Optional[int]: The event ID, or None if the event is ignored.
     """
     event_id = int(event_data.get("id", None))
     
@@ -53,66 +54,121 @@ def create_event(session: Session, event_data: Dict[str, Any], proxies: List[str
     competition_data = event_data.get("competitions", [{}])[0]
     season_info = parse_season_data(event_data)
 
-    competition = create_competition(session, competition_data, event_id) if competition_data else None
+    if competition_data and not extract_competition(session, int(competition_data["id"])):
+        collect_competition(session, writer, competition_data, event_id)
 
-    event = Event(
+    return writer.add(Event(
         id=event_id,
         name=event_data.get("name", ""),
         season=season_info["season"],
         week=season_info["week"],
         season_type=season_info["season_type"],
-        competition=competition,
-    )
+    ))
 
-    session.add(event)
-    session.commit()
 
-    return event
+def create_event(session: Session, event_data: Dict[str, Any]) -> Optional[Event]:
+    """
+    Create and persist an Event object and its whole competition in the database, in a
+    single bulk write. If the weather data cannot be fetched, it proceeds without weather data.
 
+    Args:
+        session (Session): SQLAlchemy session.
+        event_data (Dict[str, Any]): The event data dictionary.
 
-def fetch_event_data(event_url: str, proxies: List[str]) -> Dict[str, Any]:
+    Returns:
+        Optional[Event]: The persisted Event object, or None if the event is ignored.
     """
-    Fetch event data from a given URL with proxy support.
+    writer = BulkWriter(session)
+    event_id = collect_event(session, writer, event_data)
+    if event_id is None:
+        return None
+
+    writer.flush()
+    return extract_event(session, event_id)
+
+
+def fetch_event_data(event_url: str) -> Dict[str, Any]:
+    """
+    Fetch event data from a given URL.
 
     Args:
         event_url (str): The URL of the event.
-        proxies (List[str]): List of proxies to rotate through.
 
     Returns:
         Dict[str, Any]: The event data dictionary, or an empty dictionary if the request fails.
     """
-    proxy = {"http": random.choice(proxies)} if proxies else None
-    
-    return fetch_page(event_url, proxy=proxy)
+    return fetch_page(event_url)
 
 
-def create_events(session: Session, event_urls: List[str], proxies: List[str]) -> List[Optional[Event]]:
+def create_events(session: Session, event_urls: List[str]) -> List[Optional[Event]]:
     """
-    Create and persist a list of Event objects in the database.
+    Create and persist a list of Event objects in the database. An event that had any of
+    its requests dead-lettered is not written, so it is created whole when it is replayed
+    rather than skipped as already stored.
 
     Args:
         session (Session): SQLAlchemy session.
         event_urls (List[str]): List of event URLs to fetch data from.
-        proxies (List[str]): List of proxies to rotate through.
 
     Returns:
         List[Optional[Event]]: List of persisted Event objects.
     """
     events = []
+    existing_event_ids = extract_existing_event_ids(session, (int(get_id_from_url(url)) for url in event_urls))
 
     for event_url in event_urls:
         event_id = int(get_id_from_url(event_url))
 
-        existing_event = extract_event(id=event_id)
-
-        if existing_event:
-            events.append(existing_event)
+        if event_id in existing_event_ids:
+            events.append(extract_event(session, event_id))
             continue
 
-        event_data = fetch_event_data(event_url, proxies)
-        if event_data:
-            new_event = create_event(session, event_data, proxies)
-            if new_event:
-                events.append(new_event)
+        with dead_letter_context(event_url):
+            event_data = fetch_event_data(event_url)
+            if not event_data:
+                continue
+
+            writer = BulkWriter(session)
+            new_event_id = collect_event(session, writer, event_data)
+            if new_event_id is None:
+                continue
+            if DEAD_LETTERS.failed_in(event_url):
+                session.rollback()
+                logging.warning(f"Not writing event {event_url}: some of its requests failed. It will be replayed.")
+                continue
+
+            writer.flush()
+            events.append(extract_event(session, new_event_id))
 
     return events
+
+
+def refresh_event(session: Session, event_url: str) -> Optional[Event]:
+    """
+    Re-fetch a stored event whose game is not finished and bring its competition up to date.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        event_url (str): The URL of the event.
+
+    Returns:
+        Optional[Event]: The updated Event object, or None if it could not be fetched.
+    """
+    with dead_letter_context(event_url):
+        event_data = fetch_event_data(event_url)
+        if not event_data:
+            return None
+
+        event = extract_event(session, int(event_data["id"]))
+        if not event:
+            return create_event(session, event_data)
+
+        competition_data = event_data.get("competitions", [{}])[0]
+        if competition_data:
+            competition = extract_competition(session, int(competition_data["id"]))
+            if competition:
+                refresh_competition(session, competition, competition_data)
+            else:
+                create_competition(session, competition_data, event.id)
+
+    return event
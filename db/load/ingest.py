@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import aiohttp
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Set, Iterable, Callable, Optional
+from sqlalchemy.orm import sessionmaker
+
+from db.scheduler import get_scheduler
+from db.retry import DEAD_LETTERS, dead_letter_context
+from db.util import fetch_page_async, fetch_all_items_async, fetch_all_refs_async
+from db.load.event import create_event, IGNORE_EVENTS
+from db.extract.athlete import extract_existing_athlete_ids
+from db.extract.event import extract_existing_event_ids
+from util import get_id_from_url
+
+WRITE_QUEUE_SIZE = 64
+
+
+def is_expanded(ref: Dict[str, Any]) -> bool:
+    """Return True if an ESPN ``$ref`` object already carries its payload."""
+    return bool(set(ref) - {"$ref"})
+
+
+async def expand_ref(
+    session: aiohttp.ClientSession, container: Dict[str, Any], key: str
+) -> None:
+    """
+    Replace ``container[key]`` (an ESPN ``$ref`` object) in place with the payload it points to.
+    The reference is left untouched if the request fails, so the loader can retry it later.
+    """
+    ref = container.get(key) or {}
+    if not ref.get("$ref") or is_expanded(ref):
+        return
+
+    data = await fetch_page_async(session, ref["$ref"])
+    if data:
+        container[key] = {**ref, **data}
+
+
+async def expand_items(
+    session: aiohttp.ClientSession, container: Dict[str, Any], key: str
+) -> None:
+    """Expand a paginated ESPN collection reference in place with every item of every page."""
+    ref = container.get(key) or {}
+    if not ref.get("$ref") or "items" in ref:
+        return
+
+    items = await fetch_all_items_async(ref["$ref"], session=session)
+    if items:
+        container[key] = {**ref, "items": items}
+
+
+def iter_participants(competition_data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """Yield every play participant of an expanded competition."""
+    for drive_data in competition_data.get("drives", {}).get("items", []):
+        for play_data in (drive_data.get("plays") or {}).get("items", []):
+            yield from play_data.get("participants", [])
+
+
+class AsyncEventIngestor:
+    """
+    Fetch the ESPN reference graph of events concurrently and hand each fully expanded
+    event to a single writer task, which persists it through the regular loaders.
+
+    The writer runs the blocking SQLAlchemy work on one dedicated thread so fetching
+    never stalls on the database and the database only ever sees one writer. The number
+    of requests in flight is bounded by the shared request scheduler.
+    """
+
+    def __init__(
+        self,
+        SessionLocal: sessionmaker,
+        queue_size: int = WRITE_QUEUE_SIZE,
+        write_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for database sessions used by the writer and
+                to skip events and athletes that are already stored.
+            queue_size (int): Maximum number of fetched events waiting to be written.
+            write_event (Optional[Callable[[Dict[str, Any]], None]]): Called on the writer thread
+                with each expanded event instead of storing it, e.g. to stage it in a file.
+        """
+        self.SessionLocal = SessionLocal
+        self.queue_size = queue_size
+        self.write_event = write_event or self._write_event
+        self.athlete_tasks: Dict[int, asyncio.Task] = {}
+        self.written_events = 0
+
+    async def __aenter__(self) -> "AsyncEventIngestor":
+        connector = aiohttp.TCPConnector(limit=get_scheduler().max_in_flight)
+        self.http = aiohttp.ClientSession(connector=connector)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self.writer = asyncio.create_task(self._write_events())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.queue.put(None)
+        await self.writer
+        await self.http.close()
+        self.executor.shutdown(wait=True)
+
+    async def run_db(self, fn: Callable, *args) -> Any:
+        """Run a blocking database call on the writer thread."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _existing_ids(self, extract: Callable[..., Set[int]], ids: List[int]) -> Set[int]:
+        with self.SessionLocal() as session:
+            return extract(session, ids)
+
+    def _write_event(self, event_data: Dict[str, Any]) -> None:
+        with self.SessionLocal() as session:
+            create_event(session, event_data)
+
+    def after_writes(self, callback: Callable[[], None]) -> None:
+        """Run a callback queued behind events, on the writer thread, once they are written."""
+        callback()
+
+    async def _write_events(self) -> None:
+        while True:
+            event_data = await self.queue.get()
+            if event_data is None:
+                break
+            if callable(event_data):
+                try:
+                    await self.run_db(self.after_writes, event_data)
+                except Exception as e:
+                    logging.error(f"Failed to run a callback queued after event writes. Details: {e}")
+                continue
+
+            try:
+                await self.run_db(self.write_event, event_data)
+                self.written_events += 1
+            except Exception as e:
+                logging.error(f"Failed to write event {event_data.get('id')}. Details: {e}")
+
+    async def fetch_competition_graph(self, competition_data: Dict[str, Any]) -> None:
+        """Expand a competition's drives, officials, status, scores and unseen athletes in place."""
+        await asyncio.gather(
+            expand_items(self.http, competition_data, "drives"),
+            expand_items(self.http, competition_data, "officials"),
+            expand_ref(self.http, competition_data, "status"),
+            *(
+                expand_ref(self.http, competitor_data, "score")
+                for competitor_data in competition_data.get("competitors", [])
+            ),
+        )
+
+        participants_by_athlete: Dict[int, List[Dict[str, Any]]] = {}
+        for participant_data in iter_participants(competition_data):
+            athlete_url = participant_data.get("athlete", {}).get("$ref")
+            if athlete_url:
+                participants_by_athlete.setdefault(int(get_id_from_url(athlete_url)), []).append(participant_data)
+
+        candidate_ids = [
+            athlete_id for athlete_id in participants_by_athlete if athlete_id not in self.athlete_tasks
+        ]
+        existing_ids = await self.run_db(self._existing_ids, extract_existing_athlete_ids, candidate_ids) if candidate_ids else set()
+
+        # Competitions fetched concurrently share one hydration task per athlete, so every
+        # participant gets the payload while each athlete is only requested once. Only the
+        # athlete itself is fetched; its details are queued for enrichment when it is written.
+        for athlete_id in candidate_ids:
+            if athlete_id not in existing_ids and athlete_id not in self.athlete_tasks:
+                athlete_url = participants_by_athlete[athlete_id][0]["athlete"]["$ref"]
+                self.athlete_tasks[athlete_id] = asyncio.create_task(
+                    fetch_page_async(self.http, athlete_url)
+                )
+
+        hydrated_ids = [athlete_id for athlete_id in participants_by_athlete if athlete_id in self.athlete_tasks]
+        athletes = await asyncio.gather(*(self.athlete_tasks[athlete_id] for athlete_id in hydrated_ids))
+
+        for athlete_id, athlete_data in zip(hydrated_ids, athletes):
+            if not athlete_data:
+                continue
+            for participant_data in participants_by_athlete[athlete_id]:
+                participant_data["athlete"] = {**participant_data["athlete"], **athlete_data}
+
+    async def fetch_event_graph(self, event_url: str) -> Dict[str, Any]:
+        """
+        Fetch an event and expand its whole reference graph in place. Requests that fail
+        for good are dead-lettered under the event URL.
+
+        Args:
+            event_url (str): The event's ``$ref`` URL.
+
+        Returns:
+            Dict[str, Any]: The expanded event payload, or an empty dictionary if it could not be fetched.
+        """
+        with dead_letter_context(event_url):
+            event_data = await fetch_page_async(self.http, event_url)
+            if not event_data:
+                return {}
+
+            competition_data = event_data.get("competitions", [{}])[0]
+            if competition_data:
+                await self.fetch_competition_graph(competition_data)
+
+        return event_data
+
+    async def ingest_week(
+        self, events_url: str, on_written: Optional[Callable[[List[int]], None]] = None
+    ) -> int:
+        """
+        Fetch every event of a week that is not in the database yet and queue it for writing.
+
+        Args:
+            events_url (str): The week's events collection URL.
+            on_written (Optional[Callable[[List[int]], None]]): Called on the writer thread with
+                the IDs of every event of the week, once the week's queued events are written.
+
+        Returns:
+            int: Number of events queued for writing.
+        """
+        # Athletes hydrated in earlier weeks are written by now or soon will be; keep only pending work.
+        self.athlete_tasks = {
+            athlete_id: task for athlete_id, task in self.athlete_tasks.items() if not task.done()
+        }
+
+        event_urls = await fetch_all_refs_async(events_url, limit=18, session=self.http)
+        queued = await self.ingest_events(event_urls)
+        if on_written:
+            await self.queue.put(partial(on_written, [int(get_id_from_url(event_url)) for event_url in event_urls]))
+        return queued
+
+    async def ingest_events(self, event_urls: List[str]) -> int:
+        """
+        Fetch the given events that are not in the database yet and queue them for writing.
+        An event with dead-lettered requests is not written, so it is never stored partially
+        and can be replayed as a whole.
+
+        Args:
+            event_urls (List[str]): Event ``$ref`` URLs.
+
+        Returns:
+            int: Number of events queued for writing.
+        """
+        event_ids = {event_url: int(get_id_from_url(event_url)) for event_url in event_urls}
+        existing_ids = await self.run_db(self._existing_ids, extract_existing_event_ids, list(event_ids.values())) if event_ids else set()
+
+        new_urls = [
+            event_url for event_url, event_id in event_ids.items()
+            if event_id not in existing_ids and event_id not in IGNORE_EVENTS
+        ]
+
+        async def fetch(event_url: str):
+            return event_url, await self.fetch_event_graph(event_url)
+
+        queued = 0
+        for next_graph in asyncio.as_completed([fetch(event_url) for event_url in new_urls]):
+            event_url, event_data = await next_graph
+            if DEAD_LETTERS.failed_in(event_url):
+                logging.warning(f"Not writing event {event_url}: some of its requests failed. It will be replayed.")
+            elif event_data:
+                await self.queue.put(event_data)
+                queued += 1
+
+        return queued
@@ -0,0 +1,172 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from sqlalchemy.orm import Session
+
+from db.models import Competition, Drive
+from db.util import fetch_page, append_query_params
+from db.load.bulk import BulkWriter
+from db.load.competition import get_competition_status_id
+from db.load.drive import parse_drive_fields
+from db.load.play import collect_plays
+from db.load.play_participant import get_or_create_athletes, participant_athlete_refs
+from db.extract.play import extract_competition_play_progress
+from util import get_id_from_url
+
+COMPETITION_URL = "https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/events/{event_id}/competitions/{competition_id}"
+PLAY_PAGE_SIZE = 50
+# Seconds between polls of a game in progress, depending on what is happening in it.
+LIVE_POLL_INTERVAL = 10.0
+MAX_LIVE_POLL_INTERVAL = 60.0
+BREAK_POLL_INTERVALS = {
+    "STATUS_HALFTIME": 120.0,
+    "STATUS_END_PERIOD": 60.0,
+    "STATUS_DELAYED": 120.0,
+}
+PRE_GAME_POLL_INTERVAL = 300.0
+
+
+def fetch_new_plays(competition_url: str, play_count: int, last_sequence: int) -> List[Dict[str, Any]]:
+    """
+    Fetch the plays of a competition past the last stored sequence number. Paging starts at
+    the page holding the first unseen play, so only the tail of the game is requested.
+
+    Args:
+        competition_url (str): The competition's URL.
+        play_count (int): Number of plays already stored for the competition.
+        last_sequence (int): Highest sequence number already stored.
+
+    Returns:
+        List[Dict[str, Any]]: The new plays, ordered by sequence number.
+    """
+    plays_url = f"{competition_url}/plays"
+    page = play_count // PLAY_PAGE_SIZE + 1
+    new_plays = []
+    seeking = True
+
+    while True:
+        page_data = fetch_page(append_query_params(plays_url, limit=PLAY_PAGE_SIZE, page=page))
+        items = page_data.get("items", [])
+
+        # Plays removed upstream shift the pages back; step back until the page overlaps what is stored.
+        if seeking and page > 1 and items and int(items[0]["sequenceNumber"]) > last_sequence:
+            page -= 1
+            continue
+        seeking = False
+
+        new_plays.extend(item for item in items if int(item["sequenceNumber"]) > last_sequence)
+        if page >= page_data.get("pageCount", 1):
+            break
+        page += 1
+
+    return sorted(new_plays, key=lambda play_data: int(play_data["sequenceNumber"]))
+
+
+def collect_live_drive(writer: BulkWriter, drive_url: str, competition_id: int) -> int:
+    """
+    Queue the drive a new play belongs to, creating it or updating its totals. Only the
+    drive itself is fetched, never its plays.
+
+    Args:
+        writer (BulkWriter): Writer collecting the rows of the poll.
+        drive_url (str): The drive's ``$ref`` URL.
+        competition_id (int): ID of the competition the drive belongs to.
+
+    Returns:
+        int: The drive ID.
+    """
+    drive_id = int(get_id_from_url(drive_url))
+    drive_data = fetch_page(drive_url)
+    return writer.add(
+        Drive(id=drive_id, competition_id=competition_id, **parse_drive_fields(drive_data)),
+        update=bool(drive_data),
+    )
+
+
+class LiveGamePoller:
+    """
+    Follow competitions in progress: each poll appends the plays past the last stored
+    sequence number, updates the score and status, and returns when to poll again. The
+    interval shortens while plays keep coming and backs off during breaks and lulls.
+    """
+
+    def __init__(self):
+        self.intervals: Dict[int, float] = {}
+
+    def next_interval(
+        self, competition: Competition, status_data: Dict[str, Any], new_plays: int
+    ) -> Optional[float]:
+        """
+        Decide when a competition should be polled again.
+
+        Returns:
+            Optional[float]: Seconds until the next poll, or None once the game is over.
+        """
+        status_type = status_data.get("type", {})
+        # A canceled or postponed game goes to "post" without ever being completed.
+        if status_type.get("completed") or status_type.get("state") == "post":
+            self.intervals.pop(competition.id, None)
+            return None
+
+        if status_type.get("state") == "pre":
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            until_kickoff = (competition.date - now).total_seconds() if competition.date else 0
+            return min(PRE_GAME_POLL_INTERVAL, max(LIVE_POLL_INTERVAL, until_kickoff))
+
+        if status_type.get("name") in BREAK_POLL_INTERVALS:
+            interval = BREAK_POLL_INTERVALS[status_type["name"]]
+        elif new_plays:
+            interval = LIVE_POLL_INTERVAL
+        else:
+            interval = min(MAX_LIVE_POLL_INTERVAL, self.intervals.get(competition.id, LIVE_POLL_INTERVAL) * 1.5)
+
+        self.intervals[competition.id] = interval
+        return interval
+
+    def poll(self, session: Session, competition: Competition) -> Optional[float]:
+        """
+        Bring a competition in progress up to date.
+
+        Args:
+            session (Session): SQLAlchemy session object.
+            competition (Competition): The competition to follow.
+
+        Returns:
+            Optional[float]: Seconds until the next poll, or None once the game is over.
+        """
+        competition_url = COMPETITION_URL.format(event_id=competition.event_id, competition_id=competition.id)
+        play_count, last_sequence, last_drive_id = extract_competition_play_progress(session, competition.id)
+
+        status_data = fetch_page(f"{competition_url}/status")
+        new_plays = fetch_new_plays(competition_url, play_count, last_sequence)
+
+        writer = BulkWriter(session)
+        athlete_ids = get_or_create_athletes(session, participant_athlete_refs(new_plays))
+        drive_ids: Dict[str, int] = {}
+        for play_data in new_plays:
+            drive_url = (play_data.get("drive") or {}).get("$ref")
+            if drive_url and drive_url not in drive_ids:
+                drive_ids[drive_url] = collect_live_drive(writer, drive_url, competition.id)
+
+            drive_id = drive_ids.get(drive_url, last_drive_id)
+            collect_plays(session, writer, {"items": [play_data]}, drive_id, athlete_ids=athlete_ids)
+            last_drive_id = drive_id
+
+        if new_plays:
+            latest_play = new_plays[-1]
+            for competitor in competition.competitors:
+                competitor.score = int(latest_play["homeScore"] if competitor.is_home else latest_play["awayScore"])
+
+        if status_data:
+            competition.competition_status_id = get_competition_status_id(session, status_data)
+            if status_data.get("type", {}).get("completed"):
+                top_score = max((competitor.score for competitor in competition.competitors), default=0)
+                tied = sum(competitor.score == top_score for competitor in competition.competitors) > 1
+                for competitor in competition.competitors:
+                    competitor.is_winner = not tied and competitor.score == top_score
+
+        writer.flush()
+
+        if new_plays:
+            logging.info(f"Appended {len(new_plays)} plays to competition {competition.id}.")
+        return self.next_interval(competition, status_data, len(new_plays))
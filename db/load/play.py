@@ -1,10 +1,12 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, AbstractSet, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from db.models import Play
-from db.load.play_participant import create_participants
-from db.extract.play import extract_play
+from db.load.play_participant import (
+    collect_participants, get_or_create_athletes, participant_athlete_refs
+)
+from db.load.bulk import BulkWriter
 
 
 def create_play_object(play_data: Dict[str, Any], drive_id: int) -> Play:
@@ -44,55 +46,32 @@ def create_play_object(play_data: Dict[str, Any], drive_id: int) -> Play:
     )
 
 
-def create_play(session: Session, play_data: Dict[str, Any], drive_id: int) -> Play:
+def collect_plays(
+    session: Session,
+    writer: BulkWriter,
+    plays_data: Dict[str, Any],
+    drive_id: int,
+    known_play_ids: AbstractSet[int] = frozenset(),
+    athlete_ids: Optional[AbstractSet[int]] = None,
+) -> None:
     """
-    Creates and persists a Play object in the database.
-
-    Args:
-        session (Session): SQLAlchemy session object.
-        play_data (Dict[str, Any]): Dictionary data for a single play from ESPN response.
-        drive_id (int): The ID of the drive this play belongs to.
-
-    Returns:
-        Play: The persisted Play object.
-    """
-    play_id = int(play_data['id'])
-
-    existing_play = extract_play(session, play_id)
-    
-    if existing_play:
-        return existing_play
-
-    play = create_play_object(play_data, drive_id)
-
-    participants_data = play_data.get('participants', {})
-    
-    if participants_data:
-        create_participants(session, participants_data, play_id)
-
-    session.add(play)
-    session.commit()
-
-    return play
-
-
-def create_plays(session: Session, plays_data: Dict[str, Any], drive_id: int) -> List[Play]:
-    """
-    Creates and persists a list of Play objects in the database.
+    Queue a drive's plays, their participants and stats for a bulk write. The participants'
+    athletes are retrieved with one query unless the caller already did so.
 
     Args:
         session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         plays_data (Dict[str, Any]): Dictionary data containing a list of plays.
         drive_id (int): The ID of the drive these plays belong to.
-
-    Returns:
-        List[Play]: List of persisted Play objects.
+        known_play_ids (AbstractSet[int]): IDs of plays already stored, which are skipped.
+        athlete_ids (Optional[AbstractSet[int]]): IDs of the participants' stored athletes, if already retrieved.
     """
-    plays_list = plays_data.get('items', [])
-    plays = []
-
-    for play_data in plays_list:
-        play = create_play(session, play_data, drive_id)
-        plays.append(play)
-
-    return plays
+    new_plays_data = [
+        play_data for play_data in plays_data.get('items', []) if int(play_data['id']) not in known_play_ids
+    ]
+    if athlete_ids is None:
+        athlete_ids = get_or_create_athletes(session, participant_athlete_refs(new_plays_data))
+
+    for play_data in new_plays_data:
+        play_id = writer.add(create_play_object(play_data, drive_id))
+        collect_participants(session, writer, play_data.get('participants', []), play_id, athlete_ids)
@@ -1,88 +1,128 @@
-from typing import Dict, Any, List, Optional
+from typing import AbstractSet, Dict, Any, List, Set
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from db.models import PlayParticipant, Athlete
-from db.load.stat import create_stats
-from db.util import fetch_page
-from db.load.athlete import create_athlete
+from db.load.stat import collect_stats
+from db.load.bulk import BulkWriter
+from db.util import resolve_ref, resolve_refs
+from db.load.athlete import create_core_athlete
+from db.entity_cache import get_entity_cache
 from util import get_id_from_url
-from db.extract.athlete import extract_athlete
-from db.extract.play_participant import extract_play_participant
+from db.extract.athlete import extract_athlete, extract_existing_athlete_ids
     
     
-def get_or_create_athlete(session: Session, athlete_url: str) -> Athlete:
+def get_or_create_athlete(session: Session, athlete_ref: Dict[str, Any]) -> Athlete:
     """
     Retrieve an Athlete object, either by querying the database or fetching and creating it.
+    A new athlete is created without its details, which are queued for enrichment.
 
     Args:
         session (Session): SQLAlchemy session object.
-        athlete_url (str): The URL to fetch the athlete's data from.
+        athlete_ref (Dict[str, Any]): The athlete's ``$ref`` object, possibly already expanded.
 
     Returns:
         Athlete: The retrieved or newly created Athlete object.
     """
-    athlete_id = int(get_id_from_url(athlete_url))
+    athlete_id = int(get_id_from_url(athlete_ref.get('$ref', '')))
 
     athlete = extract_athlete(session, athlete_id)
     
     if athlete:
         return athlete
 
-    athlete_data = fetch_page(athlete_url)
-    return create_athlete(session, athlete_data, None)
+    athlete_data = resolve_ref(athlete_ref)
+    return create_core_athlete(session, athlete_data)
 
 
-def create_participant(session: Session, participant_data: Dict[str, Any], play_id: int) -> PlayParticipant:
-    """Creates and persists a PlayParticipant object in the database.
+def participant_athlete_refs(plays_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collect the athlete references of every participant of the given plays.
 
     Args:
-        session (Session): SQLAlchemy session object.
-        participant_data (Dict[str, Any]): Dictionary data from ESPN response.
-        play_id (int): The ID of the play this participant is associated with.
+        plays_data (List[Dict[str, Any]]): List of play dictionaries from ESPN response.
 
     Returns:
-        PlayParticipant: The persisted PlayParticipant object.
+        List[Dict[str, Any]]: The athletes' ``$ref`` objects, possibly already expanded.
     """
-    athlete_url = participant_data.get('athlete', {}).get('$ref', '')
-    athlete = get_or_create_athlete(session, athlete_url)
-
-    order = int(participant_data['order'])
-
-    participant = extract_play_participant(session, athlete.id, order)
-
-    if not participant:
-        participant = PlayParticipant(
-            athlete_id=athlete.id,
-            stats=[],
-            order=order,
-            type=str(participant_data['type']),
-            play_id=play_id
-        )
-
-        session.add(participant)
-        session.commit()
+    return [
+        participant_data.get('athlete', {})
+        for play_data in plays_data
+        for participant_data in play_data.get('participants', [])
+    ]
 
-    create_stats(session, participant_data.get('stats', []), participant.id)
 
-    session.commit()
-    return participant
+def get_or_create_athletes(session: Session, athlete_refs: List[Dict[str, Any]]) -> Set[int]:
+    """
+    Make sure many athletes are stored: those the entity cache does not know are looked up
+    with a single query, and the ones not stored yet are created. Their payloads are
+    fetched concurrently, each athlete once, and their details are queued for enrichment
+    instead of being fetched now.
 
+    Args:
+        session (Session): SQLAlchemy session object.
+        athlete_refs (List[Dict[str, Any]]): The athletes' ``$ref`` objects, possibly already expanded.
 
-def create_participants(session: Session, participants_data: List[Dict[str, Any]], play_id: int) -> List[PlayParticipant]:
-    """Creates and persists a list of PlayParticipant objects in the database.
+    Returns:
+        Set[int]: IDs of the athletes that are stored.
+    """
+    refs_by_id: Dict[int, Dict[str, Any]] = {}
+    for athlete_ref in athlete_refs:
+        if not athlete_ref.get('$ref'):
+            continue
+        athlete_id = int(get_id_from_url(athlete_ref['$ref']))
+        # Prefer a reference that was already expanded in place, so creating it makes no request.
+        if len(athlete_ref) > len(refs_by_id.get(athlete_id, {})):
+            refs_by_id[athlete_id] = athlete_ref
+
+    cache = get_entity_cache()
+    athlete_ids = {athlete_id for athlete_id in refs_by_id if cache.get("athlete", athlete_id) is not None}
+    unknown_ids = [athlete_id for athlete_id in refs_by_id if athlete_id not in athlete_ids]
+
+    stored_ids = extract_existing_athlete_ids(session, unknown_ids) if unknown_ids else set()
+    for athlete_id in stored_ids:
+        cache.put("athlete", athlete_id, athlete_id)
+    athlete_ids |= stored_ids
+
+    missing_ids = [athlete_id for athlete_id in unknown_ids if athlete_id not in stored_ids]
+    missing_data = resolve_refs([refs_by_id[athlete_id] for athlete_id in missing_ids])
+
+    for athlete_id, athlete_data in zip(missing_ids, missing_data):
+        # Athletes that could not be fetched are left to the participants' one-by-one fallback.
+        if athlete_data:
+            athlete_ids.add(create_core_athlete(session, athlete_data).id)
+
+    return athlete_ids
+
+
+def collect_participants(
+    session: Session,
+    writer: BulkWriter,
+    participants_data: List[Dict[str, Any]],
+    play_id: int,
+    athlete_ids: AbstractSet[int] = frozenset(),
+) -> None:
+    """
+    Queue the participants of a new play and their stats for a bulk write. Athletes that
+    are not stored yet are still created on their own, and queued for enrichment.
 
     Args:
         session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         participants_data (List[Dict[str, Any]]): List of dictionaries containing participant data.
         play_id (int): The ID of the play these participants are associated with.
-
-    Returns:
-        List[PlayParticipant]: List of persisted PlayParticipant objects.
+        athlete_ids (AbstractSet[int]): IDs of the athletes known to be stored.
     """
-    participants = []
     for participant_data in participants_data:
-        participant = create_participant(session, participant_data, play_id)
-        participants.append(participant)
-
-    return participants
+        athlete_ref = participant_data.get('athlete', {})
+        athlete_id = int(get_id_from_url(athlete_ref.get('$ref', '')) or 0)
+        if athlete_id not in athlete_ids:
+            athlete_id = get_or_create_athlete(session, athlete_ref).id
+
+        participant_id = writer.add(PlayParticipant(
+            athlete_id=athlete_id,
+            order=int(participant_data['order']),
+            type=str(participant_data['type']),
+            play_id=play_id
+        ))
+        collect_stats(session, writer, participant_data.get('stats', []), participant_id)
@@ -0,0 +1,59 @@
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # BeautifulSoup's html.parser is used instead.
+    lxml = None
+
+# Spotrac pages fetched at once; the scheduler's host rate limit still paces the requests.
+SPOTRAC_FETCH_WORKERS = 8
+
+_TBODY = re.compile(r"<tbody\b.*?</tbody\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def parse_table_rows(page_content: str) -> List[List[str]]:
+    """
+    Return the stripped cell texts of every row of a page's first table body. Only the
+    ``<tbody>`` is parsed: it is cut out of the page first, then parsed with lxml when it
+    is installed, or with BeautifulSoup restricted to the table body otherwise.
+
+    Args:
+        page_content (str): The HTML of the page.
+
+    Returns:
+        List[List[str]]: One list of cell texts per row, empty if the page has no table body.
+    """
+    # Failed requests come back as an empty payload.
+    match = _TBODY.search(page_content) if isinstance(page_content, str) else None
+    if not match:
+        return []
+
+    if lxml is not None:
+        tbody = lxml.html.fragment_fromstring(match.group(0), create_parent="table")
+        return [
+            ["".join(text.strip() for text in cell.itertext()) for cell in row.iterchildren("td")]
+            for row in tbody.iter("tr")
+        ]
+
+    soup = BeautifulSoup(match.group(0), "html.parser", parse_only=SoupStrainer("tbody"))
+    return [
+        [cell.get_text(strip=True) for cell in row.find_all("td")]
+        for row in soup.find_all("tr")
+    ]
+
+
+def run_concurrently(function: Callable[..., Any], arguments: Sequence[Tuple], max_workers: int = SPOTRAC_FETCH_WORKERS) -> List[Any]:
+    """
+    Call ``function`` once per argument tuple on a thread pool, each call in a copy of the
+    caller's context, and return the results in order.
+    """
+    if not arguments:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(arguments))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, function, *args) for args in arguments]
+        return [future.result() for future in futures]
@@ -1,63 +1,75 @@
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 
-from db.models import Stat
-from db.extract.stat import extract_stat
+from db.models import Stat, StatType
+from db.load.bulk import BulkWriter
+from db.entity_cache import get_entity_cache
+from db.extract.stat import extract_stat_type
 
 
-def create_stat(session: Session, stat_data: Dict[str, Any], playparticipant_id: int) -> Stat:
+def get_stat_type_id(session: Session, stat_data: Dict[str, Any]) -> int:
     """
-    Creates and persists a Stat object in the database.
+    Return the ID of a stat's type, from the entity cache when possible, creating the
+    type from the stat's name, description and abbreviation if needed.
 
     Args:
         session (Session): SQLAlchemy session object.
         stat_data (Dict[str, Any]): Dictionary data for a single stat from ESPN response.
-        playparticipant_id (int): The ID of the play participant.
 
     Returns:
-        Stat: The persisted Stat object.
+        int: The stat type ID.
     """
     stat_name = str(stat_data['name'])
-    description = str(stat_data.get('description', ''))
-    abbreviation = str(stat_data.get('abbreviation', ''))
-    stat_value = float(stat_data['value'])
+    cache = get_entity_cache()
+    stat_type_id = cache.get("stat_type", stat_name)
+    if stat_type_id is None:
+        stat_type = extract_stat_type(session, stat_name)
+        if stat_type:
+            # Types created below are cached on their next lookup, once their transaction is committed.
+            cache.put("stat_type", stat_name, stat_type.id)
+        else:
+            stat_type = StatType(
+                name=stat_name,
+                description=str(stat_data.get('description', '')),
+                abbreviation=str(stat_data.get('abbreviation', '')),
+            )
+            session.add(stat_type)
+            session.flush()
+        stat_type_id = stat_type.id
+    return stat_type_id
 
-    existing_stat = extract_stat(
-        session, stat_name, description, abbreviation, stat_value, playparticipant_id
-    )
-    if existing_stat:
-        return existing_stat
-    
-
-    stat = Stat(
-        name=stat_name,
-        description=description,
-        abbreviation=abbreviation,
-        value=stat_value,
-        playparticipant_id=playparticipant_id
-    )
 
-    session.add(stat)
-    session.commit()
+def create_stat_object(session: Session, stat_data: Dict[str, Any], playparticipant_id: int) -> Stat:
+    """
+    Create a Stat object from the given data.
+
+    Args:
+        session (Session): SQLAlchemy session object, used to get or create the stat type.
+        stat_data (Dict[str, Any]): Dictionary data for a single stat from ESPN response.
+        playparticipant_id (int): The ID of the play participant.
 
-    return stat
+    Returns:
+        Stat: The newly created Stat object.
+    """
+    return Stat(
+        playparticipant_id=playparticipant_id,
+        stat_type_id=get_stat_type_id(session, stat_data),
+        value=float(stat_data['value']),
+    )
 
 
-def create_stats(session: Session, stats_data: List[Dict[str, Any]], playparticipant_id: int) -> List[Stat]:
+def collect_stats(
+    session: Session, writer: BulkWriter, stats_data: List[Dict[str, Any]], playparticipant_id: int
+) -> None:
     """
-    Creates and persists multiple Stat objects in the database.
+    Queue the stats of a new play participant for a bulk write. Stat types are resolved
+    through the session.
 
     Args:
         session (Session): SQLAlchemy session object.
+        writer (BulkWriter): Writer collecting the rows of the unit of work.
         stats_data (List[Dict[str, Any]]): List of dictionary data for multiple stats from ESPN response.
         playparticipant_id (int): The ID of the play participant.
-
-    Returns:
-        List[Stat]: List of persisted Stat objects.
     """
-    stats = []
     for stat_data in stats_data:
-        stat = create_stat(session, stat_data, playparticipant_id)
-        stats.append(stat)
-
-    return stats
+        writer.add(create_stat_object(session, stat_data, playparticipant_id))
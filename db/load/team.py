@@ -1,10 +1,9 @@
-import random
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 
 from db.util import fetch_page
 from db.models import Team
+from db.entity_cache import get_entity_cache
 from db.extract.team import extract_team
 
 
@@ -36,7 +35,11 @@ def get_or_create_team(session: Session, team_data: Dict[str, Any]) -> Team:
     Returns:
         Team: The existing or newly created Team object.
     """
-    team = extract_team(session, int(team_data['id']))
+    team_id = int(team_data['id'])
+    if get_entity_cache().get("team", team_id) is not None:
+        return session.get(Team, team_id)
+
+    team = extract_team(session, team_id)
     
     if team:
         return team
@@ -44,38 +47,35 @@ def get_or_create_team(session: Session, team_data: Dict[str, Any]) -> Team:
     return create_new_team(team_data)
 
 
-def fetch_teams_data(team_urls: List[str], proxies: List[str]) -> List[Dict[str, Any]]:
+def fetch_teams_data(team_urls: List[str]) -> List[Dict[str, Any]]:
     """
-    Fetch team data from a list of URLs using a list of proxies.
+    Fetch team data from a list of URLs.
 
     Args:
         team_urls (List[str]): A list of team URLs to fetch data from.
-        proxies (List[str]): List of proxies to use for requests.
 
     Returns:
         List[Dict[str, Any]]: A list of team data dictionaries.
     """
     team_data_list = []
     for team_url in team_urls:
-        proxy = {"http": random.choice(proxies)} if proxies else None
-        team_data = fetch_page(team_url, proxy=proxy)
+        team_data = fetch_page(team_url)
         team_data_list.append(team_data)
     return team_data_list
 
 
-def create_teams(session: Session, team_urls: List[str], proxies: List[str]) -> List[Team]:
+def create_teams(session: Session, team_urls: List[str]) -> List[Team]:
     """
-    Creates or fetches teams from the given list of URLs, using a list of proxies.
+    Creates or fetches teams from the given list of URLs.
 
     Args:
         session (Session): SQLAlchemy session object.
         team_urls (List[str]): List of team URLs.
-        proxies (List[str]): List of proxies to use for requests.
 
     Returns:
         List[Team]: List of Team objects.
     """
-    team_data_list = fetch_teams_data(team_urls, proxies)
+    team_data_list = fetch_teams_data(team_urls)
 
     teams = []
     for team_data in team_data_list:
@@ -87,4 +87,8 @@ def create_teams(session: Session, team_urls: List[str], proxies: List[str]) ->
     session.add_all(new_teams)
     session.commit()
 
+    cache = get_entity_cache()
+    for team in teams:
+        cache.put("team", team.id, team.id)
+
     return teams
@@ -0,0 +1,202 @@
+import logging
+from typing import List, Set
+from sqlalchemy import Float, Index, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from db.models import Base, Contract, Stat, StatType
+from util import parse_money
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def count_duplicates(connection: Connection, index: Index) -> int:
+    """Count the rows that would violate a unique index if it were created now."""
+    table = _quote(connection, index.table.name)
+    columns = ", ".join(_quote(connection, column.name) for column in index.columns)
+    return connection.execute(text(
+        f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {columns} HAVING n > 1)"
+    )).scalar()
+
+
+def remove_duplicates(connection: Connection, index: Index) -> None:
+    """
+    Keep the oldest row of every group of rows sharing the unique index's columns. Rows
+    of other tables that reference a removed row are pointed at the kept one first; a
+    referencing row that would then collide with one already on the kept row (a stat of the
+    same type on a merged play participant) is dropped instead.
+    """
+    table: Table = index.table
+    name = _quote(connection, table.name)
+    key_match = " AND ".join(
+        f"kept.{_quote(connection, column.name)} IS dup.{_quote(connection, column.name)}" for column in index.columns
+    )
+    kept_id = f"(SELECT MIN(kept.id) FROM {name} kept JOIN {name} dup ON {key_match} WHERE dup.id = {{reference}})"
+    columns = ", ".join(_quote(connection, column.name) for column in index.columns)
+    duplicate_ids = f"SELECT id FROM {name} WHERE id NOT IN (SELECT MIN(id) FROM {name} GROUP BY {columns})"
+
+    for referencing in Base.metadata.sorted_tables:
+        for foreign_key in referencing.foreign_keys:
+            if foreign_key.column.table is not table:
+                continue
+            referencing_name = _quote(connection, referencing.name)
+            reference = f"{referencing_name}.{_quote(connection, foreign_key.parent.name)}"
+            connection.execute(text(
+                f"UPDATE OR IGNORE {referencing_name} SET {_quote(connection, foreign_key.parent.name)} = "
+                f"{kept_id.format(reference=reference)} WHERE {reference} IN ({duplicate_ids})"
+            ))
+            connection.execute(text(f"DELETE FROM {referencing_name} WHERE {reference} IN ({duplicate_ids})"))
+
+    connection.execute(text(f"DELETE FROM {name} WHERE id IN ({duplicate_ids})"))
+
+
+def add_missing_columns(connection: Connection, table: Table, existing_columns: Set[str]) -> List[str]:
+    """
+    Add the nullable columns a table created by an older version lacks. Their values are
+    left NULL on existing rows.
+
+    Returns:
+        List[str]: Names of the columns added, as ``table.column``.
+    """
+    added = []
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        if not column.nullable or column.primary_key:
+            raise RuntimeError(f"Cannot add the required column {table.name}.{column.name} to an existing table.")
+
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(
+            f"ALTER TABLE {_quote(connection, table.name)} ADD COLUMN {_quote(connection, column.name)} {column_type}"
+        ))
+        added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def normalize_stats(connection: Connection) -> int:
+    """
+    Rewrite a stats table that repeats its name, description and abbreviation on every row
+    into stat types and (participant, stat type, value) rows. Each stat name becomes one
+    type, described by its first row; when a participant has the same stat twice, the
+    oldest row is kept.
+
+    Returns:
+        int: Number of stat rows kept.
+    """
+    stats = _quote(connection, Stat.__table__.name)
+    stat_types = _quote(connection, StatType.__table__.name)
+    legacy = _quote(connection, "stats_legacy")
+
+    connection.execute(text(
+        f"INSERT INTO {stat_types} (name, description, abbreviation) "
+        f"SELECT s.name, s.description, s.abbreviation FROM {stats} s "
+        f"WHERE s.id IN (SELECT MIN(id) FROM {stats} GROUP BY name) "
+        f"AND s.name NOT IN (SELECT name FROM {stat_types}) ORDER BY s.id"
+    ))
+    connection.execute(text(f"ALTER TABLE {stats} RENAME TO {legacy}"))
+    Stat.__table__.create(connection)
+
+    connection.execute(text(
+        f"INSERT OR IGNORE INTO {stats} (playparticipant_id, stat_type_id, value) "
+        f"SELECT s.playparticipant_id, t.id, s.value FROM {legacy} s "
+        f"JOIN {stat_types} t ON t.name = s.name ORDER BY s.id"
+    ))
+    connection.execute(text(f"DROP TABLE {legacy}"))
+    return connection.execute(text(f"SELECT COUNT(*) FROM {stats}")).scalar()
+
+
+def parse_contract_money(connection: Connection) -> int:
+    """
+    Rewrite a contracts table that stores its money columns as Spotrac's display strings
+    ("$1,250,000", "-") with the amounts as numbers (see ``util.parse_money``).
+
+    Returns:
+        int: Number of contracts rewritten.
+    """
+    table = Contract.__table__
+    contracts = _quote(connection, table.name)
+    legacy = _quote(connection, "contracts_legacy")
+    money_columns = [column.name for column in table.columns if isinstance(column.type, Float)]
+
+    connection.execute(text(f"ALTER TABLE {contracts} RENAME TO {legacy}"))
+    for index in table.indexes:
+        connection.execute(text(f"DROP INDEX IF EXISTS {_quote(connection, index.name)}"))
+    table.create(connection)
+
+    rows = [dict(row) for row in connection.execute(text(f"SELECT * FROM {legacy}")).mappings()]
+    for row in rows:
+        for name in money_columns:
+            if isinstance(row[name], str):
+                row[name] = parse_money(row[name])
+    if rows:
+        connection.execute(table.insert(), rows)
+    connection.execute(text(f"DROP TABLE {legacy}"))
+    return len(rows)
+
+
+def migrate(engine: Engine) -> List[str]:
+    """
+    Bring an existing database up to the columns, indexes and natural-key unique constraints
+    declared in ``db.models``. Tables are created by ``create_all``; this rewrites the stats
+    of older versions into stat types and their contract amounts into numbers, and adds the nullable columns and the indexes that
+    tables created by an older version lack. Duplicates that would block a unique index are
+    merged into the oldest row first. Safe to run on every start.
+
+    Args:
+        engine (Engine): Engine of the database to migrate.
+
+    Returns:
+        List[str]: Names of the tables rewritten, columns added and indexes created.
+    """
+    rewritten, added, created = [], [], []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+
+        if (
+            Stat.__table__.name in existing_tables
+            and "name" in {column["name"] for column in inspector.get_columns(Stat.__table__.name)}
+        ):
+            logging.info("Normalizing the stats table into stat types.")
+            kept = normalize_stats(connection)
+            rewritten.append(Stat.__table__.name)
+            logging.info(f"Kept {kept} stats.")
+            inspector = inspect(connection)
+
+        if Contract.__table__.name in existing_tables and isinstance(
+            {column["name"]: column["type"] for column in inspector.get_columns(Contract.__table__.name)}["dead_cap"],
+            String,
+        ):
+            logging.info("Parsing the money columns of the contracts table.")
+            rewritten_contracts = parse_contract_money(connection)
+            rewritten.append(Contract.__table__.name)
+            logging.info(f"Rewrote {rewritten_contracts} contracts.")
+            inspector = inspect(connection)
+
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            added += add_missing_columns(connection, table, existing_columns)
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing_indexes:
+                    continue
+
+                if index.unique:
+                    duplicates = count_duplicates(connection, index)
+                    if duplicates:
+                        logging.warning(f"Merging {duplicates} duplicate rows in {table.name} before adding {index.name}.")
+                        remove_duplicates(connection, index)
+
+                index.create(connection)
+                created.append(index.name)
+
+    if added:
+        logging.info(f"Added columns: {', '.join(added)}.")
+    if created:
+        logging.info(f"Created indexes: {', '.join(created)}.")
+    return rewritten + added + created
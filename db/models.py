@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import Table, Column, ForeignKey, Integer, String, Boolean, Float, DateTime
+from sqlalchemy import Table, Column, ForeignKey, Index, Integer, String, Boolean, Float, DateTime, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declarative_base 
 
 
@@ -45,9 +45,12 @@ class Team(BaseModel):
     
 class TeamHistory(BaseModel):
     __tablename__ = "teamhistory"
+    __table_args__ = (
+        Index("uq_teamhistory_athlete_team_season", "athlete_id", "team_id", "season", unique=True),
+    )
     
     athlete_id: Mapped[int] = mapped_column(ForeignKey("athletes.id"))
-    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"))
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), index=True)
     season = Column(Integer)
 
     athlete: Mapped["Athlete"] = relationship("Athlete", back_populates="teamhistory")
@@ -67,21 +70,25 @@ class Rating(BaseModel):
     
     rating_type = Column(String)
     rating = Column(Integer)
+    release = Column(String, nullable=True, index=True)
     
-    athlete_id: Mapped[int] = mapped_column(ForeignKey("athletes.id"))
+    athlete_id: Mapped[int] = mapped_column(ForeignKey("athletes.id"), index=True)
     athletes: Mapped["Athlete"] = relationship(back_populates="ratings")
 
 
 class Competitor(BaseModel):
     __tablename__ = "competitors"
+    __table_args__ = (
+        Index("uq_competitors_competition_team", "competition_id", "team_id", unique=True),
+    )
 
     is_home = Column(Boolean)
     is_winner = Column(Boolean, nullable=True)
     score = Column(Integer, nullable=True)
 
-    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"))
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), index=True)
     team: Mapped["Team"] = relationship(viewonly=True)  # 👈 Make view-only
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), index=True)
     event: Mapped["Event"] = relationship(back_populates="competitors")
     competition_id: Mapped[int] = mapped_column(ForeignKey("competitions.id"))
     competition: Mapped["Competition"] = relationship(back_populates="competitors")
@@ -102,13 +109,16 @@ class Venue(BaseModel):
 
 class PlayParticipant(BaseModel):
     __tablename__ = "playparticipants"
+    __table_args__ = (
+        Index("uq_playparticipants_play_athlete_order", "play_id", "athlete_id", "order", unique=True),
+    )
 
     order = Column(Integer)
     type = Column(String)
     
     play_id: Mapped[int] = mapped_column(ForeignKey("plays.id"))
     play: Mapped["Play"] = relationship(back_populates="participants")
-    athlete_id: Mapped[int] = mapped_column(ForeignKey("athletes.id"))
+    athlete_id: Mapped[int] = mapped_column(ForeignKey("athletes.id"), index=True)
     athlete: Mapped["Athlete"] = relationship(back_populates="playparticipants")
     stats: Mapped[list["Stat"]] = relationship(back_populates="playparticipant")
 
@@ -133,7 +143,7 @@ class Play(BaseModel):
     start_yards_to_endzone = Column(Integer)
     end_yards_to_endzone = Column(Integer)
     
-    drive_id: Mapped[int] = mapped_column(ForeignKey("drives.id"), nullable=True)
+    drive_id: Mapped[int] = mapped_column(ForeignKey("drives.id"), nullable=True, index=True)
     drive: Mapped["Drive"] = relationship(back_populates="plays")
     participants: Mapped[list["PlayParticipant"]] = relationship(back_populates="play")
 
@@ -151,8 +161,9 @@ class Drive(BaseModel):
     end_time = Column(Integer)
     end_yardline = Column(Integer)
     
-    competition_id: Mapped[int] = mapped_column(ForeignKey("competitions.id"))
+    competition_id: Mapped[int] = mapped_column(ForeignKey("competitions.id"), index=True)
     competition: Mapped["Competition"] = relationship(back_populates="drives")
+    team_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
     plays: Mapped[list["Play"]] = relationship(back_populates="drive")
     
     
@@ -167,7 +178,7 @@ class Competition(BaseModel):
     __tablename__ = "competitions"
 
     date = Column(DateTime)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), index=True)
     event: Mapped["Event"] = relationship(back_populates="competition")  
     venue_id: Mapped[int | None] = mapped_column(ForeignKey("venues.id"), nullable=True)
     venue: Mapped["Venue"] = relationship(back_populates="competitions")
@@ -185,6 +196,9 @@ class Competition(BaseModel):
 
 class CompetitionStatus(BaseModel):
     __tablename__ = "competition_statuses"
+    __table_args__ = (
+        Index("ix_competition_statuses_lookup", "competition_status_type_id", "period", "clock", "display_clock"),
+    )
 
     clock = Column(Integer)
     display_clock = Column(String)
@@ -234,6 +248,9 @@ class Weather(BaseModel):
 
 class Event(BaseModel):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_season_type_week", "season", "season_type", "week"),
+    )
 
     season = Column(Integer)
     week = Column(Integer)
@@ -248,16 +265,29 @@ class Event(BaseModel):
     teams: Mapped[list["Team"]] = relationship("Team", secondary="competitors", back_populates="events")  # Corrected
   
     
-class Stat(BaseModel):
-    __tablename__ = "stats"
-    
+class StatType(BaseModel):
+    __tablename__ = "stat_types"
+    __table_args__ = (
+        Index("uq_stat_types_name", "name", unique=True),
+    )
+
     name = Column(String)
     description = Column(String)
     abbreviation = Column(String)
-    value = Column(Float)
-    
-    playparticipant_id: Mapped[int] = mapped_column(ForeignKey("playparticipants.id"))
+
+    stats: Mapped[list["Stat"]] = relationship(back_populates="stat_type")
+
+
+class Stat(Base):
+    __tablename__ = "stats"
+    # Rows live in the primary key's b-tree, without a separate rowid table.
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    playparticipant_id: Mapped[int] = mapped_column(ForeignKey("playparticipants.id"), primary_key=True)
     playparticipant: Mapped["PlayParticipant"] = relationship(back_populates="stats")
+    stat_type_id: Mapped[int] = mapped_column(ForeignKey("stat_types.id"), primary_key=True)
+    stat_type: Mapped["StatType"] = relationship(back_populates="stats")
+    value = Column(Float)
     
     
 class Official(BaseModel):
@@ -288,22 +318,105 @@ class OfficialPosition(BaseModel):
 class Contract(BaseModel):
     __tablename__ = 'contracts'
 
-    athlete_id = Column(Integer, ForeignKey('athletes.id'), nullable=False)
+    athlete_id = Column(Integer, ForeignKey('athletes.id'), nullable=False, index=True)
     team_name = Column(String, nullable=False)
     year = Column(Integer, nullable=False)
-    apy_hit_pct = Column(String)
-    dead_cap = Column(String)
-    base_salary = Column(String)
-    signing_bonus = Column(String)
-    per_game_bonus = Column(String)
-    roster_bonus = Column(String)
-    option_bonus = Column(String)
-    workout_bonus = Column(String)
-    restructure_bonus = Column(String)
-    incentives = Column(String)
+    apy_hit_pct = Column(Float)
+    dead_cap = Column(Float)
+    base_salary = Column(Float)
+    signing_bonus = Column(Float)
+    per_game_bonus = Column(Float)
+    roster_bonus = Column(Float)
+    option_bonus = Column(Float)
+    workout_bonus = Column(Float)
+    restructure_bonus = Column(Float)
+    incentives = Column(Float)
 
     athlete = relationship("Athlete", back_populates="contracts")
-    
+
+
+class AthleteEnrichment(Base):
+    """An athlete created from a play whose team history and contracts are still to be fetched."""
+    __tablename__ = "athlete_enrichment_queue"
+
+    athlete_id = Column(Integer, ForeignKey("athletes.id"), primary_key=True)
+    queued_at = Column(DateTime)
+
+
+class RunJournalEntry(Base):
+    """A unit of initialization work that completed: a phase, an event week or a finished competition."""
+    __tablename__ = "run_journal"
+
+    kind = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    completed_at = Column(DateTime)
+
+
+class DriveSummary(Base):
+    """Drive totals shared by the team summaries, which are rebuilt by ``db.summary``."""
+    __abstract__ = True
+
+    games = Column(Integer)
+    points_scored = Column(Integer)
+    drives = Column(Integer)
+    scoring_drives = Column(Integer)
+    drive_yards = Column(Integer)
+    offensive_plays = Column(Integer)
+    drive_points = Column(Integer)
+
+    @property
+    def yards_per_drive(self) -> float:
+        return self.drive_yards / self.drives if self.drives else 0.0
+
+    @property
+    def scoring_drive_rate(self) -> float:
+        return self.scoring_drives / self.drives if self.drives else 0.0
+
+
+class TeamGameSummary(DriveSummary):
+    __tablename__ = "team_game_summaries"
+    __table_args__ = (
+        Index("ix_team_game_summaries_team_season", "team_id", "season", "season_type"),
+    )
+
+    competition_id = Column(Integer, ForeignKey("competitions.id"), primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    season = Column(Integer)
+    season_type = Column(Integer)
+    week = Column(Integer)
+
+
+class TeamSeasonSummary(DriveSummary):
+    __tablename__ = "team_season_summaries"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    season = Column(Integer, primary_key=True)
+    season_type = Column(Integer, primary_key=True)
+
+
+class AthleteSeasonStat(Base):
+    """An athlete's total of one stat over a season, rebuilt by ``db.summary``."""
+    __tablename__ = "athlete_season_stats"
+
+    athlete_id = Column(Integer, ForeignKey("athletes.id"), primary_key=True)
+    season = Column(Integer, primary_key=True)
+    season_type = Column(Integer, primary_key=True)
+    stat_name = Column(String, primary_key=True)
+    total = Column(Float)
+    plays = Column(Integer)
+
+
+class MaddenPlayer(Base):
+    """A player of a Madden release's ratings catalog, fetched by ``db.load.athlete_rating``."""
+    __tablename__ = "madden_players"
+
+    release = Column(String, primary_key=True)
+    madden_id = Column(String, primary_key=True)
+    full_name = Column(String)
+    team = Column(String)
+    position = Column(String)
+    stats = Column(JSON)
+
 # class Contract(BaseModel):
 #     __tablename__ = 'contracts'
 
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.load.bulk import BulkWriter, Rows, merge_rows, write_rows
+from db.load.event import collect_event
+from db.load.ingest import AsyncEventIngestor, WRITE_QUEUE_SIZE
+
+# Parsed events waiting for the writer, and how many of them are written per transaction.
+ROW_QUEUE_SIZE = 16
+WRITE_BATCH_SIZE = 8
+
+_FLUSH = object()
+
+
+class StageMetrics:
+    """Throughput of one pipeline stage and the depth of the queue feeding it."""
+
+    def __init__(self, name: str, depth: Callable[[], int]):
+        """
+        Args:
+            name (str): Name of the stage.
+            depth (Callable[[], int]): Returns the number of items waiting for the stage.
+        """
+        self.name = name
+        self.depth = depth
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float) -> None:
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+            self.max_depth = max(self.max_depth, self.depth())
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        with self._lock:
+            return {
+                "stage": self.name,
+                "items": self.items,
+                "per_second": self.items / elapsed,
+                "seconds_per_item": self.busy_seconds / self.items if self.items else 0.0,
+                "queue_depth": self.depth(),
+                "max_queue_depth": self.max_depth,
+            }
+
+
+class EventPipeline(AsyncEventIngestor):
+    """
+    Ingest events in three stages connected by bounded queues, so a slow request never
+    stalls the database and a slow commit never stalls the network:
+
+    - fetch: the ingestor's concurrent fetchers expand each event's reference graph;
+    - parse: one thread turns each expanded event into row dictionaries, allocating
+      primary keys, and resolves the few rows that are looked up or created by key
+      (statuses, positions, athletes) through its own session;
+    - write: one thread writes the rows of several events per transaction.
+
+    A full queue blocks the stage feeding it, so a slow writer holds parsing back, which
+    in turn holds fetching back. Per-stage throughput and queue depths are available
+    from ``metrics``.
+    """
+
+    def __init__(
+        self,
+        SessionLocal: sessionmaker,
+        queue_size: int = WRITE_QUEUE_SIZE,
+        row_queue_size: int = ROW_QUEUE_SIZE,
+        batch_size: int = WRITE_BATCH_SIZE,
+    ):
+        """
+        Args:
+            SessionLocal (sessionmaker): Factory for database sessions.
+            queue_size (int): Maximum number of fetched events waiting to be parsed.
+            row_queue_size (int): Maximum number of parsed events waiting to be written.
+            batch_size (int): Maximum number of events written per transaction.
+        """
+        super().__init__(SessionLocal, queue_size, write_event=self._parse_event)
+        self.row_queue: queue.Queue = queue.Queue(maxsize=row_queue_size)
+        self.batch_size = batch_size
+        self.fetching = 0
+        self.fetch_metrics = StageMetrics("fetch", lambda: self.fetching)
+        self.parse_metrics = StageMetrics("parse", lambda: self.queue.qsize())
+        self.write_metrics = StageMetrics("write", self.row_queue.qsize)
+
+    async def __aenter__(self) -> "EventPipeline":
+        await super().__aenter__()
+        self.parse_session = self.SessionLocal()
+        self.parse_writer = BulkWriter(self.parse_session)
+        self.write_thread = threading.Thread(target=self._write_batches, name="db-batch-writer", daemon=True)
+        self.write_thread.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await super().__aexit__(*exc_info)
+        self.row_queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self.write_thread.join)
+        self.parse_session.close()
+        if self.fetch_metrics.items:
+            self.log_metrics()
+
+    async def fetch_event_graph(self, event_url: str) -> Dict[str, Any]:
+        self.fetching += 1
+        started_at = time.monotonic()
+        try:
+            return await super().fetch_event_graph(event_url)
+        finally:
+            self.fetch_metrics.record(1, time.monotonic() - started_at)
+            self.fetching -= 1
+
+    def _parse_event(self, event_data: Dict[str, Any]) -> None:
+        started_at = time.monotonic()
+        try:
+            event_id = collect_event(self.parse_session, self.parse_writer, event_data)
+            # Rows created by key while parsing must be committed before the rows referencing them.
+            self.parse_session.commit()
+        except Exception:
+            self.parse_session.rollback()
+            self.parse_writer.take()
+            raise
+
+        rows = self.parse_writer.take()
+        self.parse_metrics.record(1, time.monotonic() - started_at)
+        if event_id is not None:
+            self.row_queue.put((event_id, rows))
+
+    def after_writes(self, callback: Callable[[], None]) -> None:
+        self.row_queue.put(callback)
+
+    def _write_batch(self, session: Session, batch: List[Tuple[int, Rows]]) -> None:
+        started_at = time.monotonic()
+        rows: Rows = {}
+        for _, event_rows in batch:
+            merge_rows(rows, event_rows)
+
+        try:
+            written = write_rows(session, rows)
+        except Exception as e:
+            # One bad event must not cost the others of its batch.
+            logging.warning(f"Failed to write a batch of {len(batch)} events, writing them one by one. Details: {e}")
+            written = 0
+            for event_id, event_rows in batch:
+                try:
+                    written += write_rows(session, event_rows)
+                except Exception as e:
+                    logging.error(f"Failed to write event {event_id}. Details: {e}")
+
+        self.write_metrics.record(len(batch), time.monotonic() - started_at)
+        logging.debug(f"Wrote {written} rows of {len(batch)} events.")
+
+    def _write_batches(self) -> None:
+        batch: List[Tuple[int, Rows]] = []
+        with self.SessionLocal() as session:
+            while True:
+                try:
+                    item = self.row_queue.get(block=not batch)
+                except queue.Empty:
+                    item = _FLUSH
+
+                if isinstance(item, tuple):
+                    batch.append(item)
+                    if len(batch) < self.batch_size:
+                        continue
+                    item = _FLUSH
+
+                if batch:
+                    self._write_batch(session, batch)
+                    batch = []
+
+                if item is None:
+                    break
+                if callable(item):
+                    try:
+                        item()
+                    except Exception as e:
+                        logging.error(f"Failed to run a callback queued after event writes. Details: {e}")
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Return the number of events waiting for each stage."""
+        return {metrics.name: metrics.depth() for metrics in (self.fetch_metrics, self.parse_metrics, self.write_metrics)}
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Return the throughput and queue depth of each stage."""
+        return [metrics.snapshot() for metrics in (self.fetch_metrics, self.parse_metrics, self.write_metrics)]
+
+    def log_metrics(self) -> None:
+        for snapshot in self.metrics():
+            logging.info(
+                f"Pipeline {snapshot['stage']} stage: {snapshot['items']} events, {snapshot['per_second']:.2f}/s, "
+                f"{snapshot['seconds_per_item']:.3f}s each, queue depth {snapshot['queue_depth']} "
+                f"(max {snapshot['max_queue_depth']})."
+            )
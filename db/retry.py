@@ -0,0 +1,203 @@
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Iterator
+
+_DEAD_LETTER_CONTEXT: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "dead_letter_context", default=None
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header given either in seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request: exponential backoff
+    with full jitter, ``Retry-After`` honored, and a deadline across all attempts.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        deadline: float = 120.0,
+        retry_throttled: bool = True,
+        retry_server_errors: bool = True,
+        retry_timeouts: bool = True,
+    ):
+        """
+        Args:
+            max_attempts (int): Maximum number of attempts, the first one included.
+            base_delay (float): Backoff of the first retry in seconds, doubled on every attempt.
+            max_delay (float): Upper bound of a single backoff in seconds.
+            deadline (float): Seconds after the first attempt past which no retry is started.
+            retry_throttled (bool): Retry 429 responses.
+            retry_server_errors (bool): Retry 5xx responses.
+            retry_timeouts (bool): Retry timeouts and connection errors.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_throttled = retry_throttled
+        self.retry_server_errors = retry_server_errors
+        self.retry_timeouts = retry_timeouts
+
+    def is_retryable_status(self, status: int) -> bool:
+        if status == 429:
+            return self.retry_throttled
+        return status >= 500 and self.retry_server_errors
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): Number of attempts made so far.
+            retry_after (Optional[float]): Wait requested by the server, which takes precedence.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def next_delay(
+        self, attempt: int, started_at: float, retryable: bool, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Decide whether a failed attempt is retried.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None to give up.
+        """
+        if not retryable or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        if time.monotonic() + delay > started_at + self.deadline:
+            return None
+        return delay
+
+
+class DeadLetterQueue:
+    """
+    Requests that still failed after every retry. Each entry keeps the URL, the failure
+    and the unit of work (usually an event URL) it was fetched for, so the unit can be
+    re-ingested later. Entries can be saved to and loaded from a JSON lines file.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, url: str, status: Optional[int], error: str, attempts: int) -> None:
+        entry = {
+            "url": url,
+            "context": _DEAD_LETTER_CONTEXT.get(),
+            "status": status,
+            "error": error,
+            "attempts": attempts,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries = []
+
+    def failed_in(self, context: str) -> List[Dict[str, Any]]:
+        """Return the entries recorded while working on the given unit of work."""
+        with self._lock:
+            return [entry for entry in self.entries if entry["context"] == context]
+
+    def failed_for(self, url: str) -> List[Dict[str, Any]]:
+        """Return the entries of requests to ``url``, any page or query string included."""
+        with self._lock:
+            return [entry for entry in self.entries if entry["url"].split("?")[0] == url.split("?")[0]]
+
+    def drain_contexts(self) -> List[str]:
+        """
+        Remove every entry and return the distinct units of work they failed in, in failure
+        order, for replay. Requests made outside any unit of work are dropped. Replaying a
+        unit that fails again adds its entries back.
+        """
+        with self._lock:
+            entries, self.entries = self.entries, []
+        return list(dict.fromkeys(entry["context"] for entry in entries if entry["context"]))
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            with open(path, "w") as file:
+                for entry in self.entries:
+                    file.write(json.dumps(entry) + "\n")
+
+    def load(self, path: str) -> int:
+        """Append the entries saved in ``path``, if it exists, and return how many were loaded."""
+        try:
+            with open(path) as file:
+                entries = [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return 0
+
+        with self._lock:
+            self.entries.extend(entries)
+        logging.info(f"Loaded {len(entries)} dead-lettered requests from {path}.")
+        return len(entries)
+
+
+@contextmanager
+def dead_letter_context(context: str) -> Iterator[None]:
+    """Tag every request that fails inside the block with ``context``, e.g. the event URL being ingested."""
+    token = _DEAD_LETTER_CONTEXT.set(context)
+    try:
+        yield
+    finally:
+        _DEAD_LETTER_CONTEXT.reset(token)
+
+
+DEAD_LETTERS = DeadLetterQueue()
+_RETRY_POLICY = RetryPolicy()
+
+
+def configure_retry_policy(**kwargs) -> RetryPolicy:
+    """Replace the retry policy used by the fetchers with one built from the given ``RetryPolicy`` options."""
+    global _RETRY_POLICY
+    _RETRY_POLICY = RetryPolicy(**kwargs)
+    return _RETRY_POLICY
+
+
+def get_retry_policy() -> RetryPolicy:
+    return _RETRY_POLICY
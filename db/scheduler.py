@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional, Tuple, Iterator, AsyncIterator
+from urllib.parse import urlsplit
+
+# Requests per second and burst size per host. Spotrac and EA throttle far earlier than ESPN.
+DEFAULT_HOST_RATES: Dict[str, Tuple[float, int]] = {
+    "sports.core.api.espn.com": (20.0, 40),
+    "www.spotrac.com": (1.0, 2),
+    "drop-api.ea.com": (5.0, 10),
+}
+DEFAULT_RATE = (10.0, 20)
+MAX_IN_FLIGHT = 32
+POLL_INTERVAL = 0.05
+# Statuses that mean the proxy is blocked or throttled rather than the resource being bad.
+PROXY_FAILURE_STATUSES = {403, 407, 429}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ProxyHealth:
+    """Running health score of a proxy: an exponentially weighted success rate plus a failure streak."""
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.score = 1.0
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.disabled_until = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.disabled_until
+
+
+class RequestSlot:
+    """A granted permission to send one request, released back to the scheduler when done."""
+
+    def __init__(self, host: str, proxy: Optional[str]):
+        self.host = host
+        self.proxy = proxy
+        self.responded = False
+        self.failed = False
+
+    def record_status(self, status: int) -> None:
+        """Record the HTTP status of the response; blocked or throttled statuses count as a failure."""
+        self.responded = True
+        self.failed = status in PROXY_FAILURE_STATUSES
+
+    def mark_failed(self) -> None:
+        """Count this request against the proxy's health."""
+        self.failed = True
+
+
+class RequestScheduler:
+    """
+    Central gate every outgoing request goes through. It enforces a token-bucket rate
+    limit per host, a global and a per-proxy cap on requests in flight, and picks
+    proxies by health score, taking proxies that keep failing out of rotation for a
+    cool-down period.
+    """
+
+    def __init__(
+        self,
+        proxies: Optional[List[str]] = None,
+        host_rates: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_rate: Tuple[float, int] = DEFAULT_RATE,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_in_flight_per_proxy: int = 4,
+        failure_threshold: int = 5,
+        min_score: float = 0.2,
+        cooldown: float = 300.0,
+        smoothing: float = 0.2,
+    ):
+        """
+        Args:
+            proxies (Optional[List[str]]): Proxy URLs to rotate through. Requests go direct when empty.
+            host_rates (Optional[Dict[str, Tuple[float, int]]]): (requests per second, burst) per host.
+            default_rate (Tuple[float, int]): Rate limit for hosts not listed in ``host_rates``.
+            max_in_flight (int): Maximum number of requests in flight across all hosts.
+            max_in_flight_per_proxy (int): Maximum number of requests in flight through one proxy.
+            failure_threshold (int): Consecutive failures after which a proxy is taken out of rotation.
+            min_score (float): Health score below which a proxy is taken out of rotation.
+            cooldown (float): Seconds a failing proxy stays out of rotation.
+            smoothing (float): Weight of the latest outcome in a proxy's health score.
+        """
+        self.host_rates = {**DEFAULT_HOST_RATES, **(host_rates or {})}
+        self.default_rate = default_rate
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_proxy = max_in_flight_per_proxy
+        self.failure_threshold = failure_threshold
+        self.min_score = min_score
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self.proxies: Dict[str, ProxyHealth] = {proxy: ProxyHealth(proxy) for proxy in proxies or []}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(*self.host_rates.get(host, self.default_rate))
+            self.buckets[host] = bucket
+        return bucket
+
+    def _choose_proxy(self, now: float) -> Optional[ProxyHealth]:
+        candidates = [
+            health for health in self.proxies.values()
+            if health.is_available(now) and health.in_flight < self.max_in_flight_per_proxy
+        ]
+        if not candidates:
+            return None
+        return random.choices(candidates, weights=[health.score for health in candidates])[0]
+
+    def choose_proxy(self) -> Optional[str]:
+        """Return a healthy proxy weighted by health score, or None if none is available."""
+        with self._lock:
+            health = self._choose_proxy(time.monotonic())
+            return health.proxy if health else None
+
+    def _try_acquire(self, url: str, proxy: Optional[str]) -> Tuple[Optional[RequestSlot], float]:
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                return None, POLL_INTERVAL
+
+            health = None
+            if proxy is not None:
+                health = self.proxies.get(proxy)
+                if health and health.in_flight >= self.max_in_flight_per_proxy:
+                    return None, POLL_INTERVAL
+            elif self.proxies:
+                health = self._choose_proxy(now)
+                if health is None:
+                    earliest = min(h.disabled_until for h in self.proxies.values())
+                    return None, max(POLL_INTERVAL, earliest - now)
+
+            wait = self._bucket(host).reserve()
+            if wait > 0:
+                return None, wait
+
+            self.in_flight += 1
+            if health:
+                health.in_flight += 1
+            return RequestSlot(host, health.proxy if health else proxy), 0.0
+
+    def _release(self, slot: RequestSlot) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            health = self.proxies.get(slot.proxy) if slot.proxy else None
+            if not health:
+                return
+
+            health.in_flight -= 1
+            outcome = 0.0 if slot.failed else 1.0
+            health.score = (1 - self.smoothing) * health.score + self.smoothing * outcome
+
+            if not slot.failed:
+                health.successes += 1
+                health.consecutive_failures = 0
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold or health.score < self.min_score:
+                health.disabled_until = time.monotonic() + self.cooldown
+                health.consecutive_failures = 0
+                health.score = max(health.score, self.min_score)
+                logging.warning(f"Proxy {slot.proxy} taken out of rotation for {self.cooldown:.0f} seconds.")
+
+    @contextmanager
+    def slot(self, url: str, proxy: Optional[str] = None) -> Iterator[RequestSlot]:
+        """
+        Block until a request to ``url`` is allowed, then yield its slot. A proxy is picked
+        when none is given. Exceptions raised inside the block before a response status was
+        recorded (connection errors, timeouts) count as a proxy failure.
+        """
+        while True:
+            request_slot, wait = self._try_acquire(url, proxy)
+            if request_slot:
+                break
+            time.sleep(wait)
+
+        try:
+            yield request_slot
+        except Exception:
+            if not request_slot.responded:
+                request_slot.mark_failed()
+            raise
+        finally:
+            self._release(request_slot)
+
+    @asynccontextmanager
+    async def slot_async(self, url: str, proxy: Optional[str] = None) -> AsyncIterator[RequestSlot]:
+        """Asynchronous counterpart of ``slot`` that waits without blocking the event loop."""
+        while True:
+            request_slot, wait = self._try_acquire(url, proxy)
+            if request_slot:
+                break
+            await asyncio.sleep(wait)
+
+        try:
+            yield request_slot
+        except Exception:
+            if not request_slot.responded:
+                request_slot.mark_failed()
+            raise
+        finally:
+            self._release(request_slot)
+
+    def proxy_report(self) -> List[Dict[str, float]]:
+        """Summarize each proxy's health, for logging at the end of a run."""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "proxy": health.proxy,
+                    "score": round(health.score, 3),
+                    "successes": health.successes,
+                    "failures": health.failures,
+                    "available": health.is_available(now),
+                }
+                for health in self.proxies.values()
+            ]
+
+
+_SCHEDULER: Optional[RequestScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def configure_scheduler(**kwargs) -> RequestScheduler:
+    """Replace the shared request scheduler with one built from the given ``RequestScheduler`` options."""
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = RequestScheduler(**kwargs)
+        return _SCHEDULER
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the shared request scheduler, creating one without proxies on first use."""
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = RequestScheduler()
+        return _SCHEDULER
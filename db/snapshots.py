@@ -0,0 +1,150 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from util import current_season
+
+# Version of the rows each kind of snapshot holds. Bump a kind's version whenever its parser
+# changes the rows it produces; snapshots of another version are ignored and fetched again.
+SNAPSHOT_VERSIONS: Dict[str, int] = {
+    "contracts": 1,
+    "draft_picks": 1,
+}
+# Seconds a snapshot of the current season is used before its page is fetched again.
+# Snapshots of past seasons never go stale, since their pages no longer change.
+DEFAULT_MAX_AGE = 24 * 3600
+# Bytes of the snapshot file SQLite may memory-map instead of reading through its page cache.
+DEFAULT_MMAP_BYTES = 256 * 1024 ** 2
+
+
+class SnapshotStore:
+    """
+    On-disk store of parsed Spotrac tables, such as team-year contract tables and yearly
+    draft boards, keyed by kind and key. Rows are stored as zlib-compressed JSON in a
+    memory-mapped SQLite file and loaded one snapshot at a time, when asked for.
+
+    A snapshot is usable if it has its kind's current version and is either of a past
+    season or younger than ``max_age``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float = DEFAULT_MAX_AGE,
+        mmap_bytes: int = DEFAULT_MMAP_BYTES,
+        season: Optional[int] = None,
+    ):
+        """
+        Args:
+            path (str): Path of the SQLite snapshot file.
+            max_age (float): Seconds a snapshot of the current season stays usable.
+            mmap_bytes (int): Bytes of the file to memory-map.
+            season (Optional[int]): The current season, by default from today's date.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.season = season if season is not None else current_season()
+        self.loaded = 0
+        self.saved = 0
+        self._lock = threading.Lock()
+
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                season INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                rows BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+
+    def is_usable(self, kind: str, version: int, season: int, fetched_at: float) -> bool:
+        if version != SNAPSHOT_VERSIONS[kind]:
+            return False
+        return season < self.season or time.time() - fetched_at < self.max_age
+
+    def is_fresh(self, kind: str, key: str) -> bool:
+        """Return whether a usable snapshot is stored, without loading its rows."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT version, season, fetched_at FROM snapshots WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return row is not None and self.is_usable(kind, *row)
+
+    def load(self, kind: str, key: str, allow_stale: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the rows of a usable snapshot, or None if there is none. With ``allow_stale``,
+        a snapshot past its maximum age is returned too, as long as it has the current version.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT version, season, fetched_at, rows FROM snapshots WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                return None
+            version, season, fetched_at, rows = row
+            if allow_stale:
+                usable = version == SNAPSHOT_VERSIONS[kind]
+            else:
+                usable = self.is_usable(kind, version, season, fetched_at)
+            if not usable:
+                return None
+            self.loaded += 1
+
+        return json.loads(zlib.decompress(rows))
+
+    def save(self, kind: str, key: str, season: int, rows: List[Dict[str, Any]]) -> None:
+        """Store the rows of a table under the current version of its kind, replacing any older snapshot."""
+        compressed = zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, SNAPSHOT_VERSIONS[kind], season, len(rows), compressed, time.time()),
+            )
+            self.saved += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"loaded": self.loaded, "saved": self.saved}
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+
+_SNAPSHOT_STORE: Optional[SnapshotStore] = None
+
+
+def configure_snapshot_store(path: str, **kwargs) -> SnapshotStore:
+    """Enable the Spotrac snapshot store used by the contract and draft fetchers, replacing any previous one."""
+    global _SNAPSHOT_STORE
+
+    if _SNAPSHOT_STORE:
+        _SNAPSHOT_STORE.close()
+    _SNAPSHOT_STORE = SnapshotStore(path, **kwargs)
+    return _SNAPSHOT_STORE
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """Return the snapshot store, or None when snapshots are disabled."""
+    return _SNAPSHOT_STORE
+
+
+def close_snapshot_store() -> None:
+    global _SNAPSHOT_STORE
+
+    if _SNAPSHOT_STORE:
+        logging.info(f"Spotrac snapshot stats: {_SNAPSHOT_STORE.stats()}")
+        _SNAPSHOT_STORE.close()
+        _SNAPSHOT_STORE = None
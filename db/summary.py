@@ -0,0 +1,251 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import and_, case, delete, func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from db.models import (
+    AthleteSeasonStat, Competition, Competitor, Drive, Event, Play, PlayParticipant, Stat, StatType,
+    TeamGameSummary, TeamSeasonSummary,
+)
+
+# Competitions refreshed per statement, keeping the number of bound parameters small.
+REFRESH_CHUNK_SIZE = 500
+
+
+def _chunks(values: List, size: int = REFRESH_CHUNK_SIZE) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def summarized_competition_ids(session: Session, rows: Dict) -> Set[int]:
+    """Return the IDs of the competitions whose games, drives or plays are among bulk-written rows."""
+    competition_ids: Set[int] = set()
+    written_drive_ids: Set[int] = set()
+    play_drive_ids: Set[int] = set()
+    for (table, _), keyed_rows in rows.items():
+        if table.name == "competitions":
+            competition_ids.update(key[0] for key in keyed_rows)
+        elif table.name == "competitors":
+            competition_ids.update(row["competition_id"] for row in keyed_rows.values())
+        elif table.name == "drives":
+            competition_ids.update(row["competition_id"] for row in keyed_rows.values())
+            written_drive_ids.update(key[0] for key in keyed_rows)
+        elif table.name == "plays":
+            play_drive_ids.update(row["drive_id"] for row in keyed_rows.values() if row["drive_id"] is not None)
+
+    # Plays added to drives that were not rewritten.
+    other_drive_ids = play_drive_ids - written_drive_ids
+    if other_drive_ids:
+        competition_ids.update(session.execute(
+            select(Drive.competition_id).distinct().where(Drive.id.in_(other_drive_ids))
+        ).scalars())
+    return competition_ids
+
+
+def _refresh_team_games(session: Session, competition_ids: Optional[List[int]]) -> None:
+    # A play's scoring side is the one whose score it raised, so returns and safeties scored
+    # by the defense are not credited to the drive's team.
+    previous = dict(partition_by=Drive.competition_id, order_by=Play.sequence_number)
+    play_scores = select(
+        Play.drive_id,
+        Play.score_value,
+        (Play.home_score - func.lag(Play.home_score, 1, 0).over(**previous)).label("home_points"),
+        (Play.away_score - func.lag(Play.away_score, 1, 0).over(**previous)).label("away_points"),
+    ).join(Drive, Play.drive_id == Drive.id)
+    if competition_ids is not None:
+        play_scores = play_scores.where(Drive.competition_id.in_(competition_ids))
+    play_scores = play_scores.subquery()
+
+    play_points = (
+        select(play_scores.c.drive_id, func.sum(play_scores.c.score_value).label("points"))
+        .join(Drive, play_scores.c.drive_id == Drive.id)
+        .join(Competitor, and_(
+            Competitor.competition_id == Drive.competition_id,
+            Competitor.team_id == Drive.team_id,
+        ))
+        .where(case(
+            (Competitor.is_home.is_(True), play_scores.c.home_points),
+            else_=play_scores.c.away_points,
+        ) > 0)
+        .group_by(play_scores.c.drive_id)
+        .subquery()
+    )
+
+    drive_totals = (
+        select(
+            Drive.competition_id,
+            Drive.team_id,
+            func.count(Drive.id).label("drives"),
+            func.sum(case((Drive.is_score.is_(True), 1), else_=0)).label("scoring_drives"),
+            func.sum(Drive.yards).label("drive_yards"),
+            func.sum(Drive.num_offensive_plays).label("offensive_plays"),
+            func.sum(func.coalesce(play_points.c.points, 0)).label("drive_points"),
+        )
+        .outerjoin(play_points, play_points.c.drive_id == Drive.id)
+        .group_by(Drive.competition_id, Drive.team_id)
+    )
+    if competition_ids is not None:
+        drive_totals = drive_totals.where(Drive.competition_id.in_(competition_ids))
+    drive_totals = drive_totals.subquery()
+
+    team_games = (
+        select(
+            Competitor.competition_id,
+            Competitor.team_id,
+            Event.season,
+            Event.season_type,
+            Event.week,
+            literal(1),
+            func.coalesce(Competitor.score, 0),
+            *(func.coalesce(drive_totals.c[name], 0) for name in (
+                "drives", "scoring_drives", "drive_yards", "offensive_plays", "drive_points"
+            )),
+        )
+        .join(Event, Competitor.event_id == Event.id)
+        .outerjoin(drive_totals, and_(
+            drive_totals.c.competition_id == Competitor.competition_id,
+            drive_totals.c.team_id == Competitor.team_id,
+        ))
+    )
+
+    # Drives stored before they had a team cannot be credited to either side, so their games
+    # are left unsummarized until ``backfill_drive_teams`` fills the team in.
+    teamless = select(Drive.competition_id).distinct().where(Drive.team_id.is_(None))
+    delete_games = delete(TeamGameSummary)
+    if competition_ids is not None:
+        teamless = teamless.where(Drive.competition_id.in_(competition_ids))
+        team_games = team_games.where(Competitor.competition_id.in_(competition_ids))
+        delete_games = delete_games.where(TeamGameSummary.competition_id.in_(competition_ids))
+
+    teamless_ids = session.execute(teamless).scalars().all()
+    if teamless_ids:
+        logging.warning(f"Not summarizing {len(teamless_ids)} games with drives that have no team.")
+        team_games = team_games.where(Competitor.competition_id.not_in(teamless_ids))
+
+    session.execute(delete_games)
+    session.execute(insert(TeamGameSummary).from_select(
+        [
+            "competition_id", "team_id", "season", "season_type", "week", "games", "points_scored",
+            "drives", "scoring_drives", "drive_yards", "offensive_plays", "drive_points",
+        ],
+        team_games,
+    ))
+
+
+def _refresh_team_seasons(session: Session, competition_ids: Optional[List[int]]) -> None:
+    key = (TeamGameSummary.team_id, TeamGameSummary.season, TeamGameSummary.season_type)
+    totals = ("games", "points_scored", "drives", "scoring_drives", "drive_yards", "offensive_plays", "drive_points")
+    team_seasons = select(
+        *key, *(func.sum(getattr(TeamGameSummary, name)) for name in totals)
+    ).group_by(*key)
+    delete_seasons = delete(TeamSeasonSummary)
+
+    if competition_ids is not None:
+        keys = session.execute(
+            select(*key).distinct().where(TeamGameSummary.competition_id.in_(competition_ids))
+        ).all()
+        if not keys:
+            return
+        team_seasons = team_seasons.where(tuple_(*key).in_(keys))
+        delete_seasons = delete_seasons.where(
+            tuple_(TeamSeasonSummary.team_id, TeamSeasonSummary.season, TeamSeasonSummary.season_type).in_(keys)
+        )
+
+    session.execute(delete_seasons)
+    session.execute(insert(TeamSeasonSummary).from_select(["team_id", "season", "season_type", *totals], team_seasons))
+
+
+def _refresh_athlete_seasons(session: Session, competition_ids: Optional[List[int]]) -> None:
+    key = (PlayParticipant.athlete_id, Event.season, Event.season_type)
+    athlete_stats = (
+        select(*key, StatType.name, func.sum(Stat.value), func.count())
+        .join(StatType, Stat.stat_type_id == StatType.id)
+        .join(PlayParticipant, Stat.playparticipant_id == PlayParticipant.id)
+        .join(Play, PlayParticipant.play_id == Play.id)
+        .join(Drive, Play.drive_id == Drive.id)
+        .join(Competition, Drive.competition_id == Competition.id)
+        .join(Event, Competition.event_id == Event.id)
+        .group_by(*key, StatType.name)
+    )
+    delete_stats = delete(AthleteSeasonStat)
+
+    if competition_ids is not None:
+        # Every season total of the athletes who played in the competitions is recomputed.
+        keys = session.execute(
+            select(*key).distinct()
+            .join(Play, PlayParticipant.play_id == Play.id)
+            .join(Drive, Play.drive_id == Drive.id)
+            .join(Competition, Drive.competition_id == Competition.id)
+            .join(Event, Competition.event_id == Event.id)
+            .where(Competition.id.in_(competition_ids))
+        ).all()
+        if not keys:
+            return
+        athlete_stats = athlete_stats.where(tuple_(*key).in_(keys))
+        delete_stats = delete_stats.where(
+            tuple_(AthleteSeasonStat.athlete_id, AthleteSeasonStat.season, AthleteSeasonStat.season_type).in_(keys)
+        )
+
+    session.execute(delete_stats)
+    session.execute(insert(AthleteSeasonStat).from_select(
+        ["athlete_id", "season", "season_type", "stat_name", "total", "plays"], athlete_stats
+    ))
+
+
+def refresh_summaries(session: Session, competition_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute the team-game rows of competitions, then the team-season and athlete-season
+    rows they contribute to, and commit. Rows are rebuilt from the drives, plays and stats,
+    so refreshing is idempotent.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        competition_ids (Optional[Iterable[int]]): The competitions to refresh, or None to rebuild every summary.
+    """
+    if competition_ids is None:
+        chunks = [None]
+    else:
+        chunks = list(_chunks(sorted(set(competition_ids))))
+
+    try:
+        for chunk in chunks:
+            _refresh_team_games(session, chunk)
+            _refresh_team_seasons(session, chunk)
+            _refresh_athlete_seasons(session, chunk)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def refresh_written_summaries(session: Session, rows: Dict) -> None:
+    """
+    Refresh the summaries of the competitions among committed bulk-written rows. Summaries
+    are derived data, so a failure is logged rather than raised.
+    """
+    competition_ids = summarized_competition_ids(session, rows)
+    if not competition_ids:
+        return
+
+    try:
+        refresh_summaries(session, competition_ids)
+    except Exception as e:
+        logging.error(f"Failed to refresh the summaries of {len(competition_ids)} competitions. Details: {e}")
+
+
+def backfill_summaries(session: Session) -> bool:
+    """
+    Build every summary of a database whose summary tables are empty, such as one created
+    before they existed.
+
+    Returns:
+        bool: True if summaries were built.
+    """
+    if session.execute(select(TeamGameSummary.competition_id).limit(1)).first():
+        return False
+    if not session.execute(select(Competitor.id).limit(1)).first():
+        return False
+
+    logging.info("Building the summary tables of existing games.")
+    refresh_summaries(session)
+    return True
@@ -1,11 +1,23 @@
 import asyncio
 import aiohttp
+import contextvars
 import requests
 import re
 import time
 import json
 import logging
-from typing import List, Dict, Any, Tuple, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Dict, Any, Tuple, Union, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+from db.scheduler import get_scheduler
+from db.retry import DEAD_LETTERS, get_retry_policy, parse_retry_after
+from db.http_cache import get_response_cache
+
+# Threads fetching ``$ref`` objects concurrently in ``resolve_refs``.
+REF_FETCH_WORKERS = 16
 
 
 def clean_url(url: str):
@@ -19,35 +31,217 @@ def append_query_params(base_url: str, **params) -> str:
     return f"{base_url}{delimiter}{query_string}"
 
 
+class HttpClient:
+    """
+    Thread-safe HTTP client that keeps one pooled, keep-alive ``requests.Session``
+    per (host, proxy) pair so repeated ESPN/Spotrac/EA calls reuse open connections.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 20,
+        keep_alive: bool = True,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            pool_connections (int): Number of connection pools cached per session.
+            pool_maxsize (int): Maximum number of connections kept open per pool.
+            keep_alive (bool): Reuse connections between requests; when False every
+                request is sent with ``Connection: close``.
+            timeout (float): Default request timeout in seconds.
+            headers (Optional[Dict[str, str]]): Extra headers sent with every request.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._sessions: Dict[Tuple[str, Optional[str]], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self, proxy: Optional[str]) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        session.headers["Connection"] = "keep-alive" if self.keep_alive else "close"
+        if proxy:
+            session.proxies.update({"http": proxy, "https": proxy})
+        return session
+
+    def get_session(self, url: str, proxy: str = None) -> requests.Session:
+        """Return the pooled session for the URL's host and the given proxy, creating it on first use."""
+        parts = urlsplit(url)
+        key = (f"{parts.scheme}://{parts.netloc}", proxy)
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_session(proxy)
+                self._sessions[key] = session
+            return session
+
+    def get(self, url: str, proxy: str = None, **kwargs) -> requests.Response:
+        """Send a GET request through the pooled session for the URL's host and proxy."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.get_session(url, proxy).get(url, **kwargs)
+
+    def close(self) -> None:
+        """Close every pooled session and drop their open connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+
+        for session in sessions:
+            session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_HTTP_CLIENT: Optional[HttpClient] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def configure_http_client(**kwargs) -> HttpClient:
+    """
+    Replace the shared HTTP client with one built from the given ``HttpClient`` options.
+    The previous client, if any, is closed.
+    """
+    global _HTTP_CLIENT
+
+    with _HTTP_CLIENT_LOCK:
+        previous, _HTTP_CLIENT = _HTTP_CLIENT, HttpClient(**kwargs)
+
+    if previous:
+        previous.close()
+    return _HTTP_CLIENT
+
+
+def get_http_client() -> HttpClient:
+    """Return the shared HTTP client used by all fetchers, creating it with defaults on first use."""
+    global _HTTP_CLIENT
+
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = HttpClient()
+        return _HTTP_CLIENT
+
+
+def close_http_client() -> None:
+    """Close the shared HTTP client. A fresh one is created on the next fetch."""
+    global _HTTP_CLIENT
+
+    with _HTTP_CLIENT_LOCK:
+        client, _HTTP_CLIENT = _HTTP_CLIENT, None
+
+    if client:
+        client.close()
+
+
+def decode_body(body: bytes, text: bool) -> Union[str, Dict[str, Any]]:
+    return body.decode("utf-8", errors="replace") if text else json.loads(body)
+
+
+def handle_failed_attempt(
+    url: str, attempt: int, started_at: float, status: Optional[int], error: Exception,
+    retryable: bool, retry_after: Optional[float] = None
+) -> Optional[float]:
+    """
+    Log a failed attempt and decide whether to retry it. Requests that are given up on
+    are added to the dead-letter queue.
+
+    Returns:
+        Optional[float]: Seconds to wait before the next attempt, or None to give up.
+    """
+    delay = get_retry_policy().next_delay(attempt, started_at, retryable, retry_after)
+    failure = f"HTTP error {status}" if status else "An unexpected error occurred"
+
+    if delay is None:
+        logging.error(f"{failure} for URL: {url} after {attempt} attempt(s). Details: {error}")
+        DEAD_LETTERS.add(url, status, str(error), attempt)
+    else:
+        logging.warning(f"{failure} for URL: {url}. Retrying in {delay:.2f} seconds. Details: {error}")
+    return delay
+
+
 def fetch_page(url: str, text=False, return_url=False, proxy: str = None) -> Union[Dict[str, Any], Tuple[Dict[str, Any], str]]:
     """
-    Fetch a single page with an optional proxy.
+    Fetch a single page through the shared pooled HTTP client. The request scheduler
+    applies the host's rate limit and picks a proxy when none is given. Throttled,
+    server-error and timed-out requests are retried per the retry policy. Responses are
+    served from the response cache while fresh and revalidated once stale.
     """
-    start_time = time.time()
-    proxies = {"http": proxy, "https": proxy} if proxy else None
+    started_at = time.monotonic()
     url = clean_url(url)
 
-    try:
-        response = requests.get(url, proxies=proxies)
-        response.raise_for_status()
-        elapsed_time = time.time() - start_time
-        logging.info(f"Successfully fetched URL: {url} in {elapsed_time:.2f} seconds.")
-        
-        data = response.text if text else response.json()
-        
-        if return_url:
-            return data, response.url
-        else:
-            return data
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
-            logging.warning(f"Resource not found (404) for URL: {url}. Skipping.")
-        else:
-            logging.error(f"HTTP error {e.response.status_code} for URL: {url}. Details: {e}")
-        return {} if not return_url else ({}, url)
-    except Exception as e:
-        logging.error(f"An unexpected error occurred while fetching URL: {url}. Details: {e}")
-        return {} if not return_url else ({}, url)
+    cache = get_response_cache()
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(url, cached):
+        cache.record_hit()
+        data = decode_body(cached.body, text)
+        return (data, cached.url) if return_url else data
+
+    policy = get_retry_policy()
+    client = get_http_client()
+    headers = cached.validators() if cached else {}
+    attempt = 0
+
+    while True:
+        attempt += 1
+        timeout = min(client.timeout, max(1.0, started_at + policy.deadline - time.monotonic()))
+
+        try:
+            with get_scheduler().slot(url, proxy) as slot:
+                response = client.get(url, proxy=slot.proxy, timeout=timeout, headers=headers)
+                slot.record_status(response.status_code)
+            response.raise_for_status()
+            elapsed_time = time.monotonic() - started_at
+            logging.info(f"Successfully fetched URL: {url} in {elapsed_time:.2f} seconds.")
+
+            if response.status_code == 304 and cached:
+                cache.refresh(url)
+                cache.record_hit(revalidated=True)
+                data, final_url = decode_body(cached.body, text), cached.url
+            else:
+                data, final_url = decode_body(response.content, text), response.url
+                if cache:
+                    cache.store(
+                        url, final_url, response.content,
+                        response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                    )
+
+            if return_url:
+                return data, final_url
+            else:
+                return data
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            if status == 404:
+                logging.warning(f"Resource not found (404) for URL: {url}. Skipping.")
+                return {} if not return_url else ({}, url)
+            delay = handle_failed_attempt(
+                url, attempt, started_at, status, e, policy.is_retryable_status(status),
+                parse_retry_after(e.response.headers.get("Retry-After")),
+            )
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            delay = handle_failed_attempt(url, attempt, started_at, None, e, policy.retry_timeouts)
+        except Exception as e:
+            delay = handle_failed_attempt(url, attempt, started_at, None, e, False)
+
+        if delay is None:
+            return {} if not return_url else ({}, url)
+        time.sleep(delay)
 
 
 def fetch_all_refs(base_url: str, limit: int = None, proxy: str = None) -> List[str]:
@@ -69,14 +263,14 @@ def fetch_all_refs(base_url: str, limit: int = None, proxy: str = None) -> List[
     return list(set(refs))
 
 
-def fetch_all_items(base_url: str, limit: int = None) -> List[Dict]:
-    """Fetch all items across all pages sequentially."""
+def fetch_all_items(base_url: str, limit: int = None, proxy: str = None) -> List[Dict]:
+    """Fetch all items across all pages sequentially using an optional proxy."""
     all_items = []
     seen_items = set()
 
     page_limit = {'limit': limit} if limit else {}
     first_page_url = append_query_params(base_url, page=1, **page_limit)
-    first_page_data = fetch_page(first_page_url)
+    first_page_data = fetch_page(first_page_url, proxy=proxy)
 
     for item in first_page_data.get("items", []):
         item_json = json.dumps(item, sort_keys=True)
@@ -88,7 +282,7 @@ def fetch_all_items(base_url: str, limit: int = None) -> List[Dict]:
 
     for page in range(2, page_count + 1):
         page_url = append_query_params(base_url, page=page, **page_limit)
-        page_data = fetch_page(page_url)
+        page_data = fetch_page(page_url, proxy=proxy)
         for item in page_data.get("items", []):
             item_json = json.dumps(item, sort_keys=True)
             if item_json not in seen_items:
@@ -98,89 +292,200 @@ def fetch_all_items(base_url: str, limit: int = None) -> List[Dict]:
     return all_items
 
 
+def resolve_ref(ref: Dict[str, Any], proxy: str = None) -> Dict[str, Any]:
+    """
+    Return the payload behind an ESPN ``{"$ref": url}`` object. If the object has already
+    been expanded in place (it carries more than the ``$ref`` key), it is returned as is
+    and no request is made.
+    """
+    if not ref:
+        return {}
+    if set(ref) - {"$ref"}:
+        return ref
+    return fetch_page(ref["$ref"], proxy=proxy)
+
+
+def resolve_refs(refs: List[Dict[str, Any]], max_workers: int = REF_FETCH_WORKERS, proxy: str = None) -> List[Dict[str, Any]]:
+    """
+    Resolve many ESPN ``$ref`` objects at once, like ``resolve_ref``. The ones not expanded
+    yet are fetched concurrently, each distinct URL once, within the scheduler's limits.
+    """
+    urls = list(dict.fromkeys(ref["$ref"] for ref in refs if ref and not set(ref) - {"$ref"}))
+    fetched: Dict[str, Dict[str, Any]] = {}
+
+    if urls:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            # Each request runs in a copy of the caller's context, so it is dead-lettered under the caller's unit of work.
+            futures = {
+                url: executor.submit(contextvars.copy_context().run, fetch_page, url, proxy=proxy) for url in urls
+            }
+            fetched = {url: future.result() for url, future in futures.items()}
+
+    return [ref if not ref or set(ref) - {"$ref"} else fetched[ref["$ref"]] for ref in refs]
+
+
+def resolve_items(ref: Dict[str, Any], limit: int = None, proxy: str = None) -> List[Dict]:
+    """
+    Return every item of a paginated ESPN ``$ref`` collection, using the ``items`` list
+    when the collection has already been expanded in place.
+    """
+    if not ref:
+        return []
+    if "items" in ref:
+        return ref["items"]
+    return fetch_all_items(ref["$ref"], limit=limit, proxy=proxy)
+
+
 async def fetch_page_async(session: aiohttp.ClientSession, url: str, text=False, proxy: str = None) -> Dict[str, Any]:
     """
-    Asynchronously fetch a single page with an optional proxy.
+    Asynchronously fetch a single page. The request scheduler bounds the requests in flight,
+    applies the host's rate limit and picks a proxy when none is given. Throttled,
+    server-error and timed-out requests are retried per the retry policy. Responses are
+    served from the response cache while fresh and revalidated once stale.
     """
-    start_time = asyncio.get_event_loop().time()
+    started_at = time.monotonic()
     url = clean_url(url)
 
-    try:
-        async with session.get(url, proxy=proxy) as response:
-            response.raise_for_status()
-            elapsed_time = asyncio.get_event_loop().time() - start_time
-            logging.info(f"Successfully fetched URL: {url} in {elapsed_time:.2f} seconds.")
-            if text:
-                return await response.text()
-            else:
-                return await response.json()
-    except aiohttp.ClientResponseError as e:
-        if e.status == 404:
-            logging.warning(f"Resource not found (404) for URL: {url}. Skipping.")
-        else:
-            logging.error(f"HTTP error {e.status} for URL: {url}. Details: {e}")
-        return {}
-    except Exception as e:
-        logging.error(f"An unexpected error occurred while fetching URL: {url}. Details: {e}")
-        return {}
+    cache = get_response_cache()
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(url, cached):
+        cache.record_hit()
+        return decode_body(cached.body, text)
+
+    policy = get_retry_policy()
+    headers = cached.validators() if cached else {}
+    attempt = 0
+
+    while True:
+        attempt += 1
+        timeout = aiohttp.ClientTimeout(total=max(1.0, started_at + policy.deadline - time.monotonic()))
+
+        try:
+            async with get_scheduler().slot_async(url, proxy) as slot:
+                async with session.get(url, proxy=slot.proxy, timeout=timeout, headers=headers) as response:
+                    slot.record_status(response.status)
+                    response.raise_for_status()
+                    elapsed_time = time.monotonic() - started_at
+                    logging.info(f"Successfully fetched URL: {url} in {elapsed_time:.2f} seconds.")
+
+                    if response.status == 304 and cached:
+                        cache.refresh(url)
+                        cache.record_hit(revalidated=True)
+                        return decode_body(cached.body, text)
+
+                    body = await response.read()
+                    data = decode_body(body, text)
+                    if cache:
+                        cache.store(
+                            url, str(response.url), body,
+                            response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                        )
+                    return data
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                logging.warning(f"Resource not found (404) for URL: {url}. Skipping.")
+                return {}
+            retry_after = parse_retry_after(e.headers.get("Retry-After")) if e.headers else None
+            delay = handle_failed_attempt(
+                url, attempt, started_at, e.status, e, policy.is_retryable_status(e.status), retry_after
+            )
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+            delay = handle_failed_attempt(url, attempt, started_at, None, e, policy.retry_timeouts)
+        except Exception as e:
+            delay = handle_failed_attempt(url, attempt, started_at, None, e, False)
+
+        if delay is None:
+            return {}
+        await asyncio.sleep(delay)
 
 
-async def fetch_all_refs_async(base_url: str, limit: int = None, proxy: str = None) -> List[str]:
-    """Asynchronously fetch all references using an optional proxy."""
+async def fetch_all_pages_async(
+    session: aiohttp.ClientSession, base_url: str, limit: int = None, proxy: str = None
+) -> List[Dict[str, Any]]:
+    """Asynchronously fetch every page of a paginated collection, the first page first to learn the page count."""
     page_limit = {'limit': limit} if limit else {}
 
-    async with aiohttp.ClientSession() as session:
-        first_page_url = append_query_params(base_url, page=1, **page_limit)
-        first_page_data = await fetch_page_async(session, first_page_url, proxy=proxy)
-        refs = [
-            re.sub(r'\?.*', '', item["$ref"]) for item in first_page_data.get("items", [])
-        ]
-        page_count = first_page_data.get("pageCount", 1)
-
-        tasks = [
-            fetch_page_async(session, append_query_params(base_url, page=page, **page_limit), proxy=proxy)
-            for page in range(2, page_count + 1)
-        ]
-        results = await asyncio.gather(*tasks)
-
-        for page_data in results:
-            refs.extend(
-                re.sub(r'\?.*', '', item["$ref"]) for item in page_data.get("items", [])
-            )
+    first_page_url = append_query_params(base_url, page=1, **page_limit)
+    first_page_data = await fetch_page_async(session, first_page_url, proxy=proxy)
+    page_count = first_page_data.get("pageCount", 1)
+
+    tasks = [
+        fetch_page_async(session, append_query_params(base_url, page=page, **page_limit), proxy=proxy)
+        for page in range(2, page_count + 1)
+    ]
+    results = await asyncio.gather(*tasks)
 
-        return list(set(refs))
+    return [first_page_data, *results]
 
 
-async def fetch_all_items_async(base_url: str, limit=None) -> List[Dict]:
-    """Asynchronously fetch all items across all pages."""
+async def iter_ref_pages_async(
+    session: aiohttp.ClientSession, base_url: str, limit: int = None, proxy: str = None
+) -> AsyncIterator[List[str]]:
+    """
+    Asynchronously yield the references of a paginated collection one page at a time, so
+    the whole collection is never held in memory. The next page is fetched while the
+    caller works through the current one. A page that cannot be fetched yields no references.
+    """
     page_limit = {'limit': limit} if limit else {}
+    page, page_count = 1, 1
+    next_page = asyncio.ensure_future(
+        fetch_page_async(session, append_query_params(base_url, page=page, **page_limit), proxy=proxy)
+    )
+
+    try:
+        while next_page:
+            page_data = await next_page
+            if page == 1:
+                page_count = page_data.get("pageCount", 1)
+
+            page += 1
+            next_page = asyncio.ensure_future(
+                fetch_page_async(session, append_query_params(base_url, page=page, **page_limit), proxy=proxy)
+            ) if page <= page_count else None
+
+            yield [re.sub(r'\?.*', '', item["$ref"]) for item in page_data.get("items", [])]
+    finally:
+        if next_page:
+            next_page.cancel()
+
+
+async def fetch_all_refs_async(
+    base_url: str, limit: int = None, proxy: str = None, session: aiohttp.ClientSession = None
+) -> List[str]:
+    """Asynchronously fetch all references using an optional proxy and an optional shared session."""
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await fetch_all_refs_async(base_url, limit=limit, proxy=proxy, session=session)
+
+    pages = await fetch_all_pages_async(session, base_url, limit=limit, proxy=proxy)
+
+    refs = []
+    for page_data in pages:
+        refs.extend(
+            re.sub(r'\?.*', '', item["$ref"]) for item in page_data.get("items", [])
+        )
+
+    return list(set(refs))
 
-    async with aiohttp.ClientSession() as session:
-        all_items = []
-        seen_items = set()
 
-        first_page_url = append_query_params(base_url, page=1, **page_limit)
-        first_page_data = await fetch_page_async(session, first_page_url)
-        
-        for item in first_page_data.get("items", []):
+async def fetch_all_items_async(
+    base_url: str, limit=None, proxy: str = None, session: aiohttp.ClientSession = None
+) -> List[Dict]:
+    """Asynchronously fetch all items across all pages using an optional proxy and an optional shared session."""
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await fetch_all_items_async(base_url, limit=limit, proxy=proxy, session=session)
+
+    pages = await fetch_all_pages_async(session, base_url, limit=limit, proxy=proxy)
+
+    all_items = []
+    seen_items = set()
+
+    for page_data in pages:
+        for item in page_data.get("items", []):
             item_json = json.dumps(item, sort_keys=True)
             if item_json not in seen_items:
                 all_items.append(item)
                 seen_items.add(item_json)
 
-        page_count = first_page_data.get("pageCount", 1)
-
-        tasks = [
-            fetch_page_async(session, append_query_params(base_url, page=page, **page_limit))
-            for page in range(2, page_count + 1)
-        ]
-        results = await asyncio.gather(*tasks)
-
-        for page_data in results:
-            for item in page_data.get("items", []):
-                item_json = json.dumps(item, sort_keys=True)
-                if item_json not in seen_items:
-                    all_items.append(item)
-                    seen_items.add(item_json)
-
-        return all_items
+    return all_items
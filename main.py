@@ -1,9 +1,9 @@
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 
+from db.engine import create_engine
 from db.models import Team
 
-engine = create_engine('sqlite:///sports.db')
+engine = create_engine('sqlite:///sports.db', profile="analytics")
 Session = sessionmaker(bind=engine)
 session = Session()
 
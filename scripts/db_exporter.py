@@ -0,0 +1,21 @@
+import logging
+import sys
+from sqlalchemy.orm import sessionmaker
+
+from db.engine import create_engine
+from db.export import ParquetExporter
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    database_url = "sqlite:///sports.db"
+    export_dir = "./export"
+
+    engine = create_engine(database_url, profile="analytics")
+    exporter = ParquetExporter(sessionmaker(bind=engine), export_dir)
+    exporter.run(full="--full" in sys.argv)
@@ -1,17 +1,35 @@
+import asyncio
 import logging
-import random
-from typing import List
-from sqlalchemy import create_engine
+import os
+import sys
+from functools import partial
+from typing import Callable, List, Optional, Tuple
 from sqlalchemy.orm import sessionmaker
 from tqdm import tqdm
 
-from db.util import fetch_all_refs
+from db.util import fetch_all_refs, configure_http_client, close_http_client
+from db.scheduler import configure_scheduler, MAX_IN_FLIGHT
+from db.retry import DEAD_LETTERS
+from db.http_cache import configure_response_cache, close_response_cache
+from db.snapshots import configure_snapshot_store, close_snapshot_store
+from db.entity_cache import get_entity_cache
 from db.load.team import create_teams
-from db.load.athlete import create_athletes
 from db.load.event import create_events
-from db.load.draft import fetch_draft_picks
-from db.load.contract import fetch_team_year_contracts, TEAMS_LOOKUP
+from db.load.drive import backfill_drive_teams
+from db.load.athlete_enrichment import AthleteEnricher
+from db.load.athlete_backfill import AthleteBackfill
+from db.load.athlete_rating import MADDEN_RELEASE, load_madden_catalog, refresh_ratings
+from db.extract.athlete import extract_pending_enrichment_count
+from db.pipeline import EventPipeline
+from db.backfill import ShardedBackfill, Shard
+from db.load.draft import fetch_draft_boards
+from db.load.contract import fetch_team_contracts, TEAMS_LOOKUP
+from db.engine import create_engine
 from db.models import Base
+from db.migrations import migrate
+from db.journal import RunJournal
+from db.summary import backfill_summaries
+from util import get_id_from_url
 
 class DatabaseInitializer:
     def __init__(
@@ -21,16 +39,38 @@ class DatabaseInitializer:
         event_season_types: List[int] = [1, 2, 3],
         weeks: List[int] = list(range(1, 19)),
         echo: bool = False,
+        pool_size: int = 20,
+        keep_alive: bool = True,
+        async_mode: bool = False,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        cache_path: str = "./http_cache.db",
+        snapshot_path: str = "./spotrac_snapshots.db",
+        madden_release: str = MADDEN_RELEASE,
+        shard_workers: int = 0,
+        staging_dir: str = "./backfill_shards",
+        resume: bool = True,
     ):
         self.years = years
         self.database_url = database_url
         self.event_season_types = event_season_types
         self.weeks = weeks
         self.echo = echo
+        self.async_mode = async_mode
+        self.shard_workers = shard_workers
+        self.staging_dir = staging_dir
+        self.cache_path = cache_path
+        self.madden_release = madden_release
+        self.resume = resume
+        self.journal: Optional[RunJournal] = None
         self.proxy_file = "./proxy_list.txt"
+        self.dead_letter_file = "./dead_letters.jsonl"
         self.proxies = self.load_proxies()
-        self.engine = create_engine(self.database_url, echo=self.echo)
+        self.engine = create_engine(self.database_url, profile="bulk", echo=self.echo)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.http_client = configure_http_client(pool_maxsize=pool_size, keep_alive=keep_alive)
+        self.scheduler = configure_scheduler(proxies=self.proxies, max_in_flight=max_in_flight)
+        self.response_cache = configure_response_cache(cache_path) if cache_path else None
+        self.snapshot_store = configure_snapshot_store(snapshot_path) if snapshot_path else None
         self.ESPN_BASE_URL = "https://sports.core.api.espn.com/v2/sports/football/leagues/nfl"
 
     def load_proxies(self) -> List[str]:
@@ -42,79 +82,227 @@ class DatabaseInitializer:
             logging.error(f"Proxy file {self.proxy_file} not found.")
             return []
 
-    def get_random_proxy(self) -> str:
-        """Get a random proxy from the loaded list."""
-        if not self.proxies:
-            return None
-        return random.choice(self.proxies)
-
     def initialize_database(self) -> None:
-        """Initialize the database by creating all tables."""
+        """
+        Initialize the database by creating all tables and adding columns and indexes missing
+        from older databases, fill in the teams of drives stored before drives had one, build
+        the summaries of games stored before the summary tables existed, then warm the entity
+        cache with the stored entities.
+        """
         with self.engine.begin() as conn:
             Base.metadata.create_all(conn)
+        migrate(self.engine)
+        with self.SessionLocal() as session:
+            backfill_drive_teams(session)
+            backfill_summaries(session)
+            get_entity_cache().warm(session)
+
+    def open_journal(self) -> RunJournal:
+        """Load the run journal of the database, or clear it when not resuming."""
+        self.journal = RunJournal(self.SessionLocal)
+        if not self.resume:
+            self.journal.clear()
+        return self.journal
+
+    def run_phase(self, session, phase: str, initialize: Callable) -> None:
+        """Run an initialization phase unless an earlier run completed it, then journal it."""
+        if self.journal.phase_done(phase):
+            logging.info(f"Skipping phase {phase}, completed by an earlier run.")
+            return
+
+        initialize(session)
+        session.commit()
+        self.journal.finish_phase(phase)
 
     def initialize_teams(self, session) -> None:
         """Fetch and initialize NFL teams."""
-        team_urls = fetch_all_refs(
-            f"{self.ESPN_BASE_URL}/teams", limit=500, proxy=self.get_random_proxy()
-        )
-        create_teams(session, team_urls, self.proxies)
+        team_urls = fetch_all_refs(f"{self.ESPN_BASE_URL}/teams", limit=500)
+        create_teams(session, team_urls)
 
     def initialize_team_contracts(self) -> None:
-        """Fetch and initialize NFL team contracts."""
-        team_names = list(TEAMS_LOOKUP.values())
-        for team_name in team_names:
-            for year in self.years:
-                fetch_team_year_contracts(team_name, year, self.proxies)
+        """Fetch and initialize NFL team contracts, every team-year page concurrently."""
+        team_years = [(team_name, year) for team_name in TEAMS_LOOKUP.values() for year in self.years]
+        fetch_team_contracts(team_years)
 
     def initialize_team_draftpicks(self) -> None:
-        """Fetch and initialize NFL team draft picks."""
-        for year in self.years:
-            fetch_draft_picks(year, self.proxies)
+        """Fetch and initialize NFL team draft picks, every year's board concurrently."""
+        fetch_draft_boards(self.years)
 
     def initialize_athletes(self, session) -> None:
-        """Fetch and initialize NFL athletes."""
-        athlete_urls = fetch_all_refs(
-            f"{self.ESPN_BASE_URL}/athletes", limit=500, proxy=self.get_random_proxy()
-        )
-        create_athletes(session, athlete_urls, self.proxies)
+        """
+        Fetch and initialize NFL athletes, streaming the reference pages and hydrating the
+        athletes not stored yet concurrently.
+        """
+        asyncio.run(AthleteBackfill(self.SessionLocal).run(f"{self.ESPN_BASE_URL}/athletes"))
     
+    def event_week_units(self) -> List[Tuple[int, int, int]]:
+        """List every (year, season type, week) to ingest, skipping weeks a season type does not have."""
+        units = []
+        for year in self.years:
+            for season_type in self.event_season_types:
+                max_weeks = {
+                    1: 4,   # Preseason
+                    2: 18,  # Regular season
+                    3: 5    # Postseason
+                }.get(season_type, 0)
+
+                valid_weeks = [week for week in self.weeks if week <= max_weeks]
+                units.extend((year, season_type, week) for week in valid_weeks)
+        return units
+
+    def pending_week_units(self) -> List[Tuple[int, int, int]]:
+        """List the (year, season type, week) units the run journal does not have completed."""
+        return [unit for unit in self.event_week_units() if not self.journal.week_done(*unit)]
+
+    def week_events_url(self, year: int, season_type: int, week: int) -> str:
+        """Build the events collection URL of a week."""
+        return f"{self.ESPN_BASE_URL}/seasons/{year}/types/{season_type}/weeks/{week}/events"
+
+    def finish_week(
+        self, year: int, season_type: int, week: int, event_ids: Optional[List[int]] = None
+    ) -> None:
+        """
+        Journal a written week, unless listing its events failed, in which case the listing
+        may be incomplete and the week is fetched again on the next run.
+        """
+        if DEAD_LETTERS.failed_for(self.week_events_url(year, season_type, week)):
+            return
+
+        with self.SessionLocal() as session:
+            self.journal.finish_week(session, year, season_type, week, event_ids)
+
     def initialize_events(self, session) -> None:
         """Fetch and initialize NFL events with progress bar."""
+        units = self.pending_week_units()
 
-        event_base_url = f"{self.ESPN_BASE_URL}/seasons/{{YEAR}}/types/{{TYPE}}/weeks/{{WEEK}}/events"
+        with tqdm(total=len(units), desc="Fetching NFL Events") as pbar:
+            for year, season_type, week in units:
+                url = self.week_events_url(year, season_type, week)
+                event_urls = fetch_all_refs(url, limit=18)
+                create_events(session, event_urls)
+                session.commit()
+                self.finish_week(year, season_type, week, [int(get_id_from_url(event_url)) for event_url in event_urls])
+                pbar.update(1)
 
-        total_iterations = sum(len(self.weeks) for _ in self.years for _ in self.event_season_types)
-        
-        with tqdm(total=total_iterations, desc="Fetching NFL Events") as pbar:
-            for year in self.years:
-                for season_type in self.event_season_types:
-                    max_weeks = {
-                        1: 4,   # Preseason
-                        2: 18,  # Regular season
-                        3: 5    # Postseason
-                    }.get(season_type, 0)
+    async def initialize_events_async(self) -> None:
+        """
+        Fetch and initialize NFL events with the staged event pipeline: each week's reference
+        graph is fetched concurrently while earlier events are parsed and written in batches.
+        """
+        units = self.pending_week_units()
 
-                    valid_weeks = [week for week in self.weeks if week <= max_weeks]
+        async with EventPipeline(self.SessionLocal) as pipeline:
+            with tqdm(total=len(units), desc="Fetching NFL Events") as pbar:
+                for year, season_type, week in units:
+                    await pipeline.ingest_week(
+                        self.week_events_url(year, season_type, week),
+                        on_written=partial(self.finish_week, year, season_type, week),
+                    )
+                    pbar.set_postfix(pipeline.queue_depths())
+                    pbar.update(1)
 
-                    for week in valid_weeks:
-                        url = event_base_url.format(YEAR=year, TYPE=season_type, WEEK=week)
-                        event_urls = fetch_all_refs(url, limit=18, proxy=self.get_random_proxy())
-                        create_events(session, event_urls, self.proxies)
-                        pbar.update(1)
+    def initialize_events_sharded(self) -> None:
+        """
+        Fetch and initialize NFL events with a process pool, one (year, season type, week)
+        shard per task, merging each staged shard into the database as it completes.
+        """
+        shards = [
+            Shard(year, season_type, week, self.week_events_url(year, season_type, week), self.staging_dir)
+            for year, season_type, week in self.pending_week_units()
+        ]
+        backfill = ShardedBackfill(
+            self.SessionLocal,
+            self.database_url,
+            self.staging_dir,
+            workers=self.shard_workers,
+            proxies=self.proxies,
+            cache_path=self.cache_path,
+            on_merged=lambda shard: self.finish_week(shard.year, shard.season_type, shard.week),
+        )
+        backfill.run(shards)
 
-    def run_initialization(self) -> None:
-        """Run the full database initialization process."""
-        self.initialize_database()
+    async def ingest_event_urls_async(self, event_urls: List[str]) -> None:
+        """Ingest specific events with the staged event pipeline."""
+        async with EventPipeline(self.SessionLocal) as pipeline:
+            await pipeline.ingest_events(event_urls)
+
+    def enrich_athletes(self) -> None:
+        """Fetch the team history and contracts of the athletes that play ingest queued."""
+        asyncio.run(AthleteEnricher(self.SessionLocal).run())
 
+    def initialize_ratings(self) -> None:
+        """
+        Store the Madden ratings catalog of the release unless it is stored already, then rate
+        the athletes from it in one pass: every athlete when the catalog was just stored, only
+        the unrated ones otherwise.
+        """
         with self.SessionLocal() as session:
-            self.initialize_team_draftpicks()
-            self.initialize_teams(session)
-            self.initialize_team_contracts()
-            self.initialize_athletes(session)
-            self.initialize_events(session)
+            loaded = load_madden_catalog(session, self.madden_release)
+            refresh_ratings(session, self.madden_release, only_missing=not loaded)
+
+    def replay_dead_letters(self, session) -> None:
+        """
+        Re-ingest the events that had requests fail for good, whether in this run or in an
+        earlier one saved to the dead-letter file. Events that fail again are dead-lettered again.
+        """
+        event_urls = DEAD_LETTERS.drain_contexts()
+        if not event_urls:
+            return
+
+        logging.info(f"Replaying {len(event_urls)} events with dead-lettered requests.")
+        if self.async_mode:
+            asyncio.run(self.ingest_event_urls_async(event_urls))
+        else:
+            create_events(session, event_urls)
             session.commit()
 
+    def run_initialization(self) -> None:
+        """
+        Run the full database initialization process. Phases and event weeks completed by an
+        earlier run, as recorded in the run journal, are skipped without any request.
+        """
+        self.initialize_database()
+        self.open_journal()
+        DEAD_LETTERS.load(self.dead_letter_file)
+
+        try:
+            with self.SessionLocal() as session:
+                self.replay_dead_letters(session)
+
+                # Draft picks and contracts are kept for the athletes created or enriched later. Only
+                # tables without a usable snapshot are fetched, the others are loaded as athletes need them.
+                if (
+                    not self.journal.phase_done("athletes")
+                    or self.pending_week_units()
+                    or extract_pending_enrichment_count(session)
+                ):
+                    self.initialize_team_draftpicks()
+                    self.initialize_team_contracts()
+                self.run_phase(session, "teams", self.initialize_teams)
+                self.run_phase(session, "athletes", self.initialize_athletes)
+
+                if self.shard_workers:
+                    self.initialize_events_sharded()
+                elif self.async_mode:
+                    asyncio.run(self.initialize_events_async())
+                else:
+                    self.initialize_events(session)
+                    session.commit()
+
+                self.replay_dead_letters(session)
+                self.enrich_athletes()
+                self.initialize_ratings()
+        finally:
+            DEAD_LETTERS.save(self.dead_letter_file)
+            if DEAD_LETTERS:
+                logging.warning(f"{len(DEAD_LETTERS)} requests still failing, saved to {self.dead_letter_file}.")
+            close_http_client()
+            close_response_cache()
+            close_snapshot_store()
+            get_entity_cache().log_stats()
+            for proxy_health in self.scheduler.proxy_report():
+                logging.info(f"Proxy health: {proxy_health}")
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO,
@@ -126,5 +314,7 @@ if __name__ == "__main__":
     years = list(range(2011, 2025))
     database_url = "sqlite:///sports.db"
 
-    initializer = DatabaseInitializer(years, database_url)
+    initializer = DatabaseInitializer(
+        years, database_url, async_mode=True, shard_workers=os.cpu_count(), resume="--restart" not in sys.argv
+    )
     initializer.run_initialization()
@@ -0,0 +1,153 @@
+import heapq
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from tqdm import tqdm
+
+from db.util import fetch_all_refs, close_http_client
+from db.retry import DEAD_LETTERS
+from db.http_cache import max_cache_age, close_response_cache
+from db.entity_cache import get_entity_cache
+from db.extract.event import extract_week_event_completion
+from db.extract.competition import extract_live_competitions, extract_competition
+from db.load.event import create_events, refresh_event, IGNORE_EVENTS
+from db.load.live import LiveGamePoller, MAX_LIVE_POLL_INTERVAL
+from util import current_season, get_id_from_url
+from scripts.db_initializer import DatabaseInitializer
+
+
+class DatabaseUpdater(DatabaseInitializer):
+    """
+    Incrementally update an initialized database. Only events that are new or whose
+    stored competition status is not over are fetched; completed, canceled and postponed
+    games are never requested or written again, and weeks whose stored events are all over
+    are skipped without a single request.
+    """
+
+    def __init__(self, database_url: str, years: Optional[List[int]] = None, **kwargs):
+        super().__init__(years or [current_season()], database_url, **kwargs)
+
+    def update_week(self, session, year: int, season_type: int, week: int) -> int:
+        """
+        Create the week's new events and refresh its unfinished ones.
+
+        Returns:
+            int: Number of events created or refreshed.
+        """
+        # Canceled and postponed games are over ("post") without ever being completed.
+        finished = {
+            event_id: completed or state == "post"
+            for event_id, (completed, state) in extract_week_event_completion(session, year, season_type, week).items()
+        }
+        if finished and all(finished.values()):
+            return 0
+
+        # Games in progress change by the minute, so nothing is served from the HTTP cache here.
+        with max_cache_age(0):
+            event_urls = fetch_all_refs(self.week_events_url(year, season_type, week), limit=18)
+
+            new_urls, unfinished_urls = [], []
+            for event_url in event_urls:
+                event_id = int(get_id_from_url(event_url))
+                if event_id in IGNORE_EVENTS or finished.get(event_id):
+                    continue
+                if event_id in finished:
+                    unfinished_urls.append(event_url)
+                else:
+                    new_urls.append(event_url)
+
+            create_events(session, new_urls)
+            for event_url in unfinished_urls:
+                refresh_event(session, event_url)
+            session.commit()
+
+        return len(new_urls) + len(unfinished_urls)
+
+    def run_update(self) -> None:
+        """Run the incremental update over the configured seasons, season types and weeks."""
+        self.initialize_database()
+        DEAD_LETTERS.load(self.dead_letter_file)
+
+        try:
+            with self.SessionLocal() as session:
+                self.replay_dead_letters(session)
+
+                units = self.event_week_units()
+                updated = 0
+                with tqdm(total=len(units), desc="Updating NFL Events") as pbar:
+                    for year, season_type, week in units:
+                        updated += self.update_week(session, year, season_type, week)
+                        pbar.update(1)
+                logging.info(f"Created or refreshed {updated} events.")
+
+            self.enrich_athletes()
+            self.initialize_ratings()
+        finally:
+            DEAD_LETTERS.save(self.dead_letter_file)
+            if DEAD_LETTERS:
+                logging.warning(f"{len(DEAD_LETTERS)} requests still failing, saved to {self.dead_letter_file}.")
+            close_http_client()
+            close_response_cache()
+            get_entity_cache().log_stats()
+
+    def follow_live_games(self, lookahead: timedelta = timedelta(minutes=30)) -> None:
+        """
+        Poll every stored competition in progress, or scheduled to kick off within
+        ``lookahead`` either side of now, appending new plays as they happen, until none is
+        left. Each game is polled on its own schedule, set by the poller from the game's
+        state, and dropped once its state is "post". Canceled games and games whose status
+        was never stored are not followed.
+
+        Args:
+            lookahead (timedelta): How far from kickoff a scheduled game is followed.
+        """
+        poller = LiveGamePoller()
+
+        with self.SessionLocal() as session, max_cache_age(0):
+            def due_competitions():
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                return extract_live_competitions(session, now - lookahead, now + lookahead)
+
+            schedule = [(time.monotonic(), competition.id) for competition in due_competitions()]
+            heapq.heapify(schedule)
+            logging.info(f"Following {len(schedule)} live games.")
+
+            while schedule:
+                poll_at, competition_id = heapq.heappop(schedule)
+                time.sleep(max(0.0, poll_at - time.monotonic()))
+
+                try:
+                    interval = poller.poll(session, extract_competition(session, competition_id))
+                except Exception as e:
+                    session.rollback()
+                    logging.error(f"Failed to poll competition {competition_id}. Details: {e}")
+                    interval = MAX_LIVE_POLL_INTERVAL
+
+                if interval is not None:
+                    heapq.heappush(schedule, (time.monotonic() + interval, competition_id))
+                else:
+                    logging.info(f"Competition {competition_id} is over.")
+
+                # Pick up games that reached the kickoff window since the last poll.
+                followed = {followed_id for _, followed_id in schedule} | {competition_id}
+                for competition in due_competitions():
+                    if competition.id not in followed:
+                        heapq.heappush(schedule, (time.monotonic(), competition.id))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        filename="database_updater.log"
+    )
+
+    database_url = "sqlite:///sports.db"
+
+    updater = DatabaseUpdater(database_url)
+    updater.run_update()
+    if "--live" in sys.argv:
+        updater.follow_live_games()
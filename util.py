@@ -1,7 +1,98 @@
+import difflib
+import re
+import unicodedata
+from collections import defaultdict
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+MONEY_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9}
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+# Lowest similarity between normalized names for a fuzzy match, see ``PlayerIndex.find``.
+FUZZY_NAME_CUTOFF = 0.88
+
+_NAME_SEPARATORS = re.compile(r"[-\s]+")
+_NAME_PUNCTUATION = re.compile(r"[^a-z0-9 ]")
 
 def convert_to_datetime(date_str: str) -> datetime:
     return datetime.strptime(date_str, '%Y-%m-%dT%H:%MZ')
 
+def current_season(today: Optional[datetime] = None) -> int:
+    """Return the NFL season in progress; January and February games belong to the previous year's season."""
+    today = today or datetime.now()
+    return today.year if today.month >= 3 else today.year - 1
+
 def get_id_from_url(url: str) -> int:
-    return url.split("/")[-1].replace("?lang=en&region=us","")
\ No newline at end of file
+    return url.split("/")[-1].replace("?lang=en&region=us","")
+
+def parse_money(text: str) -> Optional[float]:
+    """
+    Parse a Spotrac money or percentage cell, e.g. "$1,250,000", "($500,000)", "$1.5M" or
+    "12.35%", into a number. Empty and placeholder cells such as "-" parse to None.
+    """
+    text = text.strip().replace("$", "").replace(",", "").replace("%", "")
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()").strip()
+
+    multiplier = 1.0
+    if text[-1:].upper() in MONEY_SUFFIXES:
+        multiplier = MONEY_SUFFIXES[text[-1].upper()]
+        text = text[:-1]
+
+    try:
+        value = float(text) * multiplier
+    except ValueError:
+        return None
+    return -value if negative else value
+
+def normalize_player_name(name: str) -> str:
+    """
+    Normalize a player's name for matching: accents, punctuation and generational suffixes
+    are dropped and the words lowercased, so "Amon-Ra St. Brown" and "amon ra st brown"
+    or "Odell Beckham Jr." and "Odell Beckham" normalize alike.
+
+    Args:
+        name (str): The player's name.
+
+    Returns:
+        str: The normalized name.
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = _NAME_PUNCTUATION.sub("", _NAME_SEPARATORS.sub(" ", ascii_name.lower())).split()
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+class PlayerIndex:
+    """
+    Rows about players, such as a Spotrac table or a Madden ratings catalog, indexed by
+    normalized player name when they are loaded so that finding a player's rows is a
+    dictionary lookup.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], name_key: str = "player_name") -> None:
+        self.rows = rows
+        self.by_name: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            self.by_name[normalize_player_name(row[name_key])].append(row)
+
+    def find(self, player_name: str, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Return the rows of a player. Names are matched exactly once normalized; failing
+        that, and if ``fuzzy`` is set, the single closest name at least ``FUZZY_NAME_CUTOFF``
+        similar is used, which absorbs spelling variants and stray cell text.
+
+        Args:
+            player_name (str): The name of the player.
+            fuzzy (bool): Whether to fall back to the closest name.
+
+        Returns:
+            List[Dict[str, Any]]: The player's rows, empty if no name matches.
+        """
+        name = normalize_player_name(player_name)
+        if name in self.by_name:
+            return self.by_name[name]
+        if not fuzzy or not name:
+            return []
+
+        matches = difflib.get_close_matches(name, list(self.by_name), n=1, cutoff=FUZZY_NAME_CUTOFF)
+        return self.by_name[matches[0]] if matches else []